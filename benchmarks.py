@@ -0,0 +1,189 @@
+# *******************************************************************************
+#
+#    Copyright (c) 2020 David Briant
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+# *******************************************************************************
+
+
+# timings for the parts of coppertop that exist to be fast - not run by the tests
+# e.g. python benchmarks.py            runs everything
+#      python benchmarks.py PEach RSort runs just those
+
+
+import os, random, sys, tempfile, time
+import numpy as np
+from _strptime import _strptime
+
+from coppertop.pipeable import Pipeable
+from coppertop._std import Each, PEach, PushInto, RSort, StagedPipeline
+from coppertop.ranges import IndexableFR, ListOR, RMap, FileLineIR, BufferedFileLineIR
+from coppertop.time import AbstractDateTimeArray, Precision, DaySecond, AddPeriod, ParseAbstractDateTime, \
+    ParseAbstractDateTimes, ParseAbstractDates, ParseAbstractDateArray, YYYY_MM_DD
+
+
+def _timings(fns, baseline=None):
+    # prints the time each fn takes, its speedup over the baseline named and any count it answers
+    times = {}
+    for name, fn in fns:
+        t1 = time.perf_counter()
+        answer = fn()
+        times[name] = t = time.perf_counter() - t1
+        speedup = '' if baseline is None else '  x%.1f' % (times[baseline] / t)
+        count = '  (%s)' % answer if isinstance(answer, int) else ''
+        print('    %-24s %.3fs%s%s' % (name, t, speedup, count))
+
+
+# *******************************************************************************
+# std
+# *******************************************************************************
+
+@Pipeable
+def _Busy(n, x):
+    # cpu bound work
+    total = 0
+    for i in range(n):
+        total += i * x
+    return total
+
+@Pipeable
+def _Wait(seconds, x):
+    # stands in for I/O, which releases the GIL
+    time.sleep(seconds)
+    return x
+
+def bench_PEach(n=200, work=100_000, wait=0.01, workers=4):
+    # processes only beat Each given more than one core, threads beat it for I/O bound work whatever the cores
+    print('PEach - %s cpus, %s workers' % (os.cpu_count(), workers))
+    xs = list(range(n))
+    _timings([
+        ('Each cpu', lambda: xs >> Each >> _Busy(work)),
+        ('PEach thread cpu', lambda: xs >> PEach(workers=workers, backend='thread') >> _Busy(work)),
+        ('PEach process cpu', lambda: xs >> PEach(workers=workers, backend='process') >> _Busy(work)),
+    ], 'Each cpu')
+    _timings([
+        ('Each I/O', lambda: xs >> Each >> _Wait(wait)),
+        ('PEach thread I/O', lambda: xs >> PEach(workers=workers, backend='thread') >> _Wait(wait)),
+    ], 'Each I/O')
+
+
+# *******************************************************************************
+# ranges
+# *******************************************************************************
+
+def bench_stagedPipeline(n=200, work=0.002):
+    print('StagedPipeline - 3 I/O bound stages')
+    slow = _Wait(work)
+    stages = [RMap(fn=slow), RMap(fn=slow), RMap(fn=slow)]
+    def pushInto():
+        r = IndexableFR(list(range(n)))
+        for stage in stages:
+            r = stage(r)
+        r >> PushInto >> ListOR([])
+    pipeline = StagedPipeline(*stages, batchSize=1)
+    _timings([
+        ('PushInto', pushInto),
+        ('StagedPipeline', lambda: pipeline.run(IndexableFR(list(range(n))), ListOR([]))),
+    ], 'PushInto')
+    for stats in pipeline.stats:
+        print('        ', stats)
+
+
+def bench_RSort(n=2_000_000, maxMemory=16 * 1024 * 1024):
+    print('RSort - %s lines' % n)
+    rng = random.Random(1)
+    lines = ['%08d some log line' % rng.randrange(10 ** 8) for i in range(n)]
+    def drain(r):
+        count = 0
+        while not r.empty:
+            count += r.popFrontN(4096)
+        return count
+    _timings([
+        ('sorted', lambda: len(sorted(lines))),
+        ('RSort in memory', lambda: drain(lines >> RSort)),
+        ('RSort spilled', lambda: drain(lines >> RSort(maxMemory=maxMemory))),
+    ], 'sorted')
+
+
+def bench_fileLines(numLines=2_000_000):
+    # BufferedFileLineIR pays off element by element - in batches FileLineIR already reads with readlines
+    print('FileLineIR vs BufferedFileLineIR - %s lines' % numLines)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'lines.txt')
+        with open(path, 'w') as f:
+            f.writelines('line %d of some log file\n' % i for i in range(numLines))
+
+        def loop():
+            with open(path) as f:
+                return sum(1 for line in f)
+        def batches(r):
+            n = 0
+            while not r.empty:
+                batch = r.frontBatch(4096)
+                n += r.popFrontN(len(batch))
+            return n
+        def elements(r):
+            n = 0
+            while not r.empty:
+                r.front
+                r.popFront()
+                n += 1
+            return n
+        _timings([
+            ('for line in f', loop),
+            ('FileLineIR', lambda: elements(open(path) >> FileLineIR)),
+            ('Buffered str', lambda: elements(path >> BufferedFileLineIR(encoding='utf-8'))),
+            ('Buffered bytes', lambda: elements(path >> BufferedFileLineIR)),
+        ], 'FileLineIR')
+        _timings([
+            ('FileLineIR batches', lambda: batches(open(path) >> FileLineIR)),
+            ('Buffered str batches', lambda: batches(path >> BufferedFileLineIR(encoding='utf-8'))),
+            ('Buffered bytes batches', lambda: batches(path >> BufferedFileLineIR)),
+            ('Buffered views batches', lambda: batches(path >> BufferedFileLineIR(views=True))),
+        ], 'FileLineIR batches')
+
+
+# *******************************************************************************
+# time
+# *******************************************************************************
+
+def bench_parsing(n=200_000):
+    print('parsing - %s datetimes' % n)
+    xs = ['2020.%02d.%02d 16:%02d:05' % (1 + i % 12, 1 + i % 28, i % 60) for i in range(n)]
+    _timings([
+        ('_strptime', lambda: [_strptime(x, '%Y.%m.%d %H:%M:%S') for x in xs]),
+        ('ParseAbstractDateTime', lambda: [ParseAbstractDateTime('yyyy.MM.dd hh:mm:ss', x) for x in xs]),
+        ('ParseAbstractDateTimes', lambda: ParseAbstractDateTimes('yyyy.MM.dd hh:mm:ss', xs)),
+        ('ParseAbstractDates', lambda: ParseAbstractDates('yyyy.MM.dd', [x[:10] for x in xs])),
+        ('ParseAbstractDateArray', lambda: ParseAbstractDateArray(YYYY_MM_DD, np.array([x[:10] for x in xs], dtype='S'))),
+    ], '_strptime')
+
+
+def bench_addPeriod():
+    # a year of minute bars
+    bars = AbstractDateTimeArray(np.arange(1577836800, 1577836800 + 366 * 86400, 60, dtype=np.int64), Precision.s)
+    print('AddPeriod - %s bars' % len(bars))
+    _timings([
+        ('AddPeriod', lambda: AddPeriod(DaySecond(1, 30), bars)),
+    ])
+
+
+def main(names):
+    benches = {name[len('bench_'):]: fn for name, fn in globals().items() if name.startswith('bench_')}
+    for name in names or benches:
+        benches[name]()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
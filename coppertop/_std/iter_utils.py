@@ -18,7 +18,12 @@
 
 
 
-from ..pipeable import Pipeable
+import os, math
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from ..pipeable import Pipeable, PipeableFunction
+from .repl_utils import IsNdArray
+from ..range_interfaces import IInputRange, GetIRIter
+from ..ranges import IterIR
 
 
 # iter iteration (rather than range iteration)
@@ -26,7 +31,9 @@ from ..pipeable import Pipeable
 @Pipeable
 def Each(xs, f):
     """each(xs, f)  e.g. xs >> Each >> f
-    Answers [f(x) for x in xs]"""
+    Answers [f(x) for x in xs] or f(xs) if xs is a numpy array and f is a ufunc (or a Pipeable marked as such)"""
+    if _isUfunc(f) and IsNdArray(xs):
+        return f(xs)
     return [f(x) for x in xs]
 
 @Pipeable
@@ -41,7 +48,7 @@ def Chain(seed, xs, f):
     Answers resultn where resulti=f(prior, xi) for each x in xs
     prior = resulti-1 or seed initially"""
     prior = seed
-    for x in xs:
+    for x in _iterOf(xs):
         prior = f(prior, x)
     return prior
 
@@ -50,3 +57,72 @@ def EachArgs(listOfArgs, f):
     """eachArgs(f, listOfArgs)
     Answers [f(*args) for args in listOfArgs]"""
     return [f(*args) for args in listOfArgs]
+
+
+# lazy versions - answer an input range that applies f as each element is pulled, so nothing is materialised and
+# the input may be unbounded. xs may be any iterable or an input range
+
+@Pipeable
+def LazyEach(xs, f):
+    """lazyEach(xs, f)  e.g. xs >> LazyEach >> f
+    Answers an input range of f(x) for x in xs"""
+    return IterIR(f(x) for x in _iterOf(xs))
+
+@Pipeable
+def LazyEachIf(xs, f, ifF):
+    """lazyEachIf(xs, f, ifF)  e.g. xs >> LazyEachIf >> f >> ifF
+    Answers an input range of f(x) for x in xs if ifF(x)"""
+    return IterIR(f(x) for x in _iterOf(xs) if ifF(x))
+
+@Pipeable
+def LazyEachArgs(listOfArgs, f):
+    """lazyEachArgs(listOfArgs, f)
+    Answers an input range of f(*args) for args in listOfArgs"""
+    return IterIR(f(*args) for args in _iterOf(listOfArgs))
+
+def _isUfunc(f):
+    if isinstance(f, PipeableFunction):
+        return f._sig.isUfunc
+    return type(f).__name__ == 'ufunc'        # avoids importing numpy
+
+def _iterOf(xs):
+    return xs >> GetIRIter if isinstance(xs, IInputRange) else xs
+
+
+# parallel version
+
+_executorClassByBackend = dict(thread=ThreadPoolExecutor, process=ProcessPoolExecutor)
+
+@Pipeable
+def PEach(xs, f, workers=None, backend='thread', chunkSize=None, executor=None):
+    """pEach(xs, f)  e.g. xs >> PEach(workers=8, backend='process') >> f
+    Answers [f(x) for x in xs] evaluated in chunks on a pool of threads or processes, preserving order. The first
+    exception raised by f is re-raised. For the process backend f and the elements of xs must be picklable (a
+    PipeableFunction, including partials, is pickled by reference to its module level definition). An existing
+    executor may be passed in to avoid the cost of starting a pool on each call"""
+    xs = list(_iterOf(xs))
+    if not xs:
+        return []
+    ownsExecutor = executor is None
+    if ownsExecutor:
+        if backend not in _executorClassByBackend:
+            raise ValueError('backend must be one of %s but got %s' % (list(_executorClassByBackend), repr(backend)))
+        workers = workers or os.cpu_count() or 1
+        executor = _executorClassByBackend[backend](max_workers=workers)
+    elif not isinstance(executor, Executor):
+        raise TypeError('executor must be a concurrent.futures.Executor')
+    if chunkSize is None:
+        # a few chunks per worker balances the load without too much IPC overhead
+        chunkSize = max(1, math.ceil(len(xs) / ((workers or os.cpu_count() or 1) * 4)))
+    chunks = [xs[i:i + chunkSize] for i in range(0, len(xs), chunkSize)]
+    answer = []
+    try:
+        for results in executor.map(_eachOfChunk, [f] * len(chunks), chunks):
+            answer.extend(results)
+    finally:
+        if ownsExecutor:
+            executor.shutdown()
+    return answer
+
+def _eachOfChunk(f, xs):
+    return [f(x) for x in xs]
@@ -18,13 +18,17 @@
 
 
 
+import collections, itertools
+from typing import Sequence
 from ..pipeable import Pipeable
 from ..ranges import RMap
+from ..range_interfaces import IInputRange, IForwardRange, IBidirectionalRange, IRandomAccessFinite, GetIRIter
+from .range_utils import RTake, RTakeBack
 
 
 @Pipeable
 def Sorted(iterable, key=None, reverse=False):
-    return sorted(iterable, key, reverse)
+    return sorted(iterable, key=key, reverse=reverse)
 
 @Pipeable
 def Len(lenable):
@@ -38,19 +42,87 @@ def WrapInList(x):
 
 @Pipeable
 def First(x):
-    raise NotImplementedError()
+    if isinstance(x, IInputRange):
+        if x.empty:
+            raise IndexError('First of an empty range')
+        return x.front
+    if isinstance(x, Sequence):
+        return x[0]
+    for e in x:
+        return e
+    raise IndexError('First of an empty iterable')
 
 @Pipeable
 def Last(x):
-    raise NotImplementedError()
+    if isinstance(x, IBidirectionalRange) and x.empty:
+        raise IndexError('Last of an empty range')
+    if isinstance(x, IRandomAccessFinite):
+        return x[x.length - 1]
+    if isinstance(x, IBidirectionalRange):
+        return x.back
+    if isinstance(x, Sequence):
+        return x[-1]
+    # walk to the end keeping only the latest element
+    answer = _MISSING = object()
+    for answer in (x >> GetIRIter if isinstance(x, IInputRange) else x):
+        pass
+    if answer is _MISSING:
+        raise IndexError('Last of an empty iterable')
+    return answer
 
 @Pipeable
-def Take(x):
-    raise NotImplementedError()
+def Take(x, n):
+    # the first n elements or for negative n the last -n, lazily for ranges
+    if isinstance(x, IInputRange):
+        return RTake(n, x) if n >= 0 else RTakeBack(-n, x)
+    if isinstance(x, Sequence):
+        return x[:n] if n >= 0 else x[n:]
+    return list(itertools.islice(x, n)) if n >= 0 else list(collections.deque(x, maxlen=-n))
 
 @Pipeable
-def Cut(x):
-    raise NotImplementedError()
+def Cut(x, n):
+    # splits x into chunks of n elements or, if n is a list of indices, before each of those indices as numpy.split
+    # does, i.e. x >> Cut >> [2, 5] answers [x[:2], x[2:5], x[5:]] - ranges are cut lazily
+    if isinstance(x, IInputRange):
+        if not isinstance(n, int):
+            raise TypeError('ranges can only be cut into chunks of a fixed size')
+        if n <= 0:
+            raise ValueError('n must be positive')
+        return _ChunkFR(x, n) if isinstance(x, IForwardRange) else _ChunkIR(x, n)
+    if isinstance(n, int) and n <= 0:
+        raise ValueError('n must be positive')
+    bounds = list(range(0, len(x), n)) if isinstance(n, int) else [0] + list(n)
+    return [x[i:j] for i, j in zip(bounds, bounds[1:] + [len(x)])]
+
+class _ChunkIR(IInputRange):
+    def __init__(self, r, n, chunk=None):
+        self.r = r
+        self.n = n
+        self.chunk = chunk
+    @property
+    def empty(self):
+        return self.chunk is None and self.r.empty
+    @property
+    def front(self):
+        if self.chunk is None:
+            r, n = self.r, self.n
+            if r.hasBatch:
+                self.chunk = list(r.frontBatch(n))
+                r.popFrontN(len(self.chunk))
+            else:
+                self.chunk = []
+                while len(self.chunk) < n and not r.empty:
+                    self.chunk.append(r.front)
+                    r.popFront()
+        return self.chunk
+    def popFront(self):
+        if self.chunk is None:
+            self.r.popFrontN(self.n)
+        self.chunk = None
+
+class _ChunkFR(_ChunkIR, IForwardRange):
+    def save(self):
+        return _ChunkFR(self.r.save(), self.n, None if self.chunk is None else list(self.chunk))
 
 @Pipeable
 def ReplaceWith(haystack, needle, replacement):
@@ -21,22 +21,82 @@ try:
     import numpy
 except:
     numpy = None
+import math, itertools
 from ..pipeable import Pipeable
+from ..range_interfaces import IInputRange
+from ..ranges import IterIR
+from .iter_utils import _iterOf
+from .repl_utils import IsNdArray
 
 
+# numpy arrays are handed to numpy directly and ranges and iterators are streamed in a single pass without being
+# materialised. Other containers (e.g. lists) are handed to numpy as before
+
+def _isStream(x):
+    return isinstance(x, IInputRange) or (hasattr(x, '__next__') and hasattr(x, '__iter__'))
+
+
+@Pipeable
+def Sum(ndOrPy):
+    if IsNdArray(ndOrPy):
+        return ndOrPy.sum()
+    return sum(_iterOf(ndOrPy))
 
 @Pipeable
 def Mean(ndOrPy):
-    # should do full numpy?
+    if _isStream(ndOrPy):
+        n, mean, m2 = _moments(ndOrPy)
+        if n == 0:
+            raise ValueError('Mean of empty range')
+        return mean
     return numpy.mean(ndOrPy)
 
+@Pipeable
+def Var(ndOrPy, dof=0):
+    if _isStream(ndOrPy):
+        n, mean, m2 = _moments(ndOrPy)
+        if n - dof <= 0:
+            raise ValueError('Var needs more than %s elements' % dof)
+        return m2 / (n - dof)
+    return numpy.var(ndOrPy, ddof=dof)
+
 @Pipeable
 def Std(ndOrPy, dof=0):
-    # should do full numpy? std(a, axis=None, dtype=None, out=None, ddof=0, keepdims=<no value>)
-    return numpy.std(ndOrPy, dof)
+    if _isStream(ndOrPy):
+        return math.sqrt(Var(ndOrPy, dof))
+    return numpy.std(ndOrPy, ddof=dof)
 
 @Pipeable
+def Quantile(ndOrPy, q):
+    # an exact quantile needs all the values - streams are read straight into an array rather than via a list
+    if _isStream(ndOrPy):
+        ndOrPy = numpy.fromiter(_iterOf(ndOrPy), dtype=float)
+    return numpy.quantile(ndOrPy, q)
+
+@Pipeable
+def CumSum(ndOrPy):
+    # ranges and iterators answer a lazy input range
+    if _isStream(ndOrPy):
+        return IterIR(itertools.accumulate(_iterOf(ndOrPy)))
+    return numpy.cumsum(ndOrPy)
+
+@Pipeable
+def CumProd(ndOrPy):
+    if _isStream(ndOrPy):
+        return IterIR(itertools.accumulate(_iterOf(ndOrPy), lambda a, b: a * b))
+    return numpy.cumprod(ndOrPy)
+
+@Pipeable(ufunc=True)
 def Sqrt(x):
     return numpy.sqrt(x)
 
 
+def _moments(xs):
+    # Welford's single pass algorithm - answers count, mean and sum of squared deviations from the mean
+    n, mean, m2 = 0, 0.0, 0.0
+    for x in _iterOf(xs):
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+    return n, mean, m2
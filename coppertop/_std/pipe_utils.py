@@ -19,18 +19,94 @@
 
 
 
-from ..pipeable import Pipeable
+from ..pipeable import Pipeable, PipeableFunction
 
 
-# Composition - could be made more efficient
+# Composition
 
 @Pipeable(overrideLHS=True)
 def Compose(f1, f2):
-    @Pipeable
-    def _Composed(x):
-        return x >> f1 >> f2
-    return _Composed
+    # x >> (f1 >> Compose >> f2) answers x >> f1 >> f2
+    return Pipeline(f1, f2)
 
-@Pipeable(overrideLHS=True)
-def ComposeAll(f1, f2):
-    raise NotImplementedError()
+@Pipeable
+def ComposeAll(fs):
+    # x >> ([f1, f2, f3] >> ComposeAll) answers x >> f1 >> f2 >> f3
+    return Pipeline(*fs)
+
+
+class Pipeline(object):
+    # Pipeline(Each, SquareIt, Chain(seed=0), Add) captures the chain x >> Each >> SquareIt >> Chain(seed=0) >> Add
+    # once. The arguments are bound at construction (so a chain that doesn't consume all its args fails then rather
+    # than on first use) leaving a flat sequence of steps, each of which calls a wrapped function with the prior
+    # result and the constants it was given, i.e. there is no per-call binding work
+    __slots__ = ['_steps', '_repr']
+
+    def __init__(self, *fs):
+        if not fs:
+            raise TypeError('Pipeline needs at least one function')
+        self._steps = []
+        pending = None
+        for f in fs:
+            if pending is None:
+                # the prior result is piped into f
+                if isinstance(f, Pipeline):
+                    self._steps.extend(f._steps)
+                    continue
+                _checkPipeable(f)
+                pending = f
+                bound = f._bind(_PRIOR)
+            else:
+                # f is munched as the next argument of the pending function
+                if isinstance(f, PipeableFunction) and f._sig.overrideLHS:
+                    raise TypeError('Pipeline cannot fuse %s as it overrides its LHS' % f)
+                bound = pending._bind(f)
+            if isinstance(bound, tuple):
+                self._steps.append(_compileStep(pending._sig.fnOrClass, *bound))
+                pending = None
+            else:
+                pending = bound
+        if pending is not None:
+            raise TypeError('Pipeline ends with %s which still needs %s argument(s)' % (pending, pending._numAvailableCoreBindings))
+        self._repr = 'Pipeline(%s)' % ', '.join(repr(f) for f in fs)
+
+    def __call__(self, x):
+        for step in self._steps:
+            x = step(x)
+        return x
+
+    def __rrshift__(self, lhs):
+        # lhs >> self
+        return self(lhs)
+
+    def __repr__(self):
+        return self._repr
+
+
+def _checkPipeable(f):
+    if not isinstance(f, PipeableFunction):
+        raise TypeError('Pipeline can only pipe into a PipeableFunction but got %s' % repr(f))
+    if f._sig.overrideLHS or not f._sig.leftToRight:
+        raise TypeError('Pipeline cannot pipe into %s' % f)
+
+def _compileStep(fn, args, kwargs):
+    # answers a unary function that calls fn with the prior result in place of _PRIOR - the prior result is always
+    # bound to a parameter so is in args, kwargs only holding extras for a **kwargs parameter
+    args = tuple(args)
+    for i, v in enumerate(args):
+        if v is _PRIOR:
+            before, after = args[:i], args[i + 1:]
+            if not (before or after or kwargs):
+                return fn
+            elif not kwargs:
+                return lambda x: fn(*before, x, *after)
+            else:
+                return lambda x: fn(*before, x, *after, **kwargs)
+    raise TypeError('%s>>the piped value was not bound' % fn)
+
+
+class _Prior(object):
+    # placeholder for the prior result whilst compiling a Pipeline
+    def __repr__(self):
+        return '_PRIOR'
+_PRIOR = _Prior()
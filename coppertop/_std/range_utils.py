@@ -18,53 +18,224 @@
 
 
 
+import collections, heapq, itertools, operator, os, pickle, queue, shutil, sys, tempfile, threading
+from time import perf_counter
+from .._core import Missing
 from ..pipeable import Pipeable
+from ..ranges import _BATCH_SIZE, _UNREAD, _elementsOf, IndexableFR, IterIR, ToIRangeIfNot, ToAsyncIRIfNot
+from ..range_interfaces import IInputRange, IForwardRange, IBidirectionalRange, IRandomAccessFinite, GetIRIter
 
 @Pipeable(leftToRight=True, pipeOnly=True)
 def PushInto(inR, outR):
-    while not inR.empty:
-        outR.put(inR.front)
-        inR.popFront()
+    _drain(inR, outR)
     return outR
 
 @Pipeable(rightToLeft=True)
 def PullFrom(inR, outR):
-    while not inR.empty:
-        outR.put(inR.front)
-        inR.popFront()
+    _drain(inR, outR)
     return None
 
+def _drain(inR, outR):
+    if inR.hasBatch and hasattr(outR, 'putBatch'):
+        while not inR.empty:
+            batch = inR.frontBatch(_BATCH_SIZE)
+            outR.putBatch(batch)
+            inR.popFrontN(len(batch))
+    else:
+        while not inR.empty:
+            outR.put(inR.front)
+            inR.popFront()
+
+@Pipeable(leftToRight=True)
+async def AsyncPushInto(inR, outR, close=False):
+    # inR may be sync or async, outR is an async output range which is closed at the end if close is True - e.g.
+    # await (lines >> AsyncPushInto(close=True) >> queue)
+    inR = inR >> ToAsyncIRIfNot
+    while not await inR.empty():
+        await outR.put(inR.front)
+        inR.popFront()
+    if close:
+        await outR.close()
+    return outR
+
 @Pipeable
-def RZip(r):
-    raise NotImplementedError()
+def RZip(ror):
+    # answers a range of lists, one element from each range, stopping at the shortest
+    return _ZipR([r >> ToIRangeIfNot for r in ror >> ToIRangeIfNot >> GetIRIter])
+
+class _ZipR(IForwardRange):
+    def __init__(self, rs):
+        self.rs = rs
+    @property
+    def empty(self):
+        for r in self.rs:
+            if r.empty: return True
+        return not self.rs
+    @property
+    def front(self):
+        return [r.front for r in self.rs]
+    def popFront(self):
+        for r in self.rs:
+            r.popFront()
+    def save(self):
+        return _ZipR([r.save() for r in self.rs])
 
 @Pipeable
 def RFold(r, f):
-    raise NotImplementedError()
+    # f(accumulator, element), seeded with the first element
+    r = r >> ToIRangeIfNot
+    if r.empty:
+        raise TypeError('RFold of an empty range with no seed')
+    seed = r.front
+    r.popFront()
+    return _fold(seed, r, f)
 
 @Pipeable
 def RFoldSeed(seed, r, f):
-    raise NotImplementedError()
+    return _fold(seed, r >> ToIRangeIfNot, f)
+
+def _fold(acc, r, f):
+    if r.hasBatch:
+        while not r.empty:
+            batch = r.frontBatch(_BATCH_SIZE)
+            for e in batch:
+                acc = f(acc, e)
+            r.popFrontN(len(batch))
+    else:
+        while not r.empty:
+            acc = f(acc, r.front)
+            r.popFront()
+    return acc
 
 @Pipeable
 def RFilter(r, f):
-    raise NotImplementedError()
+    # answers a forward range only if r is one
+    r = r >> ToIRangeIfNot
+    return _FilterFR(r, f) if isinstance(r, IForwardRange) else _FilterIR(r, f)
+
+class _FilterIR(IInputRange):
+    # f is only applied once empty or front is asked for
+    def __init__(self, r, f, skipped=False):
+        self.r = r
+        self.f = f
+        self.skipped = skipped
+    def _skip(self):
+        r, f = self.r, self.f
+        while not r.empty and not f(r.front):
+            r.popFront()
+        self.skipped = True
+    @property
+    def empty(self):
+        if not self.skipped: self._skip()
+        return self.r.empty
+    @property
+    def front(self):
+        if not self.skipped: self._skip()
+        return self.r.front
+    def popFront(self):
+        if not self.skipped: self._skip()
+        self.r.popFront()
+        self.skipped = False
+
+class _FilterFR(_FilterIR, IForwardRange):
+    def save(self):
+        return _FilterFR(self.r.save(), self.f, self.skipped)
 
 @Pipeable
-def RTake(r, n):
-    raise NotImplementedError()
+def RTake(n, r):
+    r = r >> ToIRangeIfNot
+    if isinstance(r, IRandomAccessFinite):
+        return r[:max(0, n)]
+    return _TakeFR(r, n) if isinstance(r, IForwardRange) else _TakeIR(r, n)
+
+class _TakeIR(IInputRange):
+    def __init__(self, r, n):
+        self.r = r
+        self.n = n
+    @property
+    def empty(self):
+        return self.n <= 0 or self.r.empty
+    @property
+    def front(self):
+        return self.r.front
+    def popFront(self):
+        self.r.popFront()
+        self.n -= 1
+    @property
+    def hasBatch(self):
+        return self.r.hasBatch
+    def frontBatch(self, n):
+        return self.r.frontBatch(min(n, max(0, self.n)))
+    def popFrontN(self, n):
+        n = self.r.popFrontN(min(n, max(0, self.n)))
+        self.n -= n
+        return n
+
+class _TakeFR(_TakeIR, IForwardRange):
+    def save(self):
+        return _TakeFR(self.r.save(), self.n)
 
 @Pipeable
-def RTakeBack(r, n):
-    raise NotImplementedError()
+def RTakeBack(n, r):
+    # answers the last n elements in order
+    r = r >> ToIRangeIfNot
+    n = max(0, n)
+    if isinstance(r, IRandomAccessFinite):
+        return r[max(0, r.length - n):]
+    if isinstance(r, IForwardRange):
+        r.popFrontN(_count(r.save()) - n)
+        return r
+    # an input range can only be read once so the last n are kept
+    return IndexableFR(list(collections.deque(r >> GetIRIter, maxlen=n)) if n else [])
 
 @Pipeable
-def RDrop(r, n):
-    raise NotImplementedError()
+def RDrop(n, r):
+    r = r >> ToIRangeIfNot
+    if isinstance(r, IRandomAccessFinite):
+        return r[max(0, n):]
+    r.popFrontN(n)
+    return r
 
 @Pipeable
-def RDropBack(r, n):
-    raise NotImplementedError()
+def RDropBack(n, r):
+    r = r >> ToIRangeIfNot
+    if isinstance(r, IRandomAccessFinite):
+        return r[:max(0, r.length - max(0, n))]
+    if isinstance(r, IBidirectionalRange):
+        while n > 0 and not r.empty:
+            r.popBack()
+            n -= 1
+        return r
+    if isinstance(r, IForwardRange):
+        return _TakeFR(r, _count(r.save()) - n)
+    return _DropBackR(r, n)
+
+class _DropBackR(IInputRange):
+    # keeps n elements of lookahead so the last n are never answered
+    def __init__(self, r, n):
+        self.r = r
+        self.ahead = collections.deque()
+        while len(self.ahead) <= n and not r.empty:
+            self.ahead.append(r.front)
+            r.popFront()
+        self.n = n
+    @property
+    def empty(self):
+        return len(self.ahead) <= self.n
+    @property
+    def front(self):
+        return self.ahead[0]
+    def popFront(self):
+        self.ahead.popleft()
+        if not self.r.empty:
+            self.ahead.append(self.r.front)
+            self.r.popFront()
+
+def _count(r):
+    n = 0
+    while not r.empty:
+        n += r.popFrontN(_BATCH_SIZE)
+    return n
 
 @Pipeable
 def Find(r, value):
@@ -103,3 +274,398 @@ def PopFront(r):
 def PopBack(r):
     r.popBack()
     return r
+
+
+# hash based grouping - one pass over an unsorted range keeping only the aggregate state per key
+# with maxKeys set the table is spilled to disk, partitioned by hash(key), whenever it exceeds maxKeys keys and the
+# partitions are then merged back one at a time - a partition that itself grows past maxKeys keys is re-spilled into
+# sub-partitions (with a differently salted hash) so at most about maxKeys keys are ever held in memory
+
+_GROUP_AGGS = dict(
+    # start(x), step(acc, x), merge(acc1, acc2)
+    list=(lambda x: [x], lambda acc, x: acc.append(x) or acc, operator.add),
+    count=(lambda x: 1, lambda acc, x: acc + 1, operator.add),
+    sum=(lambda x: x, operator.add, operator.add),
+    min=(lambda x: x, min, min),
+    max=(lambda x: x, max, max),
+    first=(lambda x: x, lambda acc, x: acc, lambda acc1, acc2: acc1),
+    last=(lambda x: x, lambda acc, x: x, lambda acc1, acc2: acc2),
+)
+
+@Pipeable
+def GroupBy(r, key=None, agg='list', seed=Missing, merge=None, maxKeys=None, spillDir=None):
+    """GroupBy(r, key=None, agg='list', seed=Missing, merge=None, maxKeys=None, spillDir=None)
+    Answers an input range of (key(x), aggregate) over r computed in one pass. agg is 'list', 'count', 'sum', 'min',
+    'max', 'first', 'last' or a fold f(acc, x) seeded with the key's first element unless seed is given (a fold
+    needs merge(acc1, acc2) to be spillable). With maxKeys the table is spilled to spillDir (or the system temp
+    folder) as needed. Without maxKeys keys are answered in order of first appearance"""
+    if isinstance(agg, str):
+        if agg not in _GROUP_AGGS:
+            raise ValueError('Unknown agg %r, must be one of %s or a function' % (agg, ', '.join(_GROUP_AGGS)))
+        start, step, merge = _GROUP_AGGS[agg]
+    else:
+        start, step = (lambda x: x) if seed is Missing else (lambda x: agg(seed, x)), agg
+        if maxKeys is not None and merge is None:
+            raise TypeError('a fold agg needs a merge function to be spilled to disk')
+    xs = _elementsOf(r)
+    if maxKeys is None:
+        return IterIR(_groupInMemory(xs, key, start, step).items())
+    return IterIR(_groupSpilling(xs, key, start, step, merge, maxKeys, spillDir))
+
+@Pipeable
+def CountBy(r, key=None, maxKeys=None, spillDir=None):
+    # answers an input range of (key(x), count) as GroupBy does
+    if maxKeys is None:
+        xs = _elementsOf(r)
+        return IterIR(collections.Counter(xs if key is None else map(key, xs)).items())
+    return GroupBy(r, key, 'count', maxKeys=maxKeys, spillDir=spillDir)
+
+@Pipeable
+def Distinct(r, key=None, maxKeys=None, spillDir=None):
+    """Answers an input range of the first element for each distinct key(x) - in order of first appearance unless
+    maxKeys is given in which case the seen keys may be spilled to disk and the order is by partition"""
+    if maxKeys is None:
+        return IterIR(_distinctInMemory(_elementsOf(r), key))
+    return IterIR(x for k, x in GroupBy(r, key, 'first', maxKeys=maxKeys, spillDir=spillDir) >> GetIRIter)
+
+@Pipeable
+def TopK(r, k, key=None):
+    """Answers the k largest elements of r (by key) in descending order, keeping only k elements in memory"""
+    return heapq.nlargest(k, _elementsOf(r), key)
+
+def _groupInMemory(xs, key, start, step):
+    table = {}
+    for x in xs:
+        k = x if key is None else key(x)
+        acc = table.get(k, Missing)
+        table[k] = start(x) if acc is Missing else step(acc, x)
+    return table
+
+def _distinctInMemory(xs, key):
+    seen = set()
+    for x in xs:
+        k = x if key is None else key(x)
+        if k not in seen:
+            seen.add(k)
+            yield x
+
+_SPILL_FANOUT = 16          # partitions per spill level
+_MAX_SPILL_LEVELS = 8       # beyond this a partition is merged in memory whatever its size (e.g. colliding hashes)
+
+def _groupSpilling(xs, key, start, step, merge, maxKeys, spillDir):
+    folder, table, hasSpilled = None, {}, False
+    try:
+        for x in xs:
+            k = x if key is None else key(x)
+            acc = table.get(k, Missing)
+            table[k] = start(x) if acc is Missing else step(acc, x)
+            if len(table) > maxKeys:
+                folder = folder or tempfile.mkdtemp(prefix='coppertop_groupby_', dir=spillDir)
+                _spill(table, folder, 0)
+                table, hasSpilled = {}, True
+        if not hasSpilled:
+            yield from table.items()
+            return
+        _spill(table, folder, 0)
+        table = None
+        yield from _mergePartitions(folder, 0, merge, maxKeys)
+    finally:
+        if folder is not None:
+            shutil.rmtree(folder, ignore_errors=True)
+
+def _mergePartitions(folder, level, merge, maxKeys):
+    for iPartition in range(_SPILL_FANOUT):
+        path = os.path.join(folder, str(iPartition))
+        if not os.path.exists(path): continue
+        # chunks are read back in the order they were written so first and last are preserved
+        merged, subFolder = {}, None
+        for chunk in _chunksIn(path):
+            for k, acc in chunk:
+                prior = merged.get(k, Missing)
+                merged[k] = acc if prior is Missing else merge(prior, acc)
+                if len(merged) > maxKeys and level + 1 < _MAX_SPILL_LEVELS:
+                    subFolder = subFolder or tempfile.mkdtemp(dir=folder)
+                    _spill(merged, subFolder, level + 1)
+                    merged = {}
+        os.remove(path)
+        if subFolder is None:
+            yield from merged.items()
+        else:
+            _spill(merged, subFolder, level + 1)
+            merged = None
+            yield from _mergePartitions(subFolder, level + 1, merge, maxKeys)
+            shutil.rmtree(subFolder, ignore_errors=True)
+
+def _chunksIn(path):
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+def _spill(table, folder, level):
+    partitions = [[] for i in range(_SPILL_FANOUT)]
+    for k, acc in table.items():
+        partitions[(hash(k) if level == 0 else hash((level, k))) % _SPILL_FANOUT].append((k, acc))
+    for iPartition, partition in enumerate(partitions):
+        if partition:
+            with open(os.path.join(folder, str(iPartition)), 'ab') as f:
+                pickle.dump(partition, f, pickle.HIGHEST_PROTOCOL)
+
+
+# external merge sort
+
+_SPILL_CHUNK = 4096         # elements per pickle in a sorted run file
+
+@Pipeable
+def RSort(r, key=None, reverse=False, maxMemory=256 * 1024 * 1024, spillDir=None):
+    """RSort(r, key=None, reverse=False, maxMemory=256MB, spillDir=None)
+    Answers the elements of r sorted (stably). Runs of up to roughly maxMemory bytes (as measured by sys.getsizeof
+    on each element so nested objects are under counted) are sorted in memory and spilled to temporary files that
+    are lazily k-way merged as a forward range. If everything fits in one run a random access range is answered"""
+    run, runs, size, folder = [], [], 0, None
+    try:
+        for x in _elementsOf(r):
+            run.append(x)
+            size += sys.getsizeof(x)
+            if size > maxMemory:
+                folder = folder or tempfile.mkdtemp(prefix='coppertop_rsort_', dir=spillDir)
+                runs.append(_spillRun(run, key, reverse, folder, len(runs)))
+                run, size = [], 0
+    except BaseException:
+        if folder is not None: shutil.rmtree(folder, ignore_errors=True)
+        raise
+    run.sort(key=key, reverse=reverse)
+    if not runs:
+        return IndexableFR(run)
+    return _TeeR(_mergeRuns(runs, run, key, reverse, folder))
+
+def _spillRun(run, key, reverse, folder, i):
+    run.sort(key=key, reverse=reverse)
+    path = os.path.join(folder, str(i))
+    with open(path, 'wb') as f:
+        for j in range(0, len(run), _SPILL_CHUNK):
+            pickle.dump(run[j:j + _SPILL_CHUNK], f, pickle.HIGHEST_PROTOCOL)
+    return path
+
+def _readRun(path):
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                chunk = pickle.load(f)
+            except EOFError:
+                return
+            yield from chunk
+
+def _mergeRuns(paths, lastRun, key, reverse, folder):
+    try:
+        # runs are passed in the order they were read so the merge stays stable
+        yield from heapq.merge(*[_readRun(path) for path in paths], lastRun, key=key, reverse=reverse)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+class _TeeR(IForwardRange):
+    # a forward range over an iterator - save() tees the iterator so only elements between the copies are buffered
+    # as IterIR the iterator is only advanced once empty or front is asked for
+    def __init__(self, it, current=_UNREAD):
+        self.it = it
+        self.current = current
+    @property
+    def empty(self):
+        if self.current is _UNREAD:
+            self.current = next(self.it, Missing)
+        return self.current is Missing
+    @property
+    def front(self):
+        if self.current is _UNREAD:
+            self.current = next(self.it, Missing)
+        return self.current
+    def popFront(self):
+        if self.current is _UNREAD:
+            next(self.it, Missing)
+        self.current = _UNREAD
+    def save(self):
+        self.it, other = itertools.tee(self.it)
+        return _TeeR(other, self.current)
+
+
+# staged pipelines - each stage runs on its own thread connected by bounded queues of batches
+
+class StagedPipeline(object):
+    """StagedPipeline(*stages, queueSize=4, batchSize=1024)
+    e.g. StagedPipeline(Parse, RMap(fn=Enrich), GroupRuns).run(FileLineIR(f), ListOR([]))
+    Each stage is a function that takes an input range and answers a range (or iterable). The source range, each
+    stage and the sink run concurrently, connected by queues holding at most queueSize batches, so slow stages overlap
+    with I/O bound ones and memory is bounded. The first exception raised by any stage is re-raised by run(). After a
+    run stats holds a StageStats for the source, each stage and the sink"""
+
+    def __init__(self, *stages, queueSize=4, batchSize=_BATCH_SIZE):
+        self.stages = stages
+        self.queueSize = queueSize
+        self.batchSize = batchSize
+        self.stats = []
+
+    def run(self, inR, outR):
+        queues = [queue.Queue(self.queueSize) for i in range(len(self.stages) + 1)]
+        stop = threading.Event()
+        self.stats = [StageStats('source')] + [StageStats(_nameOf(stage)) for stage in self.stages] + \
+            [StageStats('sink')]
+        threads = [threading.Thread(target=self._runStage, args=(lambda r: r, inR, queues[0], stop, self.stats[0]))]
+        for i, stage in enumerate(self.stages):
+            inputR = _QueueIR(queues[i], stop, self.stats[i + 1])
+            threads.append(threading.Thread(
+                target=self._runStage, args=(stage, inputR, queues[i + 1], stop, self.stats[i + 1])
+            ))
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            sinkStats = self.stats[-1]
+            t1 = perf_counter()
+            r = _QueueIR(queues[-1], stop, sinkStats)
+            while not r.empty:
+                batch = r.frontBatch(self.batchSize)
+                if hasattr(outR, 'putBatch'):
+                    outR.putBatch(batch)
+                else:
+                    for x in batch:
+                        outR.put(x)
+                sinkStats.items += r.popFrontN(len(batch))
+                sinkStats.batches += 1
+            sinkStats.elapsed = perf_counter() - t1
+        except _UpstreamFailed as ex:
+            raise ex.cause
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        return outR
+
+    def _runStage(self, stage, inputR, q, stop, stats):
+        t1 = perf_counter()
+        try:
+            r = stage(inputR)
+            if not isinstance(r, IInputRange):
+                r = IterIR(r)
+            batchSize = self.batchSize
+            # only ranges that move batches natively are read in batches - the default frontBatch reads a saved
+            # copy of a forward range so e.g. an RMap would compute every element twice
+            while not r.empty:
+                if r.hasBatch:
+                    batch = list(r.frontBatch(batchSize))
+                    r.popFrontN(len(batch))
+                else:
+                    batch = []
+                    while len(batch) < batchSize and not r.empty:
+                        batch.append(r.front)
+                        r.popFront()
+                stats.items += len(batch)
+                stats.batches += 1
+                _put(q, batch, stop, stats)
+            _put(q, _END, stop, stats)
+        except _Stopped:
+            pass
+        except _UpstreamFailed as ex:
+            _put(q, ex, stop, stats, force=True)
+        except BaseException as ex:
+            _put(q, _UpstreamFailed(ex), stop, stats, force=True)
+        finally:
+            stats.elapsed = perf_counter() - t1
+
+
+class StageStats(object):
+    # blockedOnInput / blockedOnOutput - seconds spent waiting on the upstream queue and for room in the downstream
+    # queue, i.e. a stage that is mostly blocked on output is faster than something downstream of it
+    __slots__ = ['name', 'items', 'batches', 'elapsed', 'blockedOnInput', 'blockedOnOutput', 'maxQueueDepth']
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.batches = 0
+        self.elapsed = 0.0
+        self.blockedOnInput = 0.0
+        self.blockedOnOutput = 0.0
+        self.maxQueueDepth = 0
+    @property
+    def throughput(self):
+        return self.items / self.elapsed if self.elapsed else 0.0
+    def __repr__(self):
+        return '%s: %d items in %d batches, %.3fs (%.0f/s), blocked in %.3fs / out %.3fs, max queue %d' % (
+            self.name, self.items, self.batches, self.elapsed, self.throughput, self.blockedOnInput,
+            self.blockedOnOutput, self.maxQueueDepth
+        )
+
+
+class _QueueIR(IInputRange):
+    # the input side of a queue of batches
+    hasBatch = True
+    def __init__(self, q, stop, stats):
+        self.q = q
+        self.stop = stop
+        self.stats = stats
+        self.batch = []
+        self.i = 0
+        self.done = False
+    @property
+    def empty(self):
+        while self.i >= len(self.batch) and not self.done:
+            t1 = perf_counter()
+            item = _get(self.q, self.stop)
+            self.stats.blockedOnInput += perf_counter() - t1
+            if isinstance(item, _UpstreamFailed):
+                raise item
+            self.batch, self.i, self.done = ([], 0, True) if item is _END else (item, 0, False)
+        return self.i >= len(self.batch)
+    @property
+    def front(self):
+        return self.batch[self.i]
+    def popFront(self):
+        self.i += 1
+    def frontBatch(self, n):
+        if self.empty: return []
+        return self.batch[self.i:self.i + n]
+    def popFrontN(self, n):
+        popped = 0
+        while popped < n and not self.empty:
+            k = min(n - popped, len(self.batch) - self.i)
+            self.i += k
+            popped += k
+        return popped
+
+
+_END = object()
+
+class _UpstreamFailed(Exception):
+    def __init__(self, cause):
+        super().__init__(cause)
+        self.cause = cause
+
+class _Stopped(Exception):
+    pass
+
+def _put(q, item, stop, stats, force=False):
+    t1 = perf_counter()
+    while True:
+        if stop.is_set() and not force:
+            raise _Stopped()
+        try:
+            q.put(item, timeout=0.05)
+            break
+        except queue.Full:
+            if stop.is_set():
+                if force: break
+                raise _Stopped()
+    stats.blockedOnOutput += perf_counter() - t1
+    stats.maxQueueDepth = max(stats.maxQueueDepth, q.qsize())
+
+def _get(q, stop):
+    while True:
+        try:
+            return q.get(timeout=0.05)
+        except queue.Empty:
+            if stop.is_set():
+                raise _Stopped()
+
+def _nameOf(stage):
+    return getattr(stage, '__name__', None) or getattr(getattr(stage, '_fnOrClass', None), '__name__', None) \
+        or repr(stage)
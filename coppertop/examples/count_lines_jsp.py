@@ -22,6 +22,7 @@
 # - two are translations from the wikipedia article and the remaining two take the "traditional"
 # program and transform it into range style code - given that CountEquals exhausts
 # the range r I'm not sure how one can claim it is functional.
+# countLinesGroupRuns uses the library's run-length grouping
 
 
 from coppertop import *
@@ -117,6 +118,11 @@ class _RepititionCounter(IInputRange):
 
 
 
+def countLinesGroupRuns(f):
+    return FileLineIR(f) >> GroupRuns >> Materialise
+
+
+
 
 
 # "Jackson criticises the traditional version, claiming that it hides the relationships which exist between
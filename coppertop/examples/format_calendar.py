@@ -55,22 +55,22 @@
 
 
 from coppertop import time
-from coppertop.time import AddPeriod, DaySecond
 from coppertop import *
 from coppertop import Null
 
 # ?datesInYear
 @Pipeable
 def DatesInYear(year):
-     return FnAdapterFRange(year >> _IthDateInYear)
-@Pipeable
-def _IthDateInYear(year, i):
-    ithDate = time.AbstractDate(year, 1, 1) >> AddPeriod(DaySecond(i))
-    return FnAdapterFRange.Empty if ithDate.year != year else ithDate
+    return time.DateRange(time.AbstractDate(year, 1, 1), time.AbstractDate(year + 1, 1, 1))
 
 
 # ?byMonth
-@Pipeable
+@Pipeable(datesR=time.DateRange)
+def MonthChunks(datesR):
+    # the month boundaries are calculated rather than found by testing each date
+    return datesR >> time.ChunkByMonth
+
+@Pipeable(datesR=IForwardRange)
 def MonthChunks(datesR):
     return datesR >> ChunkFROnChangeOf >> (lambda x: x.month)
 
@@ -79,7 +79,15 @@ def MonthChunks(datesR):
 @Pipeable
 def _UntilWeekdayName(datesR, weekdayName):
     return datesR >> Until(f=lambda d: d >> Weekday >> WeekdayName == weekdayName)
-WeekChunks = ChunkUsingSubRangeGenerator(_UntilWeekdayName(weekdayName='Sun'))
+
+@Pipeable(datesR=time.DateRange)
+def WeekChunks(datesR):
+    # weeks run Monday to Sunday
+    return datesR >> time.ChunkByWeek
+
+@Pipeable(datesR=IForwardRange)
+def WeekChunks(datesR):
+    return datesR >> ChunkUsingSubRangeGenerator(_UntilWeekdayName(weekdayName='Sun'))
 
 
 @Pipeable
@@ -18,7 +18,8 @@
 
 
 from coppertop.testing import AssertEqual
-from ..count_lines_jsp import countLinesJsp, countLinesTrad, countLinesRanges1, countLinesRanges2, countLinesRanges3
+from ..count_lines_jsp import countLinesJsp, countLinesTrad, countLinesRanges1, countLinesRanges2, countLinesRanges3, \
+    countLinesGroupRuns
 
 
 home = '/Users/david/shared/repos/github/DangerMouseB/coppertop/coppertop/examples/tests/'
@@ -52,6 +53,10 @@ def main():
         actual = countLinesRanges3(f)
     actual >> AssertEqual >> expected
 
+    with open(home + filename) as f:
+        actual = countLinesGroupRuns(f)
+    actual >> AssertEqual >> expected
+
     print('pass')
 
 
@@ -34,40 +34,51 @@ from __future__ import annotations
 
 
 from typing import Any, Union
-import types, inspect, collections, sys
+import types, inspect, collections, sys, importlib, pickle
 from ._core import Missing
 
 
-# add options to speed up
-# quickBindOneArg
-#       if unary and (), << or >>
-#           immediately execute
-#       else () only
-#           then quickBindHandleOneEllipses (next call (), << or >> will execute)
-
-# quickBindLastArg
-#       if unary
-#           immediately execute
-#       else
-#           if len(args) == len(myArgs)
-#           then execute immediately
-#           else quickBindNoEllipses (next call will execute)
-
-# quickBindNoEllipses - throws error if ellipses? or reverts to quickBindHandleOneEllipses or doesn't check until final call throws an error
-
-# could also add state so PipeableFunction is prepped ready for the last arg
-
-def Pipeable(*args, overrideLHS=False, pipeOnly=False, leftToRight=Missing, rightToLeft=Missing):
+# speed ups
+# the parameters of the wrapped function are parsed once at decoration time into a _Signature that is shared by the
+# PipeableFunction and all its partials. The state of a partial is a tuple of values indexed by parameter position,
+# a bitmask of the unbound slots and a tuple of the slots holding ellipses (in the order they will be filled), so
+# a partial costs one tuple and one small object rather than copies of two dicts.
+#
+# the _Signature also caches a _BindingPlan per mask of unbound slots (i.e. per partial application shape). The plan
+# answers the common cases without the general binding machinery:
+#
+# quickBindLastArg (includes quickBindOneArg for unary functions)
+#       if no ellipses and the args exactly fill the remaining core bindings (and there are no kwargs, ... or na)
+#       then execute immediately
+#       else fall back to the general _bind
+#
+# quickBindNoEllipses
+#       if no ellipses and fewer args than remaining core bindings (and there are no kwargs, ... or na)
+#       then answer a new PipeableFunction with the args filled in order (next call will execute)
+#       else fall back to the general _bind
+
+# overloading
+# @Pipeable(name=type, ...) registers the decorated function as an overload selected by the types of its core
+# (i.e. non-defaulted) parameters. Redefining a function with a different type signature adds to the overloaded
+# pipeable of the same name that is visible in the defining scope (the module, class body or function), much like
+# functools.singledispatch's register, so factories and closures each get their own overload set. The types of
+# the core args are looked up in a cache and on a miss resolved to the overload with the smallest total MRO
+# distance (so subclasses match).
+
+def Pipeable(*args, overrideLHS=False, pipeOnly=False, leftToRight=Missing, rightToLeft=Missing, ufunc=False, **typesByName):
     # overrideLHS allows a higher order function PF2 to override the behaviour of another PipeableFunction PF1
     # for PF1 >> PF2 or PF1 << PF2, i.e. execution order changes from PF1(), PF2() to PF2(), PF1()
+    # ufunc marks a unary function that answers the element-wise result when passed a whole numpy array so higher
+    # order functions such as Each can call it once rather than per element
+    # typesByName - name=type or name=(type1, type2, ...) for each core parameter that is being overloaded
 
     leftToRight, rightToLeft = (True, False) if (leftToRight is Missing and rightToLeft is Missing) else (leftToRight, rightToLeft)
     leftToRight = not rightToLeft if leftToRight is Missing else leftToRight
     rightToLeft = not leftToRight if rightToLeft is Missing else rightToLeft
 
-    def _DecorateWithPF(fnOrClass):
-        coreBindings = {}
-        optionalBindings = {}
+    def _DecorateWithPF(fnOrClass, _scope=None):
+        coreNames = []
+        optionalNames = []
         optionalBindingsReprs = []
         hasKwargs = False
         if isinstance(fnOrClass, type):
@@ -84,74 +95,185 @@ def Pipeable(*args, overrideLHS=False, pipeOnly=False, leftToRight=Missing, righ
                 optionalBindingsReprs.append('**%s' % name)
             else:
                 if parameter.default == inspect.Parameter.empty:
-                    coreBindings[name] = Missing
+                    coreNames.append(name)
                 else:
-                    optionalBindings[name] = Missing
+                    optionalNames.append(name)
                     optionalBindingsReprs.append('%s=%s' % (name, parameter.default))
-        doc = fnOrClass.__doc__ if hasattr(fnOrClass, '__doc__') else ''
-        fnRepr = '%s(%s)' % (fnOrClass.__name__, ', '.join(list(coreBindings.keys()) + optionalBindingsReprs))
-        answer = PipeableFunction(fnOrClass, coreBindings, len(coreBindings), optionalBindings, hasKwargs, overrideLHS, pipeOnly, leftToRight, rightToLeft, doc, fnRepr)
-        return answer
+        fnRepr = '%s(%s)' % (fnOrClass.__name__, ', '.join(coreNames + optionalBindingsReprs))
+        if typesByName:
+            for name in typesByName:
+                if name not in coreNames:
+                    raise TypeError('%s>>can only overload on parameters without defaults, not "%s"' % (fnRepr, name))
+            # the scope the decorator is being applied in - i.e. the caller of _DecorateWithPF
+            scope = sys._getframe(1).f_locals if _scope is None else _scope
+            prior = scope.get(fnOrClass.__name__)
+            if isinstance(prior, PipeableFunction) and isinstance(prior._sig.fnOrClass, _Dispatcher) \
+                    and prior._sig.qualname == fnOrClass.__qualname__:
+                dispatcher = prior._sig.fnOrClass
+                if prior._sig.names != tuple(coreNames + optionalNames) or prior._sig.hasKwargs != hasKwargs:
+                    raise TypeError('%s>>overloads must have the same parameters as %s' % (fnRepr, prior._sig.fnRepr))
+                dispatcher.register(typesByName, fnOrClass)
+                return prior
+            dispatcher = _Dispatcher(fnOrClass.__name__, coreNames)
+            dispatcher.register(typesByName, fnOrClass)
+            fnOrClass, target = dispatcher, fnOrClass
+        else:
+            target = fnOrClass
+        doc = target.__doc__ if hasattr(target, '__doc__') else ''
+        sig = _Signature(fnOrClass, coreNames, optionalNames, hasKwargs, overrideLHS, pipeOnly, leftToRight, rightToLeft, doc, fnRepr, target, ufunc)
+        return PipeableFunction(sig, sig.initialValues, sig.allMask, (), None)
 
     if len(args) == 1 and isinstance(args[0], (types.FunctionType, types.MethodType, type)):
         # of form @Pipeable so args[0] is the function or class being decorated
-        return _DecorateWithPF(args[0])
+        return _DecorateWithPF(args[0], sys._getframe(1).f_locals)
     else:
         # of form as @Pipeable() or @Pipeable(overrideLHS=True) etc
         return _DecorateWithPF
 
 
+class _Dispatcher(object):
+    # selects an overload by the types of the core args (which are always passed positionally)
+    __slots__ = ['__name__', '_coreNames', '_fnByTypes', '_fnByArgTypes']
+
+    def __init__(self, name, coreNames):
+        self.__name__ = name
+        self._coreNames = coreNames
+        self._fnByTypes = {}            # declared types -> fn
+        self._fnByArgTypes = {}         # cache of actual arg types -> fn
+
+    def register(self, typesByName, fn):
+        self._fnByTypes[tuple(typesByName.get(name, object) for name in self._coreNames)] = fn
+        self._fnByArgTypes.clear()
+        return self
+
+    def __call__(self, *args, **kwargs):
+        argTypes = tuple(type(arg) for arg in args)
+        fn = self._fnByArgTypes.get(argTypes)
+        if fn is None:
+            fn = self._fnByArgTypes[argTypes] = self._resolve(argTypes)
+        return fn(*args, **kwargs)
+
+    def _resolve(self, argTypes):
+        best, bestDistance, isAmbiguous = None, None, False
+        for declaredTypes, fn in self._fnByTypes.items():
+            distance = 0
+            for argType, declaredType in zip(argTypes, declaredTypes):
+                d = _typeDistance(argType, declaredType)
+                if d is None:
+                    break
+                distance += d
+            else:
+                if best is None or distance < bestDistance:
+                    best, bestDistance, isAmbiguous = fn, distance, False
+                elif distance == bestDistance:
+                    isAmbiguous = True
+        argNames = ', '.join(t.__name__ for t in argTypes)
+        if best is None:
+            raise TypeError('%s>>no overload matches (%s)' % (self.__name__, argNames))
+        if isAmbiguous:
+            raise TypeError('%s>>more than one overload matches (%s)' % (self.__name__, argNames))
+        return best
+
+def _typeDistance(argType, declaredType):
+    # answers how many steps up the MRO of argType declaredType is or None if argType isn't a subtype
+    if isinstance(declaredType, tuple):
+        distances = [d for d in (_typeDistance(argType, t) for t in declaredType) if d is not None]
+        return min(distances) if distances else None
+    mro = argType.__mro__
+    if declaredType in mro:
+        return mro.index(declaredType)
+    if issubclass(argType, declaredType):
+        # e.g. virtual subclasses of an abc - further than anything in the mro
+        return len(mro)
+    return None
+
+
+class _Signature(object):
+    # the parts of a PipeableFunction that don't change as arguments are bound - shared between partials
+    __slots__ = [
+        'fnOrClass', 'names', 'numCore', 'indexByName', 'coreMask', 'allMask', 'initialValues', 'hasKwargs',
+        'overrideLHS', 'pipeOnly', 'leftToRight', 'rightToLeft', 'doc', 'fnRepr', 'plans', 'module', 'qualname',
+        'isUfunc'
+    ]
+
+    def __init__(self, fnOrClass, coreNames, optionalNames, hasKwargs, overrideLHS, pipeOnly, leftToRight, rightToLeft, doc, fnRepr, target, isUfunc):
+        self.fnOrClass = fnOrClass
+        self.module = target.__module__
+        self.qualname = target.__qualname__
+        self.names = tuple(coreNames + optionalNames)
+        self.numCore = len(coreNames)
+        self.indexByName = {name: i for i, name in enumerate(self.names)}
+        self.coreMask = (1 << self.numCore) - 1
+        self.allMask = (1 << len(self.names)) - 1
+        self.initialValues = (Missing,) * len(self.names)
+        self.hasKwargs = hasKwargs
+        self.overrideLHS = overrideLHS
+        self.pipeOnly = pipeOnly
+        self.leftToRight = leftToRight
+        self.rightToLeft = rightToLeft
+        self.doc = doc
+        self.fnRepr = fnRepr
+        self.plans = {}
+        self.isUfunc = isUfunc
+
+    def planFor(self, unbound):
+        plan = self.plans.get(unbound)
+        if plan is None:
+            plan = self.plans[unbound] = _BindingPlan(self, unbound)
+        return plan
+
+
 class PipeableFunction(object):
     # PipeableFunction accumulates arguments via () ,<< or >>
     # when it has enough arguments it calls the wrapped function
-    __slots__ = [
-        '_fnOrClass', '_hasKwargs', '_overrideLHS', '_pipeOnly', '_leftToRight', '_rightToLeft',
-        '_doc', '_coreBindings', '_optionalBindings', '_fnRepr', '_numAvailableCoreBindings'
-    ]
+    __slots__ = ['_sig', '_values', '_unbound', '_ellipses', '_kwargs']
+
+    def __init__(self, sig, values, unbound, ellipses, kwargs):
+        self._sig = sig
+        self._values = values           # tuple indexed by parameter position
+        self._unbound = unbound         # bitmask of the slots that are Missing or hold an ellipsis
+        self._ellipses = ellipses       # tuple of the slots holding ellipses in the order they were added
+        self._kwargs = kwargs           # dict of any extra keyword arguments or None
+
+    @property
+    def _fnOrClass(self):
+        return self._sig.fnOrClass
+
+    @property
+    def _doc(self):
+        return self._sig.doc
 
-    def __init__(self, fn, coreBindings, numAvailableCoreBindings, optionalBindings, hasKwargs, overrideLHS, pipeOnly, leftToRight, rightToLeft, doc, fnRepr):
-        self._fnOrClass = fn
-        self._coreBindings = coreBindings
-        self._numAvailableCoreBindings = numAvailableCoreBindings
-        self._optionalBindings = optionalBindings
-        self._hasKwargs = hasKwargs
-        self._overrideLHS = overrideLHS
-        self._pipeOnly = pipeOnly
-        self._leftToRight = leftToRight
-        self._rightToLeft = rightToLeft
-        self._doc = doc
-        self._fnRepr = fnRepr
-
-    def _copy(self) -> PipeableFunction:
-        return PipeableFunction(
-            self._fnOrClass,
-            dict(self._coreBindings),
-            self._numAvailableCoreBindings, 
-            dict(self._optionalBindings),
-            self._hasKwargs,
-            self._overrideLHS,
-            self._pipeOnly,
-            self._leftToRight,
-            self._rightToLeft,
-            self._doc,
-            self._fnRepr
-        )
+    @property
+    def _overrideLHS(self):
+        return self._sig.overrideLHS
+
+    @property
+    def _numAvailableCoreBindings(self) -> int:
+        return bin(self._unbound & self._sig.coreMask).count('1')
 
     def __repr__(self) -> str:
         # for pretty display in pycharm debugger
-        return 'Pipeable=>%s' % self._fnRepr
+        return 'Pipeable=>%s' % self._sig.fnRepr
+
+    def __reduce__(self):
+        # pickled by reference to the module level pipeable plus the bound state, e.g. for sending to a process pool
+        sig = self._sig
+        found = _pipeableAt(sig.module, sig.qualname)
+        if found is None or found._sig is not sig:
+            raise pickle.PicklingError("Can't pickle %s as it is not found as %s.%s" % (self, sig.module, sig.qualname))
+        return _unpicklePipeable, (sig.module, sig.qualname, self._values, self._unbound, self._ellipses, self._kwargs)
 
     def __call__(self, *args, **kwargs) -> Any:
         """Appends args and kwargs to the list of arguments for the function and returns the result"""
-        if self._pipeOnly:
-            raise TypeError('Cannot add arguments to %s using ()' % self._fnOrClass.__name__)
+        if self._sig.pipeOnly:
+            raise TypeError('Cannot add arguments to %s using ()' % self._sig.fnOrClass.__name__)
         return self._bindAndCall(*args, **kwargs)
 
     def __rrshift__(self, lhs: Any) -> Any:
         # lhs >> self
         """Appends LHS to the list of arguments for the function and returns the result"""
-        if not self._leftToRight:
-            raise TypeError('Cannot add arguments to %s with >>' % self._fnOrClass.__name__)
+        if not self._sig.leftToRight:
+            raise TypeError('Cannot add arguments to %s with >>' % self._sig.fnOrClass.__name__)
         if isinstance(lhs, _Arg):
             return self._bindAndCall(lhs.arg)
         elif isinstance(lhs, _Args):
@@ -164,11 +286,11 @@ class PipeableFunction(object):
     def __rshift__(self, rhs: Any) -> Any:
         # self >> rhs
         """Appends RHS to the list of arguments for the function and returns the result"""
-        if isinstance(rhs, (PipeableFunction,)) and rhs._overrideLHS and rhs._leftToRight:
+        if isinstance(rhs, (PipeableFunction,)) and rhs._sig.overrideLHS and rhs._sig.leftToRight:
             return rhs.__rrshift__(self)
         else:
-            if not self._leftToRight:
-                raise TypeError('Cannot add arguments to %s with >>' % self._fnOrClass.__name__)
+            if not self._sig.leftToRight:
+                raise TypeError('Cannot add arguments to %s with >>' % self._sig.fnOrClass.__name__)
             if isinstance(rhs, _Arg):
                 return self._bindAndCall(rhs.arg)
             elif isinstance(rhs, _Args):
@@ -181,27 +303,27 @@ class PipeableFunction(object):
     def __rlshift__(self, lhs: Any) -> Any:
         # lhs << self
         """Appends LHS to the list of arguments for the function and returns the LHS"""
-        if not self._rightToLeft:
-            raise TypeError('Cannot add arguments to %s with <<' % self._fnOrClass.__name__)
+        if not self._sig.rightToLeft:
+            raise TypeError('Cannot add arguments to %s with <<' % self._sig.fnOrClass.__name__)
         if self._numAvailableCoreBindings != 1:
             raise TypeError(
                 'Can only call %s with << when there is only one available core binding. Currently there are %s' % (
-                self._fnOrClass.__name__, self._numAvailableCoreBindings))
+                self._sig.fnOrClass.__name__, self._numAvailableCoreBindings))
         self._bindAndCall(lhs)
         return lhs
 
     def __lshift__(self, rhs: Any) -> Any:
         # self << rhs
         """Appends RHS to the list of arguments for the function and returns the LHS (i.e. self)"""
-        if isinstance(rhs, (PipeableFunction,)) and rhs._overrideLHS and rhs._rightToLeft:
+        if isinstance(rhs, (PipeableFunction,)) and rhs._sig.overrideLHS and rhs._sig.rightToLeft:
             return rhs.__rrshift__(self)
         else:
-            if not self._rightToLeft:
-                raise TypeError('Cannot add arguments to %s with <<' % self._fnOrClass.__name__)
+            if not self._sig.rightToLeft:
+                raise TypeError('Cannot add arguments to %s with <<' % self._sig.fnOrClass.__name__)
             if self._numAvailableCoreBindings != 1:
                 raise TypeError(
                     'Can only call %s with << when there is only one available core binding. Current there are %s' % (
-                    self._fnOrClass.__name__, self._numAvailableCoreBindings))
+                    self._sig.fnOrClass.__name__, self._numAvailableCoreBindings))
             self._bindAndCall(rhs)
             return self
 
@@ -209,127 +331,165 @@ class PipeableFunction(object):
         # _bindAndCall is slightly easier to step through in a debugger
         bindResult = self._bind(*args, **kwargs)
         if isinstance(bindResult, tuple):
-            return self._fnOrClass(*bindResult[0], **bindResult[1])
+            return self._sig.fnOrClass(*bindResult[0], **bindResult[1])
         else:
             return bindResult
 
 
-    def _bind(oldself, *args, **kwargs):
-        self = oldself._copy()
-
-        availableCoreBindings = {k: v for (k, v) in self._coreBindings.items() if (isinstance(v, _ELLIPSIS) or v is Missing)}
-        availableOptionalBindings = {k: v for (k, v) in self._optionalBindings.items() if(isinstance(v, _ELLIPSIS) or v is Missing)}
-
-        def filterAndSort(bindingItems):
-            bindingItems = [(k,v) for (k,v) in bindingItems if isinstance(v, _ELLIPSIS)]
-            bindingItems.sort(key=lambda x: x[1].id)
-            return bindingItems
-        coreBindingsWithEllipsis = filterAndSort(availableCoreBindings.items())
-        optionalBindingsWithEllipsis = filterAndSort(availableOptionalBindings.items())
+    def _bind(self, *args, **kwargs):
+        if not (kwargs or self._ellipses):
+            plan = self._sig.plans.get(self._unbound)
+            if plan is None:
+                plan = self._sig.planFor(self._unbound)
+            if len(args) <= plan.numMissing:
+                for arg in args:
+                    if arg is ... or arg is na:
+                        break
+                else:
+                    return plan.bind(self, args)
+        return self._slowBind(args, kwargs)
+
+    def _slowBind(self, args, kwargs):
+        sig = self._sig
+        values = list(self._values)
+        unbound = self._unbound
+        ellipsesMask = 0
+        for i in self._ellipses:
+            ellipsesMask |= 1 << i
+        # ellipses are filled in the order they were added but core ones take priority over optional ones
+        coreEllipses = [i for i in self._ellipses if i < sig.numCore]
+        optionalEllipses = [i for i in self._ellipses if i >= sig.numCore]
+        addedEllipses = []
+        addedEllipsesMask = 0
+        addedArgEllipsis = False
+        skippedMask = 0             # slots passed over with na - they stay unbound for later calls
 
         # process each arg finding it a home
-        addedArgEllipsis = False
-        addedKwargEllipsis = False
-        checkForEllipsis = True
-        checkForMissing = True
-        while args:
-            arg = args[0]
+        for arg in args:
+            if coreEllipses:
+                i = coreEllipses.pop(0)
+            elif optionalEllipses:
+                i = optionalEllipses.pop(0)
+            else:
+                # once the ellipses have been exhausted fill the Missing - lower slots (i.e. core first) take priority
+                free = unbound & ~(ellipsesMask | addedEllipsesMask | skippedMask)
+                if not free:
+                    raise TypeError('%s>>Number of args passed in > number of unbound parameters' % sig.fnRepr)
+                i = (free & -free).bit_length() - 1
+            ellipsesMask &= ~(1 << i)
             if arg is ...:
-                arg = _ADDING_ELLIPSIS()
                 addedArgEllipsis = True
+                addedEllipses.append(i)
+                addedEllipsesMask |= 1 << i
+                values[i] = Missing
             elif arg is na:
-                arg = Missing
-            if checkForEllipsis:
-                # fill the _ELLIPSIS first
-                checkForEllipsis = False
-                if coreBindingsWithEllipsis:
-                    name, v = coreBindingsWithEllipsis[0]
-                    self._coreBindings[name] = arg
-                    del availableCoreBindings[name]
-                    del coreBindingsWithEllipsis[0]
-                    checkForEllipsis = True
-                    args = args[1:]
-                    arg = _PROCESSED
-                if arg is not _PROCESSED:
-                    if optionalBindingsWithEllipsis:
-                        name, v = optionalBindingsWithEllipsis[0]
-                        self._optionalBindings[name] = arg
-                        del availableOptionalBindings[name]
-                        del optionalBindingsWithEllipsis[0]
-                        checkForEllipsis = True
-                        args = args[1:]
-                        arg = _PROCESSED
-                if arg is _PROCESSED:
-                    continue
-            if checkForMissing:
-                # once the _ELLIPSIS have been exhausted fill the Missing
-                checkForMissing = False
-                for name, v in availableCoreBindings.items():
-                    if v is Missing:
-                        self._coreBindings[name] = arg
-                        del availableCoreBindings[name]
-                        checkForMissing = True
-                        args = args[1:]
-                        arg = _PROCESSED
-                        break
-                if arg is not _PROCESSED:
-                    for name, v in availableOptionalBindings.items():
-                        if v is Missing:
-                            self._optionalBindings[name] = arg
-                            del availableOptionalBindings[name]
-                            checkForMissing = True
-                            args = args[1:]
-                            arg = _PROCESSED
-                            break
-                if arg is _PROCESSED:
-                    continue
-            if arg is not _PROCESSED:
-                raise TypeError('%s>>Number of args passed in > number of unbound parameters' % self._fnRepr)
+                skippedMask |= 1 << i
+                values[i] = Missing
+            else:
+                values[i] = arg
+                unbound &= ~(1 << i)
 
         # process each kwarg finding it a home
+        extraKwargs = self._kwargs
         for name, arg in kwargs.items():
-            if arg is ...:
-                arg = _ADDING_ELLIPSIS()
-                addedKwargEllipsis = True
-            if name in availableCoreBindings:
-                coreValue = availableCoreBindings[name]
-                if isinstance(coreValue, _ELLIPSIS) or coreValue is Missing:
-                    self._coreBindings[name] = arg
-                    del availableCoreBindings[name]
-                    continue
-            if name in availableOptionalBindings:
-                optionalValue = availableOptionalBindings[name]
-                if isinstance(optionalValue, _ELLIPSIS) or optionalValue is Missing:
-                    self._optionalBindings[name] = arg
-                    del availableOptionalBindings[name]
+            i = sig.indexByName.get(name)
+            if i is not None:
+                if unbound & ~addedEllipsesMask & (1 << i):
+                    if ellipsesMask & (1 << i):
+                        ellipsesMask &= ~(1 << i)
+                        if i < sig.numCore:
+                            coreEllipses.remove(i)
+                        else:
+                            optionalEllipses.remove(i)
+                    if arg is ...:
+                        addedEllipses.append(i)
+                        addedEllipsesMask |= 1 << i
+                        values[i] = Missing
+                    else:
+                        values[i] = arg
+                        unbound &= ~(1 << i)
                     continue
-            if self._hasKwargs:
-                self._optionalBindings[name] = arg
+            elif sig.hasKwargs and arg is not ...:
+                extraKwargs = dict(extraKwargs) if extraKwargs else {}
+                extraKwargs[name] = arg
                 continue
-            raise TypeError('%s>>No unbound parameter available for arg named "%s"' % (self._fnRepr, name))
-
+            raise TypeError('%s>>No unbound parameter available for arg named "%s"' % (sig.fnRepr, name))
 
         if addedArgEllipsis:
-            if len(availableCoreBindings) > 0:
-                raise TypeError('%s>>... - number of args passed in < number of unbound parameters' % self._fnRepr)
-
-        if addedArgEllipsis or addedKwargEllipsis:
-            for name, arg in self._coreBindings.items():
-                if isinstance(arg, _ADDING_ELLIPSIS):
-                    self._coreBindings[name] = _ELLIPSIS(arg.id)
-            for name, arg in self._optionalBindings.items():
-                if isinstance(arg, _ADDING_ELLIPSIS):
-                    self._optionalBindings[name] = _ELLIPSIS(arg.id)
-
-        self._numAvailableCoreBindings = len(availableCoreBindings) 
-        if not (addedArgEllipsis or addedKwargEllipsis) and self._numAvailableCoreBindings == 0:
-            return (
-                list(self._coreBindings.values()),
-                {k:v for k,v in self._optionalBindings.items() if v is not Missing}
-            )
-        else:
-            return self
+            if unbound & sig.coreMask & ~addedEllipsesMask:
+                raise TypeError('%s>>... - number of args passed in < number of unbound parameters' % sig.fnRepr)
 
+        if not addedEllipses and not (unbound & sig.coreMask):
+            return values[:sig.numCore], _callKwargs(sig, values, unbound, extraKwargs)
+        else:
+            ellipses = tuple(i for i in self._ellipses if ellipsesMask & (1 << i)) + tuple(addedEllipses)
+            return PipeableFunction(sig, tuple(values), unbound, ellipses, extraKwargs)
+
+
+def _pipeableAt(module, qualname):
+    answer = sys.modules.get(module) or importlib.import_module(module)
+    try:
+        for name in qualname.split('.'):
+            answer = getattr(answer, name)
+    except AttributeError:
+        return None
+    return answer if isinstance(answer, PipeableFunction) else None
+
+def _unpicklePipeable(module, qualname, values, unbound, ellipses, kwargs):
+    return PipeableFunction(_pipeableAt(module, qualname)._sig, values, unbound, ellipses, kwargs)
+
+
+def _callKwargs(sig, values, unbound, extraKwargs):
+    # answers the optional arguments that have been bound (and any extra kwargs) as a dict suitable for **
+    kwargs = {}
+    for i in range(sig.numCore, len(sig.names)):
+        if not (unbound & (1 << i)) and values[i] is not Missing:
+            kwargs[sig.names[i]] = values[i]
+    if extraKwargs:
+        kwargs.update(extraKwargs)
+    return kwargs
+
+
+class _BindingPlan(object):
+    # precomputed for a given mask of unbound slots (with no ellipses) so that positional binding can be done
+    # without searching for available bindings
+    __slots__ = ['numMissing', 'missingPositions', 'numCore', 'optionalBound', 'partialMasks']
+
+    def __init__(self, sig, unbound):
+        self.missingPositions = tuple(i for i in range(sig.numCore) if unbound & (1 << i))
+        self.numMissing = len(self.missingPositions)
+        self.numCore = sig.numCore
+        self.optionalBound = (sig.allMask & ~sig.coreMask & ~unbound) != 0
+        # the unbound mask of the partial answered when the first n missing slots are filled
+        self.partialMasks = []
+        mask = unbound
+        for i in self.missingPositions:
+            mask &= ~(1 << i)
+            self.partialMasks.append(mask)
+
+    def bind(self, pf, args):
+        numArgs = len(args)
+        if numArgs == self.numMissing:
+            # enough args to call the function
+            if self.optionalBound or pf._kwargs:
+                kwargs = _callKwargs(pf._sig, pf._values, pf._unbound, pf._kwargs)
+            else:
+                kwargs = _NO_KWARGS
+            if numArgs == self.numCore:
+                return args, kwargs
+            values = list(pf._values[:self.numCore])
+            for i, arg in zip(self.missingPositions, args):
+                values[i] = arg
+            return values, kwargs
+        # answer a partial - PipeableFunctions are immutable so no args means no change
+        if not numArgs:
+            return pf
+        values = list(pf._values)
+        for i, arg in zip(self.missingPositions, args):
+            values[i] = arg
+        return PipeableFunction(pf._sig, tuple(values), self.partialMasks[numArgs - 1], (), pf._kwargs)
+
+_NO_KWARGS = {}
 
 
 class _Arg(object):
@@ -371,34 +531,3 @@ if not hasattr(sys, '_NA'):
             return 'na'
     sys._NA = _NA()
 na = sys._NA
-
-
-_ellipsisSeed = 0
-class _ADDING_ELLIPSIS(object):
-    def __init__(self):
-        global _ellipsisSeed
-        _ellipsisSeed += 1
-        self.id = _ellipsisSeed
-    # def __str__(self):
-    #     return '_ADDING_ELLIPSIS'
-    def __repr__(self):
-        # for pretty display in pycharm debugger
-        return '_ADDING_ELLIPSIS(%s)' % self.id
-
-class _ELLIPSIS(object):
-    def __init__(self, id):
-        self.id = id
-    def __repr__(self):
-        # for pretty display in pycharm debugger
-        return '_ELLIPSIS(%s)' % self.id
-
-if not hasattr(sys, '_PROCESSED'):
-    class _PROCESSED(object):
-        # def __str__(self):
-        #     return '_PROCESSED'
-        def __repr__(self):
-            # for pretty display in pycharm debugger
-            return '_PROCESSED'
-    sys._PROCESSED = _PROCESSED()
-_PROCESSED = sys._PROCESSED
-
@@ -20,7 +20,7 @@
 from __future__ import annotations
 
 from coppertop import Pipeable
-from typing import Any, Union
+from typing import Any, Union, Sequence
 import sys
 
 
@@ -28,8 +28,16 @@ import sys
 # front - returns the buffer
 # popFront() - sets an internal flag that tells empty to read the next element when called
 # moveFront() - moves to the start
+#
+# optional batch extension - lets a consumer move many elements per call rather than three calls per element
+# hasBatch - True if frontBatch and popFrontN are implemented natively
+# frontBatch(n) - answers a sequence of up to n elements from the front without popping them
+# popFrontN(n) - pops up to n elements and answers the number popped
+# the defaults fall back to the one element protocol (frontBatch needs save() so isn't available for input ranges)
 
 class IInputRange(object):
+    hasBatch = False
+
     @property
     def empty(self) -> bool:
         raise NotImplementedError()
@@ -41,6 +49,22 @@ class IInputRange(object):
     def moveFront(self) -> Any:
         raise NotImplementedError()
 
+    def frontBatch(self, n: int) -> Sequence:
+        if not isinstance(self, IForwardRange):
+            raise NotImplementedError()
+        r = self.save()
+        answer = []
+        while len(answer) < n and not r.empty:
+            answer.append(r.front)
+            r.popFront()
+        return answer
+    def popFrontN(self, n: int) -> int:
+        i = 0
+        while i < n and not self.empty:
+            self.popFront()
+            i += 1
+        return i
+
     # assignable
     @front.setter
     def front(self, value: Any) -> None:
@@ -116,3 +140,49 @@ class IOutputRange(object):
     def put(self, value: Any):
         """Answers void"""
         raise NotImplementedError()
+    def putBatch(self, values: Sequence):
+        """Answers void"""
+        for value in values:
+            self.put(value)
+
+
+# async ranges - for sources such as sockets and subprocess pipes where a blocking popFront would stall the event loop
+# await empty() - checks for end-of-input and fills the one-element buffer, i.e. the point at which the range may
+#     wait for input
+# front - returns the buffer (only valid after empty() has answered False)
+# popFront() - marks the buffer as used so the next empty() reads the next element
+
+class IAsyncInputRange(object):
+    async def empty(self) -> bool:
+        raise NotImplementedError()
+    @property
+    def front(self) -> Any:
+        raise NotImplementedError()
+    def popFront(self) -> None:
+        raise NotImplementedError()
+
+    # python async iterator interface
+    @property
+    def _GetAIRIter(self):
+        return IAsyncInputRange._AIter(self)
+
+    class _AIter(object):
+        def __init__(self, r):
+            self.r = r
+        def __aiter__(self):
+            return self
+        async def __anext__(self) -> Any:
+            if await self.r.empty(): raise StopAsyncIteration
+            answer = self.r.front
+            self.r.popFront()
+            return answer
+
+@Pipeable(leftToRight=True, pipeOnly=True)
+def GetAIRIter(r):
+    return r._GetAIRIter
+
+
+class IAsyncOutputRange(object):
+    async def put(self, value: Any):
+        """Answers void"""
+        raise NotImplementedError()
@@ -27,11 +27,13 @@
 
 
 from __future__ import annotations
-import sys, types
+import sys, types, os, io, re, mmap, collections, functools, itertools, inspect, asyncio
+from itertools import accumulate
 
 from coppertop import Pipeable, PipeableFunction
-from ._core import Null
-from .range_interfaces import IForwardRange, IOutputRange, IInputRange, IRandomAccessInfinite
+from ._core import Null, Missing
+from .range_interfaces import IForwardRange, IOutputRange, IInputRange, IRandomAccessInfinite, IRandomAccessFinite, \
+    GetIRIter, IAsyncInputRange, IAsyncOutputRange
 
 
 @Pipeable
@@ -125,6 +127,47 @@ class _Chunk(IForwardRange):
         return '_Chunk(%s)' % self.curF
 
 
+@Pipeable
+def GroupRuns(r, key=None, agg='count', seed=Missing):
+    """GroupRuns(r, key=None, agg='count', seed=Missing) - answers an input range of (key, aggregate) for each run of
+    consecutive elements with equal key(element), evaluating key once per element in a single pass
+    agg - 'count', 'sum', 'min', 'max', 'first', 'last' or a fold f(acc, element) which is seeded with the first
+    element of the run unless seed is given"""
+    if isinstance(agg, str):
+        if agg not in _RUN_AGGS:
+            raise ValueError('Unknown agg %r, must be one of %s or a function' % (agg, ', '.join(_RUN_AGGS)))
+        aggFn = _RUN_AGGS[agg]
+    elif seed is Missing:
+        aggFn = lambda run: functools.reduce(agg, run)
+    else:
+        aggFn = lambda run: functools.reduce(agg, run, seed)
+    return IterIR((k, aggFn(run)) for k, run in itertools.groupby(_elementsOf(r), key))
+
+_RUN_AGGS = dict(
+    count=lambda run: sum(1 for _ in run),
+    sum=sum,
+    min=min,
+    max=max,
+    first=next,
+    last=lambda run: collections.deque(run, maxlen=1)[0],
+)
+
+def _elementsOf(r):
+    # a python iterator over a range (or iterable) that moves batches where the range supports them
+    if not isinstance(r, IInputRange):
+        yield from r
+    elif r.hasBatch:
+        while not r.empty:
+            batch = r.frontBatch(_BATCH_SIZE)
+            r.popFrontN(len(batch))
+            yield from batch
+    else:
+        while not r.empty:
+            x = r.front
+            r.popFront()
+            yield x
+
+
 @Pipeable
 class Until(IForwardRange):
     def __init__(self, r, f):
@@ -173,23 +216,93 @@ class ChunkUsingSubRangeGenerator(IForwardRange):
         return new
 
 
+_BATCH_SIZE = 1024         # default number of elements moved per call by consumers that use the batch extension
+_READ_HINT = 65536          # approximate number of bytes read per batch by file ranges
+
+
 @Pipeable
-class IndexableFR(IForwardRange):
-    def __init__(self, indexable):
+class IndexableFR(IRandomAccessFinite):
+    # a zero-copy slice [i, hi) of a list, tuple, array, ndarray etc - the buffer is shared so save() and slicing
+    # are O(1)
+    hasBatch = True
+    def __init__(self, indexable, i=0, hi=None):
         self.indexable = indexable
-        self.i= 0
+        self.i = i
+        self.hi = len(indexable) if hi is None else hi
     @property
     def empty(self):
-        return self.i >= len(self.indexable)
+        return self.i >= self.hi
     @property
     def front(self):
+        if self.i >= self.hi: raise IndexError('front of an empty range')
         return self.indexable[self.i]
+    @front.setter
+    def front(self, value):
+        if self.i >= self.hi: raise IndexError('front of an empty range')
+        self.indexable[self.i] = value
     def popFront(self):
         self.i += 1
+    @property
+    def back(self):
+        if self.i >= self.hi: raise IndexError('back of an empty range')
+        return self.indexable[self.hi - 1]
+    @back.setter
+    def back(self, value):
+        if self.i >= self.hi: raise IndexError('back of an empty range')
+        self.indexable[self.hi - 1] = value
+    def popBack(self):
+        self.hi -= 1
+    @property
+    def length(self):
+        return max(0, self.hi - self.i)
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self.length)
+            if step != 1:
+                raise TypeError('only contiguous slices are supported')
+            return IndexableFR(self.indexable, self.i + start, self.i + max(start, stop))
+        return self.indexable[self.i + self._checkedIndex(i)]
+    def __setitem__(self, i, value):
+        self.indexable[self.i + self._checkedIndex(i)] = value
+    def _checkedIndex(self, i):
+        n = self.length
+        if i < 0: i += n
+        if not 0 <= i < n:
+            raise IndexError('range index out of range')
+        return i
+    def frontBatch(self, n):
+        return self.indexable[self.i:min(self.i + n, self.hi)]
+    def popFrontN(self, n):
+        n = max(0, min(n, self.hi - self.i))
+        self.i += n
+        return n
     def save(self):
-        new = IndexableFR(self.indexable.__class__(self.indexable))
-        new.i = self.i
-        return new
+        return IndexableFR(self.indexable, self.i, self.hi)
+
+
+_UNREAD = object()
+
+@Pipeable
+class IterIR(IInputRange):
+    # adapts a python iterable (e.g. a generator) into an input range - single pass so no save
+    # nothing is pulled from the iterator until empty or front is first asked for
+    def __init__(self, iterable):
+        self.it = iter(iterable)
+        self.current = _UNREAD
+    @property
+    def empty(self):
+        if self.current is _UNREAD:
+            self.current = next(self.it, EMPTY)
+        return self.current is EMPTY
+    @property
+    def front(self):
+        if self.current is _UNREAD:
+            self.current = next(self.it, EMPTY)
+        return self.current
+    def popFront(self):
+        if self.current is _UNREAD:
+            next(self.it, EMPTY)
+        self.current = _UNREAD
 
 
 @Pipeable
@@ -198,6 +311,8 @@ class ListOR(IOutputRange):
         self.list = list
     def put(self, value):
         self.list.append(value)
+    def putBatch(self, values):
+        self.list.extend(values)
 
 
 @Pipeable
@@ -228,6 +343,19 @@ class ChainAsSingleRange(IForwardRange):
 @Pipeable
 def Materialise(r):
     answer = _MaterialisedRange()
+    if r.hasBatch:
+        while not r.empty:
+            batch = r.frontBatch(_BATCH_SIZE)
+            n = len(batch)
+            for i, e in enumerate(batch):
+                if isinstance(e, IInputRange):
+                    n = i
+                    break
+            answer.extend(batch if n == len(batch) else batch[:n])
+            r.popFrontN(n)
+            if n < len(batch):
+                # sub ranges may share state with r so continue one element at a time
+                break
     while not r.empty:
         e = r.front
         if isinstance(e, IInputRange) and not isinstance(e, IRandomAccessInfinite):
@@ -261,55 +389,276 @@ class RMap(IForwardRange):
         self.r.popFront()
     def save(self):
         return RMap(self.r.save(), self.f)
+    @property
+    def hasBatch(self):
+        return self.r.hasBatch
+    def frontBatch(self, n):
+        f = self.f
+        return [f(x) for x in self.r.frontBatch(n)]
+    def popFrontN(self, n):
+        return self.r.popFrontN(n)
 
 
 @Pipeable
 class FileLineIR(IInputRange):
+    # lines are read one at a time via readline unless a batch is asked for in which case they are read ahead
+    hasBatch = True
     def __init__(self, f, stripNL=False):
         self.f = f
-        self.line = self.f.readline()
+        self.stripNL = stripNL
+        self.lines = []
+        self.i = 0
+        self._fill(1)
     @property
     def empty(self):
-        return self.line == ''
+        return self.i >= len(self.lines)
     @property
     def front(self):
-        return self.line
+        return self.lines[self.i]
     def popFront(self):
-        self.line = self.f.readline()
+        self.i += 1
+        if self.i >= len(self.lines):
+            self._fill(1)
+    def frontBatch(self, n):
+        if len(self.lines) - self.i < n:
+            self._fill(n)
+        return self.lines[self.i:self.i + n]
+    def popFrontN(self, n):
+        popped = 0
+        while popped < n and not self.empty:
+            k = min(n - popped, len(self.lines) - self.i)
+            self.i += k
+            popped += k
+            if self.i >= len(self.lines):
+                self._fill(max(1, n - popped))
+        return popped
+    def _fill(self, n):
+        # ensures at least n lines are buffered from i unless the file is exhausted
+        del self.lines[:self.i]
+        self.i = 0
+        while len(self.lines) < n:
+            if n == 1:
+                line = self.f.readline()
+                if not line: break
+                self.lines.append(_stripNL(line) if self.stripNL else line)
+            else:
+                lines = self.f.readlines(_READ_HINT)
+                if not lines: break
+                self.lines.extend([_stripNL(line) for line in lines] if self.stripNL else lines)
+
+def _stripNL(line):
+    return line[:-1] if line[-1:] in ('\n', b'\n') else line
 
 
 @Pipeable
-class RRaggedZip(IInputRange):
+class BufferedFileLineIR(IInputRange):
+    # a FileLineIR for large files - the file is read (or memory mapped) in large blocks that end on a line boundary,
+    # and each block is split into lines in one go, so front / popFront don't each call readline (roughly 1.5x
+    # faster than FileLineIR element by element but no faster in batches as FileLineIR then uses readlines too)
+    # the mmap, and the file if opened from a path, are closed on exhaustion or by close() / leaving a with block
+    # src - a path, a binary file or a text file (text files and unseekable streams are read rather than mapped)
+    # encoding - None answers bytes (or str for text files), otherwise lines are decoded with universal newlines
+    #     (the encoding must be ascii compatible, e.g. utf-8 or latin-1)
+    # views - answer memoryview slices of the memory mapped file rather than bytes, i.e. no copying
+    hasBatch = True
+    def __init__(self, src, stripNL=False, encoding=None, views=False, blockSize=_READ_HINT * 4):
+        self.ownsFile = isinstance(src, (str, os.PathLike))
+        if self.ownsFile:
+            src = open(src, 'rb')
+        self.f = src
+        self.stripNL = stripNL
+        self.encoding = encoding
+        self.blockSize = blockSize
+        self.mm = _mmapOrNone(src)
+        if views and (self.mm is None or encoding is not None):
+            raise TypeError('views are only available for bytes from a memory mapped file')
+        self.views = memoryview(self.mm) if views else None
+        self.pos = 0                # next unread position in the mmap
+        self.carry = None           # unterminated line from the prior block when reading
+        self.lines = []
+        self.i = 0
+        self.closed = False
+        self._fill(1)
+    @property
+    def empty(self):
+        return self.i >= len(self.lines)
+    @property
+    def front(self):
+        return self.lines[self.i]
+    def popFront(self):
+        self.i += 1
+        if self.i >= len(self.lines):
+            self._fill(1)
+    def frontBatch(self, n):
+        if len(self.lines) - self.i < n:
+            self._fill(n)
+        return self.lines[self.i:self.i + n]
+    def popFrontN(self, n):
+        popped = 0
+        while popped < n and not self.empty:
+            k = min(n - popped, len(self.lines) - self.i)
+            self.i += k
+            popped += k
+            if self.i >= len(self.lines):
+                self._fill(1)
+        return popped
+    def _fill(self, n):
+        del self.lines[:self.i]
+        self.i = 0
+        while len(self.lines) < n and not self.closed:
+            if self.views is not None:
+                lines = self._nextViews()
+            else:
+                block = self._nextBlock()
+                lines = None if block is None else self._split(block)
+            if lines is None:
+                if not self.lines:
+                    self.close()
+                break
+            self.lines.extend(lines)
+    def close(self):
+        # views handed out keep the mmap exported, in which case it stays valid until they have all been collected
+        del self.lines[self.i:]
+        self.closed = True
+        if self.views is not None:
+            self.views.release()
+            self.views = None
+        if self.ownsFile:
+            self.f.close()
+        if self.mm is not None:
+            try:
+                self.mm.close()
+            except BufferError:
+                pass
+            self.mm = None
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.close()
+        return False
+    def _nextBlock(self):
+        # answers the next block ending on a line boundary (or at the end of the file) or None when exhausted
+        if self.mm is not None:
+            start, size = self.pos, len(self.mm)
+            if start >= size: return None
+            end = self._blockEnd(start, size)
+            self.pos = end
+            block = self.mm[start:end]
+        else:
+            block = self.carry
+            self.carry = None
+            while True:
+                more = self.f.read(self.blockSize)
+                if not more:
+                    break
+                block = more if block is None else block + more
+                iNL = block.rfind('\n' if isinstance(block, str) else b'\n')
+                if iNL >= 0:
+                    block, self.carry = block[:iNL + 1], (block[iNL + 1:] or None)
+                    break
+            if not block: return None
+        if self.encoding is not None:
+            block = block.decode(self.encoding)
+        if isinstance(block, str) and '\r' in block:
+            block = block.replace('\r\n', '\n').replace('\r', '\n')
+        return block
+    def _blockEnd(self, start, size):
+        end = min(start + self.blockSize, size)
+        if end < size:
+            iNL = self.mm.rfind(b'\n', start, end)
+            if iNL < 0:
+                # a line longer than a block
+                iNL = self.mm.find(b'\n', end)
+            end = size if iNL < 0 else iNL + 1
+        return end
+    def _split(self, block):
+        return _splitLines(block, self.stripNL)
+    def _nextViews(self):
+        start, size = self.pos, len(self.mm)
+        if start >= size: return None
+        end = self._blockEnd(start, size)
+        self.pos = end
+        views = self.views
+        bounds = list(accumulate(map(len, _splitLines(self.mm[start:end], False)), initial=start))
+        if not self.stripNL:
+            return [views[a:b] for a, b in zip(bounds, bounds[1:])]
+        lines = [views[a:b - 1] for a, b in zip(bounds, bounds[1:])]
+        if self.mm[end - 1] != 10:
+            # the last line of the file has no newline
+            lines[-1] = views[bounds[-2]:end]
+        return lines
+
+def _splitLines(block, stripNL):
+    nl = '\n' if isinstance(block, str) else b'\n'
+    if stripNL:
+        lines = block.split(nl)
+        if not lines[-1]: del lines[-1]
+        return lines
+    lines = block.splitlines(True)
+    if len(lines) != block.count(nl) + (block[-1:] != nl):
+        # splitlines also breaks on \r, \x0b, \x0c etc so fall back to the slower regex
+        lines = (_LINES_STR if isinstance(block, str) else _LINES_BYTES).findall(block)
+    return lines
+
+_LINES_STR = re.compile('[^\n]*\n|[^\n]+')
+_LINES_BYTES = re.compile(b'[^\n]*\n|[^\n]+')
+
+def _mmapOrNone(f):
+    if isinstance(f, io.TextIOBase):
+        return None
+    try:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return None
+
+
+@Pipeable
+class RRaggedZip(IForwardRange):
     """As RZip but input ranges do not need to be of same length, shorter ranges are post padded with Null"""
-    def __init__(self, ror):
-        self.ror = ror
-        self.allEmpty = ror >> AllSubRangesExhausted
+    # the subranges are collected once and each step only touches the live ones
+    # row - optionally a preallocated list that front fills in place (and answers) instead of a new list each step
+    def __init__(self, ror, row=None):
+        if isinstance(ror, IForwardRange):
+            ror = ror.save()
+        self.rs = [r >> ToIRangeIfNot for r in ror >> ToIRangeIfNot >> GetIRIter]
+        self.live = [i for i, r in enumerate(self.rs) if not r.empty]
+        if row is not None:
+            if len(row) != len(self.rs):
+                raise ValueError('row has %s slots but there are %s ranges' % (len(row), len(self.rs)))
+            row[:] = [Null] * len(self.rs)
+        self.row = row
+        self.current = None
     @property
     def empty(self):
-        return self.allEmpty
+        return not self.live
     @property
     def front(self) -> list:
-        parts = []
-        ror = self.ror.save()
-        while not ror.empty:
-            subrange = ror.front
-            if subrange.empty:
-                parts.append(Null)
-            else:
-                parts.append(subrange.front)
-            if not subrange.empty:
-                subrange.popFront()
-        return parts
+        if self.current is None:
+            row = [Null] * len(self.rs) if self.row is None else self.row
+            rs = self.rs
+            for i in self.live:
+                row[i] = rs[i].front
+            self.current = row
+        return self.current
     def popFront(self):
-        ror = self.ror.save()
-        self.allEmpty = True
-        while not ror.empty:
-            subrange = ror.front
-            if not subrange.empty:
-                subrange.popFront()
-                if not subrange.empty:
-                    self.allEmpty = False
-            ror.popFront()
+        rs = self.rs
+        exhausted = None
+        for i in self.live:
+            r = rs[i]
+            r.popFront()
+            if r.empty:
+                exhausted = [] if exhausted is None else exhausted
+                exhausted.append(i)
+        if exhausted:
+            self.live = [i for i in self.live if not rs[i].empty]
+            if self.row is not None:
+                for i in exhausted:
+                    self.row[i] = Null
+        self.current = None
+    def save(self):
+        return RRaggedZip([r.save() for r in self.rs], None if self.row is None else list(self.row))
 
 
 @Pipeable
@@ -320,5 +669,102 @@ def AllSubRangesExhausted(ror):
         if not ror.front.empty:
             answer = False
             break
+        ror.popFront()
     return answer
 
+
+
+# async ranges - see range_interfaces for the protocol
+
+@Pipeable
+def ToAsyncIRIfNot(x):
+    if isinstance(x, IAsyncInputRange):
+        return x
+    return _SyncAsAsyncIR(x >> ToIRangeIfNot)
+
+class _SyncAsAsyncIR(IAsyncInputRange):
+    def __init__(self, r):
+        self.r = r
+    async def empty(self):
+        return self.r.empty
+    @property
+    def front(self):
+        return self.r.front
+    def popFront(self):
+        self.r.popFront()
+
+
+@Pipeable
+class AsyncRMap(IAsyncInputRange):
+    # fn may be a plain function or answer an awaitable, e.g. a coroutine function
+    def __init__(self, r, fn):
+        self.r = r >> ToAsyncIRIfNot
+        self.f = fn
+        self.current = _UNREAD
+    async def empty(self):
+        if self.current is not _UNREAD:
+            return False
+        if await self.r.empty():
+            return True
+        x = self.f(self.r.front)
+        self.current = (await x) if inspect.isawaitable(x) else x
+        return False
+    @property
+    def front(self):
+        return self.current
+    def popFront(self):
+        self.current = _UNREAD
+        self.r.popFront()
+
+
+@Pipeable
+class AsyncFileLineIR(IAsyncInputRange):
+    # reader is anything with an async readline() that answers an empty line at the end, e.g. an asyncio.StreamReader
+    # from a socket or subprocess pipe
+    def __init__(self, reader, stripNL=False):
+        self.reader = reader
+        self.stripNL = stripNL
+        self.line = _UNREAD
+    async def empty(self):
+        if self.line is _UNREAD:
+            line = await self.reader.readline()
+            self.line = EMPTY if not line else _stripNL(line) if self.stripNL else line
+        return self.line is EMPTY
+    @property
+    def front(self):
+        return self.line
+    def popFront(self):
+        self.line = _UNREAD
+
+
+@Pipeable
+class AsyncQueueR(IAsyncInputRange, IAsyncOutputRange):
+    # a bounded buffer between two stages - put waits while the queue is full and empty() waits for the next element
+    # or for close()
+    def __init__(self, maxSize=1024):
+        self.q = asyncio.Queue(maxSize)
+        self.current = _UNREAD
+    async def put(self, value):
+        await self.q.put(value)
+    async def close(self):
+        await self.q.put(_CLOSED)
+    async def empty(self):
+        if self.current is _UNREAD:
+            self.current = await self.q.get()
+        return self.current is _CLOSED
+    @property
+    def front(self):
+        return self.current
+    def popFront(self):
+        self.current = _UNREAD
+
+_CLOSED = object()
+
+
+@Pipeable
+class AsyncListOR(IAsyncOutputRange):
+    def __init__(self, list):
+        self.list = list
+    async def put(self, value):
+        self.list.append(value)
+
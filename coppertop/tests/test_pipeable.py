@@ -206,6 +206,123 @@ def test_defaultArgs():
     assert Fred(1, b=2, c=4) == (1, 2, 4)
     assert (4 >> Pipeable(lambda x, y: x + y) >> 5) == 9
 
+def test_quickBind():
+    @Pipeable
+    def toTuple(a, b, c, d=4):
+        return (a, b, c, d)
+
+    # the common positional cases shouldn't need to copy the bindings but must behave as before
+    partial = toTuple(1)
+    assert partial >> 2 >> 3 == (1, 2, 3, 4)
+    assert partial(2, 3) == (1, 2, 3, 4)
+    assert 3 >> partial(2) == (1, 2, 3, 4)
+    assert 3 >> toTuple(1, d=5) >> 2 == (1, 3, 2, 5)
+    assert 1 >> toTuple(b=2, d=5) >> 3 == (1, 2, 3, 5)
+    assert 3 >> toTuple(1, 2) == (1, 2, 3, 4)
+    with AssertRaises(TypeError):
+        partial(2, 3, 4, 5)
+
+    # ellipses and na still go through the general binding
+    assert 2 >> partial(..., 3) == (1, 2, 3, 4)
+    assert toTuple(1, na, 3)(2) == (1, 2, 3, 4)
+
+
+def test_partialState():
+    @Pipeable
+    def toTuple(a, b, c, d=4):
+        return (a, b, c, d)
+
+    # partials share the signature with their parent and only hold a tuple of values and a mask of unbound slots
+    partial = toTuple(1, d=5)
+    assert partial._sig is toTuple._sig
+    assert partial._values == (1, Missing, Missing, 5)
+    assert partial._numAvailableCoreBindings == 2
+    assert toTuple._values == (Missing, Missing, Missing, Missing)
+    assert partial >> 2 >> 3 == (1, 2, 3, 5)
+    assert partial._unbound in toTuple._sig.plans
+
+    # ellipses are remembered by slot in the order they were added
+    partial = toTuple(d=4, c=..., b=2, a=...)
+    assert partial._ellipses == (2, 0)
+    assert 3 >> partial >> 1 == (1, 2, 3, 4)
+
+    # na passes over a slot leaving it unbound for a later call
+    partial = toTuple(na, 2)
+    assert partial._numAvailableCoreBindings == 2
+    assert partial(1, 3) == (1, 2, 3, 4)
+
+    @Pipeable
+    def f(a, b, c, d=4, e=5):
+        return (a, b, c, d, e)
+    assert f(na, 3)(7, 7) == (7, 3, 7, 4, 5)
+
+
+def test_overloading():
+    class A(object): pass
+    class B(A): pass
+    class C(B): pass
+
+    @Pipeable(thing=int)
+    def FriendlyType(thing):
+        return "I am an int"
+
+    @Pipeable(thing=str)
+    def FriendlyType(thing):
+        return "I am a str"
+
+    assert 18 >> FriendlyType == "I am an int"
+    assert "hi" >> FriendlyType == "I am a str"
+    assert True >> FriendlyType == "I am an int"       # bool is a subclass of int
+    with AssertRaises(TypeError):
+        1.5 >> FriendlyType
+
+    # the overload with the nearest types wins
+    @Pipeable(a=A, b=A)
+    def Nearest(a, b, c=0):
+        return 'AA'
+
+    @Pipeable(a=B, b=A)
+    def Nearest(a, b, c=0):
+        return 'BA'
+
+    @Pipeable(a=A, b=B)
+    def Nearest(a, b, c=0):
+        return 'AB'
+
+    assert A() >> Nearest >> A() == 'AA'
+    assert C() >> Nearest >> A() == 'BA'
+    assert Nearest(b=C()) >> A() == 'AB'
+    with AssertRaises(TypeError):
+        B() >> Nearest >> B()       # BA and AB are equally near
+    assert (C, A) in Nearest._sig.fnOrClass._fnByArgTypes
+
+    # overloads must share the same parameters
+    with AssertRaises(TypeError):
+        @Pipeable(a=int)
+        def Nearest(a):
+            pass
+
+
+def test_overloadScope():
+    # each closure gets its own overload set rather than extending the last one made
+    def make(k):
+        @Pipeable(x=int)
+        def AddK(x):
+            return x + k
+        @Pipeable(x=str)
+        def AddK(x):
+            return x + str(k)
+        return AddK
+
+    f1 = make(1)
+    f2 = make(2)
+    assert f1 is not f2
+    assert f1(0) == 1
+    assert f2(0) == 2
+    assert f1('a') == 'a1'
+    assert len(f1._sig.fnOrClass._fnByArgTypes) == 2
+
+
 def fred():
     @Pipeable
     def Cholesky(A):
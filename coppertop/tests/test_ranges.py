@@ -18,9 +18,15 @@
 
 
 
+import asyncio, io, os, random, tempfile
 from ..testing import AssertEqual, AssertRaises
-from ..ranges import IndexableFR, ListOR, ChainAsSingleRange, RMap, Materialise
-from ..range_interfaces import GetIRIter
+from ..ranges import IndexableFR, ListOR, ChainAsSingleRange, RMap, Materialise, FileLineIR, FnAdapterFRange, \
+    IterIR, BufferedFileLineIR, RRaggedZip, AllSubRangesExhausted, GroupRuns, AsyncRMap, AsyncFileLineIR, AsyncQueueR, \
+    AsyncListOR
+from ..range_interfaces import GetIRIter, GetAIRIter
+from .._core import Null
+from .._std import PushInto, RZip, RFold, RFoldSeed, RFilter, RTake, RTakeBack, RDrop, RDropBack, \
+    GroupBy, CountBy, Distinct, TopK, RSort, AsyncPushInto, StagedPipeline
 
 
 
@@ -45,10 +51,369 @@ def test_other():
         [1, 2, 3] >> RMap(lambda x: x) >> Materialise >> AssertEqual >> [1, 2, 3]
     [1, 2, 3] >> RMap >> (lambda x: x) >> Materialise >> AssertEqual >> [1, 2, 3]
 
+def test_batches():
+    r = IndexableFR(list(range(10)))
+    r.frontBatch(4) >> AssertEqual >> [0, 1, 2, 3]
+    r.popFrontN(4) >> AssertEqual >> 4
+    r.front >> AssertEqual >> 4
+    r.popFrontN(100) >> AssertEqual >> 6
+    r.empty >> AssertEqual >> True
+
+    r = [1, 2, 3] >> RMap >> (lambda x: x * 10)
+    r.hasBatch >> AssertEqual >> True
+    r.frontBatch(2) >> AssertEqual >> [10, 20]
+    r.popFrontN(1)
+    r >> Materialise >> AssertEqual >> [20, 30]
+
+    # lines are read ahead for batches but can still be consumed one at a time
+    r = io.StringIO('a\nb\nc\nd\n') >> FileLineIR
+    r.front >> AssertEqual(keepWS=True) >> 'a\n'
+    r.frontBatch(3) >> AssertEqual(keepWS=True) >> ['a\n', 'b\n', 'c\n']
+    r.popFrontN(2) >> AssertEqual >> 2
+    r.front >> AssertEqual(keepWS=True) >> 'c\n'
+    r.popFront()
+    [e for e in r >> GetIRIter] >> AssertEqual(keepWS=True) >> ['d\n']
+
+    # ranges without native batches fall back to the one element protocol
+    r = FnAdapterFRange(lambda i: FnAdapterFRange.Empty if i >= 5 else i)
+    r.hasBatch >> AssertEqual >> False
+    r.frontBatch(3) >> AssertEqual >> [0, 1, 2]
+    r.popFrontN(3) >> AssertEqual >> 3
+    r >> Materialise >> AssertEqual >> [3, 4]
+
+    # sub ranges aren't swallowed by batches
+    [IndexableFR([1]), IndexableFR([2, 3])] >> IndexableFR >> Materialise >> AssertEqual >> [[1], [2, 3]]
+    (IndexableFR(list(range(3000))) >> PushInto >> ListOR([])).list >> AssertEqual >> list(range(3000))
+
+def test_bufferedFileLines():
+    text = 'a\nbb\r\n\nccc\nlast'
+    lines = ['a\n', 'bb\n', '\n', 'ccc\n', 'last']
+    io.StringIO(text) >> FileLineIR(stripNL=True) >> Materialise >> AssertEqual(keepWS=True) >> ['a', 'bb\r', '', 'ccc', 'last']
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'lines.txt')
+        with open(path, 'wb') as f:
+            f.write(text.encode())
+        # blocks smaller than a line exercise the block boundaries
+        for blockSize in [2, 5, 1024]:
+            with open(path, 'rb') as f:
+                f >> BufferedFileLineIR(blockSize=blockSize) >> Materialise >> AssertEqual >> \
+                    [b'a\n', b'bb\r\n', b'\n', b'ccc\n', b'last']
+            path >> BufferedFileLineIR(encoding='utf-8', blockSize=blockSize) >> Materialise \
+                >> AssertEqual(keepWS=True) >> lines
+            path >> BufferedFileLineIR(encoding='utf-8', stripNL=True, blockSize=blockSize) >> Materialise \
+                >> AssertEqual(keepWS=True) >> ['a', 'bb', '', 'ccc', 'last']
+            with open(path, 'r', newline=None) as f:
+                f >> BufferedFileLineIR(blockSize=blockSize) >> Materialise >> AssertEqual(keepWS=True) >> lines
+            views = path >> BufferedFileLineIR(views=True, stripNL=True, blockSize=blockSize) >> Materialise
+            type(views[0]) >> AssertEqual >> memoryview
+            [bytes(v) for v in views] >> AssertEqual >> [b'a', b'bb\r', b'', b'ccc', b'last']
+
+        r = path >> BufferedFileLineIR(encoding='utf-8', stripNL=True, blockSize=4)
+        r.frontBatch(4) >> AssertEqual(keepWS=True) >> ['a', 'bb', '', 'ccc']
+        r.popFrontN(3) >> AssertEqual >> 3
+        r.front >> AssertEqual >> 'ccc'
+        r.popFrontN(10) >> AssertEqual >> 2
+        r.empty >> AssertEqual >> True
+        # the file and mmap are released on exhaustion, on close and on leaving a with block - but a file that was
+        # passed in is left open for the caller
+        (r.closed, r.f.closed, r.mm) >> AssertEqual >> (True, True, None)
+        with path >> BufferedFileLineIR(blockSize=4) as r:
+            r.front >> AssertEqual >> b'a\n'
+        (r.empty, r.f.closed, r.mm) >> AssertEqual >> (True, True, None)
+        with open(path, 'rb') as f:
+            r = f >> BufferedFileLineIR
+            r.close()
+            (r.empty, f.closed) >> AssertEqual >> (True, False)
+            f >> BufferedFileLineIR >> Materialise >> AssertEqual >> [b'a\n', b'bb\r\n', b'\n', b'ccc\n', b'last']
+            f.closed >> AssertEqual >> False
+        # views outlive the range
+        views = path >> BufferedFileLineIR(views=True) >> Materialise
+        bytes(views[-1]) >> AssertEqual >> b'last'
+
+        # unseekable streams are read rather than mapped
+        io.BytesIO(text.encode()) >> BufferedFileLineIR(stripNL=True, blockSize=3) >> Materialise \
+            >> AssertEqual >> [b'a', b'bb\r', b'', b'ccc', b'last']
+        with open(path, 'wb'):
+            pass
+        path >> BufferedFileLineIR >> Materialise >> AssertEqual >> []
+        with AssertRaises(TypeError):
+            io.StringIO(text) >> BufferedFileLineIR(views=True)
+
+
+def test_randomAccess():
+    xs = [0, 1, 2, 3, 4, 5]
+    r = IndexableFR(xs)
+    r.length >> AssertEqual >> 6
+    r.back >> AssertEqual >> 5
+    r.popBack()
+    r.popFront()
+    (r.front, r.back, r.length) >> AssertEqual >> (1, 4, 4)
+    (r[0], r[-1]) >> AssertEqual >> (1, 4)
+    with AssertRaises(IndexError):
+        r[4]
+
+    # slices and saves share the buffer
+    s = r[1:3]
+    (s.indexable is xs, s.length) >> AssertEqual >> (True, 2)
+    s >> Materialise >> AssertEqual >> [2, 3]
+    r[2:] >> Materialise >> AssertEqual >> [3, 4]
+    r[3:1].empty >> AssertEqual >> True
+    # an empty slice doesn't leak the elements either side of it
+    e = r[2:2]
+    with AssertRaises(IndexError):
+        e.front
+    with AssertRaises(IndexError):
+        e.back
+    with AssertRaises(IndexError):
+        e.front = 99
+    xs >> AssertEqual >> [0, 1, 2, 3, 4, 5]
+    with AssertRaises(TypeError):
+        r[::2]
+    saved = r.save()
+    (saved.indexable is xs) >> AssertEqual >> True
+    r.popFrontN(10)
+    r.empty >> AssertEqual >> True
+    saved.save() >> Materialise >> AssertEqual >> [1, 2, 3, 4]
+    saved[0] = 10
+    saved.back = 40
+    xs >> AssertEqual >> [0, 10, 2, 3, 40, 5]
+
+    # tuples and bytes work too
+    r = IndexableFR((1, 2, 3))[1:]
+    (r.front, r.back) >> AssertEqual >> (2, 3)
+    IndexableFR(b'abc').frontBatch(2) >> AssertEqual >> b'ab'
+
+
+def test_rangeAlgorithms():
+    naturals = lambda: FnAdapterFRange(lambda i: i)
+    # infinite sources are fine as long as something stops early
+    naturals() >> RFilter >> (lambda x: x % 3 == 0) >> RTake(4) >> Materialise >> AssertEqual >> [0, 3, 6, 9]
+    [naturals(), [10, 20, 30]] >> RZip >> Materialise >> AssertEqual >> [[0, 10], [1, 20], [2, 30]]
+    naturals() >> RDrop(5) >> RTake(2) >> Materialise >> AssertEqual >> [5, 6]
+    naturals() >> RTake(5) >> RFold >> (lambda acc, x: acc + x) >> AssertEqual >> 10
+    RFoldSeed([], [1, 2], lambda acc, x: acc + [x]) >> AssertEqual >> [1, 2]
+    with AssertRaises(TypeError):
+        [] >> RFold >> (lambda acc, x: acc + x)
+
+    # random access ranges are sliced rather than walked
+    xs = list(range(10))
+    r = xs >> RTake(3)
+    (type(r).__name__, r.indexable is xs) >> AssertEqual >> ('IndexableFR', True)
+    r >> Materialise >> AssertEqual >> [0, 1, 2]
+    xs >> RDrop(8) >> Materialise >> AssertEqual >> [8, 9]
+    xs >> RTakeBack(3) >> Materialise >> AssertEqual >> [7, 8, 9]
+    xs >> RDropBack(7) >> Materialise >> AssertEqual >> [0, 1, 2]
+    xs >> RDrop(20) >> Materialise >> AssertEqual >> []
+
+    # forward and input only ranges
+    fr = lambda: FnAdapterFRange(lambda i: FnAdapterFRange.Empty if i >= 6 else i)
+    fr() >> RTakeBack(2) >> Materialise >> AssertEqual >> [4, 5]
+    fr() >> RDropBack(4) >> Materialise >> AssertEqual >> [0, 1]
+    io.StringIO('a\nb\nc\n') >> FileLineIR(stripNL=True) >> RTakeBack(2) >> Materialise >> AssertEqual >> ['b', 'c']
+    io.StringIO('a\nb\nc\n') >> FileLineIR(stripNL=True) >> RDropBack(1) >> Materialise >> AssertEqual >> ['a', 'b']
+    # taking from an input only source answers an input range
+    r = IterIR(range(10)) >> RTake(5)
+    hasattr(r, 'save') >> AssertEqual >> False
+    r >> RTakeBack(2) >> Materialise >> AssertEqual >> [3, 4]
+    IterIR(range(10)) >> RDrop(3) >> RTake(2) >> RDropBack(1) >> Materialise >> AssertEqual >> [3]
+
+    # the adaptors are forward ranges when their sources are
+    r = naturals() >> RFilter >> (lambda x: x % 2 == 1)
+    s = r.save()
+    r.popFront()
+    (r.front, s.front) >> AssertEqual >> (3, 1)
+    # but only then, and nothing is tested until the first element is asked for
+    tested = []
+    r = io.StringIO('a\nbb\nc\n') >> FileLineIR(stripNL=True) >> RFilter >> (lambda x: tested.append(x) or len(x) == 1)
+    (hasattr(r, 'save'), tested) >> AssertEqual >> (False, [])
+    r >> Materialise >> AssertEqual >> ['a', 'c']
+    tested >> AssertEqual >> ['a', 'bb', 'c']
+
+
+def test_raggedZip():
+    columns = lambda: [IndexableFR([1, 2, 3]), IndexableFR([4]), IndexableFR([]), IndexableFR([5, 6])]
+    columns() >> RRaggedZip >> Materialise >> AssertEqual >> [[1, 4, Null, 5], [2, Null, Null, 6], [3, Null, Null, Null]]
+
+    # the row mode fills and answers the same list each step
+    row = [None] * 4
+    r = columns() >> RRaggedZip(row=row)
+    (r.front is row, list(r.front)) >> AssertEqual >> (True, [1, 4, Null, 5])
+    r.popFront()
+    r.front >> AssertEqual >> [2, Null, Null, 6]
+    s = r.save()
+    r.popFront()
+    r.front >> AssertEqual >> [3, Null, Null, Null]
+    r.popFront()
+    (r.empty, s.front) >> AssertEqual >> (True, [2, Null, Null, 6])
+    with AssertRaises(ValueError):
+        columns() >> RRaggedZip(row=[None])
+
+    [IndexableFR([]), IndexableFR([])] >> IndexableFR >> AllSubRangesExhausted >> AssertEqual >> True
+    [IndexableFR([]), IndexableFR([1])] >> IndexableFR >> AllSubRangesExhausted >> AssertEqual >> False
+
+
+def test_groupRuns():
+    keys = []
+    def key(x):
+        keys.append(x)
+        return x[0]
+    ticks = [('a', 1), ('a', 3), ('b', 2), ('a', 5), ('a', 4), ('a', 6)]
+    IndexableFR(ticks) >> GroupRuns(key=key) >> Materialise >> AssertEqual >> [('a', 2), ('b', 1), ('a', 3)]
+    len(keys) >> AssertEqual >> len(ticks)
+    # nothing is read until the first group is asked for
+    del keys[:]
+    r = IndexableFR(ticks) >> GroupRuns(key=key)
+    len(keys) >> AssertEqual >> 0
+    r.front >> AssertEqual >> ('a', 2)
+    r.popFront()
+    r.popFront()
+    r.front >> AssertEqual >> ('a', 3)
+
+    vols = [('a', 1), ('a', 3), ('b', 2), ('a', 5)]
+    vol = lambda acc, x: acc + x[1]
+    vols >> GroupRuns(key=key, agg=vol, seed=0) >> Materialise >> AssertEqual >> [('a', 4), ('b', 2), ('a', 5)]
+    [1, 1, 2, 3, 3, 3] >> GroupRuns(agg='sum') >> Materialise >> AssertEqual >> [(1, 2), (2, 2), (3, 9)]
+    [3, 1, 2] >> GroupRuns(key=lambda x: 0, agg='min') >> Materialise >> AssertEqual >> [(0, 1)]
+    [3, 1, 2] >> GroupRuns(key=lambda x: 0, agg='max') >> Materialise >> AssertEqual >> [(0, 3)]
+    [3, 1, 2] >> GroupRuns(key=lambda x: 0, agg='first') >> Materialise >> AssertEqual >> [(0, 3)]
+    [3, 1, 2] >> GroupRuns(key=lambda x: 0, agg='last') >> Materialise >> AssertEqual >> [(0, 2)]
+    [3, 1, 2] >> GroupRuns(key=lambda x: 0, agg=max) >> Materialise >> AssertEqual >> [(0, 3)]
+    [] >> GroupRuns >> Materialise >> AssertEqual >> []
+    with AssertRaises(ValueError):
+        [] >> GroupRuns(agg='median')
+
+    # lines are counted without materialising the file
+    io.StringIO('x\nx\ny\n') >> FileLineIR >> GroupRuns >> Materialise >> AssertEqual(keepWS=True) \
+        >> [('x\n', 2), ('y\n', 1)]
+
+
+def test_hashGrouping():
+    words = 'the cat sat on the mat the end'.split()
+    # grouping answers an input range of (key, aggregate) in order of first appearance
+    CountBy(words) >> Materialise >> AssertEqual >> [('the', 3), ('cat', 1), ('sat', 1), ('on', 1), ('mat', 1), ('end', 1)]
+    dict(IndexableFR(words) >> CountBy(key=len) >> Materialise) >> AssertEqual >> {3: 7, 2: 1}
+    words >> GroupBy(key=len) >> Materialise >> AssertEqual \
+        >> [(3, ['the', 'cat', 'sat', 'the', 'mat', 'the', 'end']), (2, ['on'])]
+    dict(words >> GroupBy(key=len, agg='last') >> Materialise) >> AssertEqual >> {3: 'end', 2: 'on'}
+    dict(words >> GroupBy(key=lambda w: w[0], agg=lambda acc, w: acc + len(w), seed=0) >> Materialise) >> AssertEqual \
+        >> {'t': 9, 'c': 3, 's': 3, 'o': 2, 'm': 3, 'e': 3}
+    words >> Distinct >> Materialise >> AssertEqual >> ['the', 'cat', 'sat', 'on', 'mat', 'end']
+    words >> Distinct(key=len) >> Materialise >> AssertEqual >> ['the', 'on']
+    [5, 1, 4, 2, 3] >> TopK(k=2) >> AssertEqual >> [5, 4]
+    words >> TopK(k=1, key=len) >> AssertEqual >> ['the']
+
+    # with a memory cap high cardinality keys are spilled to disk and merged back
+    with tempfile.TemporaryDirectory() as folder:
+        xs = [i % 100 for i in range(1000)]
+        counts = xs >> CountBy(maxKeys=10, spillDir=folder) >> Materialise
+        dict(counts) >> AssertEqual >> {i: 10 for i in range(100)}
+        firsts = range(1000) >> GroupBy(key=lambda x: x % 50, agg='first', maxKeys=7, spillDir=folder) >> Materialise
+        dict(firsts) >> AssertEqual >> {i: i for i in range(50)}
+        sorted(xs >> Distinct(maxKeys=10, spillDir=folder) >> Materialise) >> AssertEqual >> list(range(100))
+        os.listdir(folder) >> AssertEqual >> []
+        with AssertRaises(TypeError):
+            xs >> GroupBy(agg=lambda acc, x: acc, maxKeys=10)
+
+    # partitions bigger than maxKeys are re-spilled so the cap holds however many keys there are
+    with tempfile.TemporaryDirectory() as folder:
+        xs = [str(i % 2000) for i in range(6000)]
+        lasts = list(range(6000)) >> GroupBy(key=lambda i: xs[i], agg='last', maxKeys=20, spillDir=folder) >> Materialise
+        len(lasts) >> AssertEqual >> 2000
+        dict(lasts) >> AssertEqual >> {str(i): i + 4000 for i in range(2000)}
+        os.listdir(folder) >> AssertEqual >> []
+
+
+def test_externalSort():
+    rng = random.Random(1)
+    xs = [(rng.randrange(50), i) for i in range(2000)]
+    byFirst = lambda x: x[0]
+    r = xs >> RSort(key=byFirst)
+    type(r).__name__ >> AssertEqual >> 'IndexableFR'
+    r >> Materialise >> AssertEqual >> sorted(xs, key=byFirst)
+
+    # tiny runs force spilling - the merge is stable and the runs are cleaned up as it finishes
+    with tempfile.TemporaryDirectory() as folder:
+        r = IndexableFR(xs) >> RSort(key=byFirst, maxMemory=2000, spillDir=folder)
+        (len(os.listdir(folder)) > 0) >> AssertEqual >> True
+        s = r.save()
+        r.popFront()
+        s.front >> AssertEqual >> sorted(xs, key=byFirst)[0]
+        r >> Materialise >> AssertEqual >> sorted(xs, key=byFirst)[1:]
+        s >> Materialise >> AssertEqual >> sorted(xs, key=byFirst)
+        os.listdir(folder) >> AssertEqual >> []
+        [3, 1, 2] * 100 >> RSort(reverse=True, maxMemory=100, spillDir=folder) >> Materialise \
+            >> AssertEqual >> [3] * 100 + [2] * 100 + [1] * 100
+
+
+def test_asyncRanges():
+    async def double(x):
+        await asyncio.sleep(0)
+        return x * 2
+
+    async def pipelines():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'1\n2\n')
+        queue = AsyncQueueR(maxSize=1)
+        out = AsyncListOR([])
+        # producer and consumer run concurrently with at most one line buffered between them
+        stage1 = reader >> AsyncFileLineIR(stripNL=True) >> AsyncRMap >> int >> AsyncPushInto(close=True) >> queue
+        stage2 = queue >> AsyncRMap >> double >> AsyncPushInto >> out
+        other = [10, 20] >> AsyncRMap >> (lambda x: x + 1) >> AsyncPushInto >> AsyncListOR([])
+        async def feedLater():
+            await asyncio.sleep(0.01)
+            reader.feed_data(b'3\n')
+            reader.feed_eof()
+        _, _, _, other = await asyncio.gather(feedLater(), stage1, stage2, other)
+        return out.list, other.list, [x async for x in [4] >> AsyncRMap >> double >> GetAIRIter]
+
+    asyncio.run(pipelines()) >> AssertEqual >> ([2, 4, 6], [11, 21], [8])
+
+
+def test_stagedPipeline():
+    lines = ''.join('%s\n' % (i // 3) for i in range(3000))
+    parse = lambda r: r >> RMap >> (lambda line: int(line))
+    pipeline = StagedPipeline(parse, RMap(fn=lambda x: x * 2), GroupRuns, queueSize=2, batchSize=100)
+    out = pipeline.run(io.StringIO(lines) >> FileLineIR, ListOR([]))
+    out.list >> AssertEqual >> [(i * 2, 3) for i in range(1000)]
+    [st.name for st in pipeline.stats] >> AssertEqual >> ['source', '<lambda>', 'RMap', 'GroupRuns', 'sink']
+    [st.items for st in pipeline.stats] >> AssertEqual >> [3000, 3000, 3000, 1000, 1000]
+    (max(st.maxQueueDepth for st in pipeline.stats) <= 2) >> AssertEqual >> True
+
+    # each element is computed once by a stage that doesn't move batches natively
+    calls = []
+    pipeline = StagedPipeline(RFilter(f=lambda x: calls.append(x) or True), batchSize=7)
+    pipeline.run(IndexableFR(list(range(100))), ListOR([])).list >> AssertEqual >> list(range(100))
+    len(calls) >> AssertEqual >> 100
+
+    # the first failure is re-raised and nothing is left blocked
+    def fail(r):
+        for x in r >> GetIRIter:
+            if x == 500: raise ValueError(x)
+            yield x
+    with AssertRaises(ValueError):
+        StagedPipeline(fail, queueSize=1, batchSize=10).run(IndexableFR(list(range(10000))), ListOR([]))
+    class FailingOR(object):
+        def put(self, value):
+            raise KeyError()
+    with AssertRaises(KeyError):
+        pipeline = StagedPipeline(RMap(fn=lambda x: x), queueSize=1, batchSize=10)
+        pipeline.run(IndexableFR(list(range(10000))), FailingOR())
+
+
 def main():
     test_listRanges()
     test_rangeOrRanges()
     test_other()
+    test_batches()
+    test_bufferedFileLines()
+    test_randomAccess()
+    test_rangeAlgorithms()
+    test_raggedZip()
+    test_groupRuns()
+    test_hashGrouping()
+    test_externalSort()
+    test_asyncRanges()
+    test_stagedPipeline()
     print('pass')
 
 
@@ -17,10 +17,12 @@
 # *******************************************************************************
 
 
-import operator
-from ..testing import AssertEqual
+import operator, pickle
+from ..testing import AssertEqual, AssertRaises
 from ..pipeable import Pipeable
-from coppertop._std import Chain, Each, EachArgs
+from coppertop._std import Chain, Each, EachArgs, Pipeline, Compose, ComposeAll, ToStr, LazyEach, LazyEachIf, \
+    LazyEachArgs, PushInto, GetAttr, PEach, Sum, Mean, Var, Std, Quantile, CumSum, CumProd, Sqrt, First, Last, Take, Cut
+from ..ranges import IndexableFR, IterIR, ListOR, Materialise, FnAdapterFRange
 
 def test_stuff():
     2 >> AssertEqual >> 2
@@ -39,8 +41,176 @@ def test_stuff():
     [[1, 2], [2, 3], [3, 4]] >> EachArgs >> operator.add >> AssertEqual >> [3, 5, 7]
 
 
+def test_pipeline():
+    @Pipeable
+    def SquareIt(x):
+        return x * x
+
+    @Pipeable
+    def Add(x, y):
+        return x + y
+
+    @Pipeable
+    def Sub(x, y, scale=1):
+        return (x - y) * scale
+
+    p = Pipeline(Each, SquareIt, Chain(seed=0), Add)
+    [1,2,3] >> p >> AssertEqual >> 14
+    p([1,2,3,4]) >> AssertEqual >> 30
+
+    # partials, keywords and ellipses are bound once when the pipeline is built
+    10 >> Pipeline(Sub(y=1), Sub(..., 2, scale=10), ToStr) >> AssertEqual >> '70'
+    10 >> Pipeline(Sub(1), Add >> 1) >> AssertEqual >> -8
+
+    # as are extra keywords for a **kwargs parameter
+    @Pipeable
+    def Tag(x, **tags):
+        return (x, tags)
+    1 >> Pipeline(Tag(colour='red'), Tag(size=2)) >> AssertEqual >> ((1, {'colour': 'red'}), {'size': 2})
+
+    # pipelines and compositions can be nested
+    3 >> Pipeline(SquareIt >> Compose >> Add(y=1), [ToStr] >> ComposeAll) >> AssertEqual >> '10'
+
+    # arity is checked up front
+    with AssertRaises(TypeError):
+        Pipeline(Each, SquareIt, Chain(seed=0))
+    with AssertRaises(TypeError):
+        Pipeline(lambda x: x)
+
+
+def test_lazyEach():
+    pulled = []
+    def naturals():
+        i = 0
+        while True:
+            pulled.append(i)
+            yield i
+            i += 1
+
+    @Pipeable
+    def SquareIt(x):
+        return x * x
+
+    # nothing is evaluated until the range is pulled
+    r = naturals() >> LazyEach >> SquareIt
+    len(pulled) >> AssertEqual >> 0
+    r.front >> AssertEqual >> 0
+    len(pulled) >> AssertEqual >> 1
+    r.popFront()
+    r.front >> AssertEqual >> 1
+    len(pulled) >> AssertEqual >> 2
+
+    # composes with Chain, Materialise and PushInto
+    [1,2,3] >> LazyEach >> SquareIt >> Chain(seed=0) >> (lambda a, b: a + b) >> AssertEqual >> 14
+    range(10) >> LazyEachIf(f=SquareIt, ifF=lambda x: x % 3 == 0) >> Materialise >> AssertEqual >> [0, 9, 36, 81]
+    [[1,2], [2,3]] >> LazyEachArgs >> (lambda a, b: a * b) >> PushInto >> ListOR([]) >> GetAttr >> 'list' \
+        >> AssertEqual >> [2, 6]
+
+    # and accepts ranges as input
+    IndexableFR([1,2,3]) >> LazyEach >> SquareIt >> Materialise >> AssertEqual >> [1, 4, 9]
+
+
+def test_math():
+    # ranges and iterators are streamed
+    IndexableFR([1,2,3,4]) >> Sum >> AssertEqual >> 10
+    IndexableFR([1,2,3,4]) >> Mean >> AssertEqual >> 2.5
+    IndexableFR([1,2,3,4]) >> Var >> AssertEqual >> 1.25
+    iter([1,2,3,4]) >> Var(dof=1) >> AssertEqual(tolerance=1e-12) >> 5 / 3
+    IndexableFR([1,2,3]) >> CumSum >> Materialise >> AssertEqual >> [1, 3, 6]
+    (x for x in [1,2,3]) >> CumProd >> Materialise >> AssertEqual >> [1, 2, 6]
+    try:
+        import numpy
+    except ModuleNotFoundError:
+        return
+    IndexableFR([1,2,3,4,5]) >> Quantile(q=0.5) >> AssertEqual >> 3.0
+    [1,2,3,4] >> Std(dof=1) >> AssertEqual(tolerance=1e-12) >> (5 / 3) ** 0.5
+    Sum(numpy.arange(5)) >> AssertEqual >> 10
+
+    # Each calls ufuncs once with the whole array
+    calls = []
+    @Pipeable(ufunc=True)
+    def Double(x):
+        calls.append(x)
+        return x * 2
+    list(Each(numpy.arange(3), Double)) >> AssertEqual >> [0, 2, 4]
+    len(calls) >> AssertEqual >> 1
+    Each([1, 2], Double) >> AssertEqual >> [2, 4]
+    len(calls) >> AssertEqual >> 3
+    list(Each(numpy.array([1.0, 4.0]), Sqrt)) >> AssertEqual >> [1.0, 2.0]
+    list(Each(numpy.array([1.0, 4.0]), numpy.sqrt)) >> AssertEqual >> [1.0, 2.0]
+
+
+# module level so they can be pickled for the process pool
+@Pipeable
+def _Scale(x, factor):
+    return x * factor
+
+@Pipeable
+def _FailOn(bad, x):
+    if x == bad:
+        raise ValueError(x)
+    return x
+
+def test_pickling():
+    pickle.loads(pickle.dumps(_Scale))(2, 5) >> AssertEqual >> 10
+    pickle.loads(pickle.dumps(_Scale(factor=3)))(2) >> AssertEqual >> 6
+    assert pickle.loads(pickle.dumps(_Scale))._sig is _Scale._sig
+
+    @Pipeable
+    def NotAtModuleLevel(x):
+        return x
+    with AssertRaises(pickle.PicklingError):
+        pickle.dumps(NotAtModuleLevel)
+
+
+def test_PEach():
+    xs = list(range(100))
+    expected = [x * 3 for x in xs]
+    xs >> PEach(workers=4) >> _Scale(factor=3) >> AssertEqual >> expected
+    xs >> PEach(workers=2, backend='process', chunkSize=7) >> _Scale(factor=3) >> AssertEqual >> expected
+    [] >> PEach >> _Scale(factor=3) >> AssertEqual >> []
+    with AssertRaises(ValueError):
+        xs >> PEach(workers=2, backend='process') >> _FailOn(50)
+    with AssertRaises(ValueError):
+        xs >> PEach(backend='fibres') >> _Scale(factor=3)
+
+
+def test_listUtils():
+    xs = [1, 2, 3, 4, 5]
+    (xs >> First, xs >> Last, IndexableFR(xs) >> First, IndexableFR(xs) >> Last) >> AssertEqual >> (1, 5, 1, 5)
+    (iter(xs) >> First, iter(xs) >> Last) >> AssertEqual >> (1, 5)
+    with AssertRaises(IndexError):
+        iter([]) >> Last
+    # empty ranges raise too rather than answering a sentinel
+    with AssertRaises(IndexError):
+        IterIR([]) >> First
+    with AssertRaises(IndexError):
+        IndexableFR([]) >> First
+    with AssertRaises(IndexError):
+        IndexableFR([]) >> Last
+    (xs >> Take >> 2, xs >> Take >> -2, iter(xs) >> Take >> -2) >> AssertEqual >> ([1, 2], [4, 5], [4, 5])
+    xs >> Cut >> 2 >> AssertEqual >> [[1, 2], [3, 4], [5]]
+    # as numpy.split the indices are where each chunk after the first starts
+    xs >> Cut >> [1, 3] >> AssertEqual >> [[1], [2, 3], [4, 5]]
+    xs >> Cut >> [0, 1, 3] >> AssertEqual >> [[], [1], [2, 3], [4, 5]]
+
+    # ranges are taken and cut lazily so infinite ones are fine
+    naturals = FnAdapterFRange(lambda i: i)
+    naturals >> Cut >> 3 >> Take >> 2 >> Materialise >> AssertEqual >> [[0, 1, 2], [3, 4, 5]]
+    # and an input range is cut into an input range
+    chunks = iter(xs) >> LazyEach >> (lambda x: x) >> Cut >> 2
+    (hasattr(chunks, 'save'), chunks >> Materialise) >> AssertEqual >> (False, [[1, 2], [3, 4], [5]])
+    IndexableFR(xs) >> Take >> -2 >> Materialise >> AssertEqual >> [4, 5]
+
+
 def main():
     test_stuff()
+    test_pipeline()
+    test_lazyEach()
+    test_pickling()
+    test_PEach()
+    test_math()
+    test_listUtils()
     print('pass')
 
 
@@ -25,7 +25,8 @@ def _getPublicMembersOnly(module):
     names = ['coppertop.pipeable', module.__name__]
     members = [(name, o) for (name, o) in inspect.getmembers(module) if (name[0:1] != '_')]
     members = [(name, o) for (name, o) in members if not (inspect.isbuiltin(o) or inspect.ismodule(o))]
-    members = [(name, o) for (name, o) in members if (o.__module__ in names)]
+    # constants (e.g. YYYY_MM_DD) have no __module__ so are taken to belong to the module
+    members = [(name, o) for (name, o) in members if (getattr(o, '__module__', module.__name__) in names)]
     return [name for (name, o) in members]
 
 
@@ -45,6 +46,34 @@ try:
 except:
     pass
 
+try:
+    from . import _arrays
+    from ._arrays import *
+    _all.update(_getPublicMembersOnly(_arrays))
+except:
+    pass
+
+try:
+    from . import _periods
+    from ._periods import *
+    _all.update(_getPublicMembersOnly(_periods))
+except:
+    pass
+
+try:
+    from . import _dateRanges
+    from ._dateRanges import *
+    _all.update(_getPublicMembersOnly(_dateRanges))
+except:
+    pass
+
+try:
+    from . import _calendars
+    from ._calendars import *
+    _all.update(_getPublicMembersOnly(_calendars))
+except:
+    pass
+
 
 _all =list(_all)
 _all.sort()
@@ -0,0 +1,265 @@
+# *******************************************************************************
+#
+#    Copyright (c) 2020 David Briant
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+# *******************************************************************************
+
+
+# Columnar dates and datetimes - one int buffer per array rather than a python object per value. AbstractDateArray
+# holds int32 days since 1970-01-01 and AbstractDateTimeArray int64 ticks since 1970-01-01 00:00 at a single
+# Precision. Scalars are only created when an element is accessed. As with the scalars, datetimes of different
+# precisions don't mix.
+
+
+try:
+    import numpy
+except:
+    numpy = None
+from datetime import date as _date
+
+from ._enums import Precision
+from ._core import AbstractDate, AbstractDateTime, ObservedDateTime, _ticksOf, _abstractDateTimeOfTicks, _abstractDateOf, \
+    _EPOCH_ORDINAL, _TICKS_PER_SECOND
+from ._transitions import TransitionTableFor
+
+_PRECISION_BY_UNIT = {'s': Precision.s, 'ms': Precision.ms, 'us': Precision.us}
+
+
+class _IntBackedArray(object):
+    # shared behaviour - subclasses hold their buffer in ints and implement _new, _intOf and __getitem__ for ints
+    __slots__ = ()
+
+    def __len__(self):
+        return len(self.ints)
+    def __iter__(self):
+        for i in range(len(self.ints)):
+            yield self[i]
+    def __getitem__(self, i):
+        if isinstance(i, (int, numpy.integer)):
+            return self._at(int(self.ints[i]))
+        # slices are views, masks and index arrays copy as in numpy
+        return self._new(self.ints[i])
+
+    # vectorised comparison - against another array or a scalar, answering a bool array
+    def __eq__(self, other):
+        return self.ints == self._intsOf(other)
+    def __ne__(self, other):
+        return self.ints != self._intsOf(other)
+    def __lt__(self, other):
+        return self.ints < self._intsOf(other)
+    def __le__(self, other):
+        return self.ints <= self._intsOf(other)
+    def __gt__(self, other):
+        return self.ints > self._intsOf(other)
+    def __ge__(self, other):
+        return self.ints >= self._intsOf(other)
+    __hash__ = None
+
+    def argsort(self):
+        return numpy.argsort(self.ints, kind='stable')
+    def sort(self):
+        # in place like numpy
+        self.ints.sort(kind='stable')
+    def searchsorted(self, x, side='left'):
+        # x may be a scalar or an array - answers the insertion index (or indices) of x into this sorted array
+        return numpy.searchsorted(self.ints, self._intsOf(x), side)
+
+    def _intsOf(self, x):
+        if isinstance(x, type(self)):
+            self._checkCompatible(x)
+            return x.ints
+        return self._intOf(x)
+    def _checkCompatible(self, other):
+        pass
+    def _fieldsOfDays(self, days):
+        d64 = days.astype('datetime64[D]')
+        months = d64.astype('datetime64[M]')
+        year = d64.astype('datetime64[Y]').astype(numpy.int32) + 1970
+        month = months.astype(numpy.int32) % 12 + 1
+        day = (d64 - months).astype(numpy.int32) + 1
+        return year, month, day
+
+
+class AbstractDateArray(_IntBackedArray):
+    __slots__ = ['ints']
+
+    def __init__(self, x):
+        # x - int day numbers since 1970-01-01, a datetime64 array or a sequence of dates
+        if numpy is None:
+            raise ModuleNotFoundError('AbstractDateArray needs numpy')
+        if isinstance(x, numpy.ndarray) and x.dtype.kind == 'M':
+            x = x.astype('datetime64[D]').astype(numpy.int64)
+        elif not isinstance(x, numpy.ndarray):
+            x = [e.toordinal() - _EPOCH_ORDINAL for e in x]
+        self.ints = numpy.asarray(x, dtype=numpy.int32)
+
+    @property
+    def days(self):
+        return self.ints
+    def _new(self, ints):
+        return AbstractDateArray(ints)
+    def _at(self, days):
+        return _abstractDateOf(days)
+    def _intOf(self, x):
+        if isinstance(x, _date):
+            return x.toordinal() - _EPOCH_ORDINAL
+        raise TypeError('Cannot compare AbstractDateArray with %s' % type(x).__name__)
+
+    @property
+    def year(self):
+        return self._fieldsOfDays(self.ints)[0]
+    @property
+    def month(self):
+        return self._fieldsOfDays(self.ints)[1]
+    @property
+    def day(self):
+        return self._fieldsOfDays(self.ints)[2]
+    def weekday(self):
+        # Monday is 0 (and 1970-01-01 was a Thursday)
+        return (self.ints + 3) % 7
+    def toDatetime64(self):
+        return self.ints.astype('datetime64[D]')
+
+    def __repr__(self):
+        return 'AbstractDateArray(%s)' % numpy.array2string(self.toDatetime64(), threshold=10)
+
+
+class AbstractDateTimeArray(_IntBackedArray):
+    __slots__ = ['ints', 'precision']
+
+    def __init__(self, x, precision=None):
+        # x - int64 ticks since 1970-01-01 00:00 at precision, a datetime64 array (s, ms or us) or a sequence of
+        # AbstractDateTime all of the same precision
+        if numpy is None:
+            raise ModuleNotFoundError('AbstractDateTimeArray needs numpy')
+        if isinstance(x, numpy.ndarray) and x.dtype.kind == 'M':
+            unit = numpy.datetime_data(x.dtype)[0]
+            if precision is None:
+                if unit not in _PRECISION_BY_UNIT:
+                    raise TypeError('datetime64[%s] not handled' % unit)
+                precision = _PRECISION_BY_UNIT[unit]
+            x = x.astype('datetime64[%s]' % precision.name).astype(numpy.int64)
+        elif not isinstance(x, numpy.ndarray):
+            x = list(x)
+            if precision is None:
+                precision = x[0].precision if x else Precision.s
+            x = [_ticksOf(e, precision) for e in x]
+        if precision is None:
+            raise TypeError('precision must be given for an array of ticks')
+        if precision.name not in _TICKS_PER_SECOND:
+            raise TypeError('%s not handled' % repr(precision))
+        self.ints = numpy.asarray(x, dtype=numpy.int64)
+        self.precision = precision
+
+    @property
+    def ticks(self):
+        return self.ints
+    @property
+    def ticksPerSecond(self):
+        return _TICKS_PER_SECOND[self.precision.name]
+    def _new(self, ints):
+        return AbstractDateTimeArray(ints, self.precision)
+    def _at(self, ticks):
+        return _abstractDateTimeOfTicks(ticks, self.precision)
+    def _intOf(self, x):
+        if isinstance(x, AbstractDateTime):
+            return _ticksOf(x, self.precision)
+        raise TypeError('Cannot compare AbstractDateTimeArray with %s' % type(x).__name__)
+    def _checkCompatible(self, other):
+        if self.precision != other.precision:
+            raise TypeError('LHS Precision(%s) != RHS Precision(%s)' % (self.precision, other.precision))
+
+    @property
+    def date(self):
+        return AbstractDateArray(self.ints // (86400 * self.ticksPerSecond))
+    @property
+    def year(self):
+        return self._fieldsOfDays(self.ints // (86400 * self.ticksPerSecond))[0]
+    @property
+    def month(self):
+        return self._fieldsOfDays(self.ints // (86400 * self.ticksPerSecond))[1]
+    @property
+    def day(self):
+        return self._fieldsOfDays(self.ints // (86400 * self.ticksPerSecond))[2]
+    @property
+    def hour(self):
+        return (self._secondOfDay() // 3600).astype(numpy.int32)
+    @property
+    def minute(self):
+        return (self._secondOfDay() // 60 % 60).astype(numpy.int32)
+    @property
+    def second(self):
+        return (self._secondOfDay() % 60).astype(numpy.int32)
+    @property
+    def subsecond(self):
+        if self.precision == Precision.s:
+            return None
+        return (self.ints % self.ticksPerSecond).astype(numpy.int32)
+    def weekday(self):
+        return (self.ints // (86400 * self.ticksPerSecond) + 3) % 7
+    def _secondOfDay(self):
+        return self.ints % (86400 * self.ticksPerSecond) // self.ticksPerSecond
+    def toDatetime64(self):
+        return self.ints.view('datetime64[%s]' % self.precision.name)
+    def asObserved(self, ctx):
+        # each element is taken to be the local date and time in ctx
+        perSecond = self.ticksPerSecond
+        seconds, subseconds = numpy.divmod(self.ints, perSecond)
+        utc = TransitionTableFor(ctx).toUtcArray(seconds) * perSecond + subseconds
+        return ObservedDateTimeArray(AbstractDateTimeArray(utc, self.precision), ctx)
+
+    def __repr__(self):
+        return 'AbstractDateTimeArray(%s, %s)' % (numpy.array2string(self.toDatetime64(), threshold=10), self.precision)
+
+
+class ObservedDateTimeArray(object):
+    # instants held as an AbstractDateTimeArray in UTC plus the single ObserversCtx they are all observed in
+    __slots__ = ['utc', 'ctx']
+
+    def __init__(self, utc, ctx):
+        self.utc = utc
+        self.ctx = ctx
+
+    @property
+    def precision(self):
+        return self.utc.precision
+    @property
+    def local(self):
+        perSecond = self.utc.ticksPerSecond
+        seconds, subseconds = numpy.divmod(self.utc.ints, perSecond)
+        local = TransitionTableFor(self.ctx).toLocalArray(seconds) * perSecond + subseconds
+        return AbstractDateTimeArray(local, self.precision)
+    @property
+    def offset(self):
+        # seconds east of UTC in force at each instant
+        return TransitionTableFor(self.ctx)._offsetsAt(self.utc.ints // self.utc.ticksPerSecond)
+    def toCtx(self, ctx):
+        return ObservedDateTimeArray(self.utc, ctx)
+
+    def __len__(self):
+        return len(self.utc)
+    def __iter__(self):
+        for i in range(len(self.utc)):
+            yield self[i]
+    def __getitem__(self, i):
+        if isinstance(i, (int, numpy.integer)):
+            return ObservedDateTime.fromUtcTicks(int(self.utc.ints[i]), self.precision, self.ctx)
+        return ObservedDateTimeArray(self.utc[i], self.ctx)
+
+    def __repr__(self):
+        return 'ObservedDateTimeArray(%s, %s, %s)' % (
+            numpy.array2string(self.local.toDatetime64(), threshold=10), self.precision, repr(self.ctx)
+        )
+
@@ -0,0 +1,353 @@
+# *******************************************************************************
+#
+#    Copyright (c) 2020 David Briant
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+# *******************************************************************************
+
+
+# Business day calendars - one bit per day over a range of years, set for weekends and holidays, held in a python int.
+# Scalar queries are popcounts and bit scans over slices of the int, joint calendars OR the bits together and date
+# arrays use a prefix count of business days (built once per calendar) with numpy.searchsorted.
+#
+# Holiday rules are built in for GBLO, USNY and EUTA (TARGET) - the holidays for other cities must be registered with
+# RegisterHolidays, e.g. from a vendor file, before use.
+
+
+try:
+    import numpy
+except:
+    numpy = None
+from datetime import date as _date, timedelta as _timedelta
+
+from ..pipeable import Pipeable
+from ._enums import FpMLCity, FpMLCityForName
+from ._core import AbstractDate, _EPOCH_ORDINAL, _dayOf, _abstractDateOf
+from ._arrays import AbstractDateArray
+
+_FIRST_YEAR = 1970
+_LAST_YEAR = 2099
+_popcount = int.bit_count if hasattr(int, 'bit_count') else (lambda x: bin(x).count('1'))
+
+
+class BusinessCalendar(object):
+    __slots__ = ['name', 'firstDay', 'numDays', 'holidays', '_cumBusinessDays']
+
+    def __init__(self, name, firstDay, numDays, holidays):
+        # firstDay - days since 1970-01-01 of bit 0, holidays - an int with a bit set for each non-business day
+        self.name = name
+        self.firstDay = firstDay
+        self.numDays = numDays
+        self.holidays = holidays
+        self._cumBusinessDays = None
+
+    @classmethod
+    def fromHolidays(cls, name, dates, firstYear=_FIRST_YEAR, lastYear=_LAST_YEAR, weekend=(5, 6)):
+        firstDay = _date(firstYear, 1, 1).toordinal() - _EPOCH_ORDINAL
+        numDays = _date(lastYear + 1, 1, 1).toordinal() - _EPOCH_ORDINAL - firstDay
+        holidays = 0
+        for weekday in weekend:
+            # 1970-01-01 was a Thursday so the first day with the given weekday is
+            first = (weekday - (firstDay + 3)) % 7
+            holidays |= _everySeventh(numDays - first) << first
+        for d in dates:
+            i = d.toordinal() - _EPOCH_ORDINAL - firstDay
+            if 0 <= i < numDays:
+                holidays |= 1 << i
+        return cls(name, firstDay, numDays, holidays)
+
+    def __or__(self, other):
+        # the joint calendar - a business day only if it is one in both
+        firstDay = max(self.firstDay, other.firstDay)
+        lastDay = min(self.firstDay + self.numDays, other.firstDay + other.numDays)
+        if lastDay <= firstDay:
+            raise ValueError('%s and %s have no days in common' % (self.name, other.name))
+        numDays = lastDay - firstDay
+        mask = (1 << numDays) - 1
+        holidays = ((self.holidays >> (firstDay - self.firstDay)) | (other.holidays >> (firstDay - other.firstDay))) & mask
+        return BusinessCalendar('%s+%s' % (self.name, other.name), firstDay, numDays, holidays)
+
+    def isBusinessDay(self, day):
+        return not (self.holidays >> self._index(day)) & 1
+
+    def businessDaysBetween(self, start, end):
+        # the number of business days in [start, end) - negative if end is before start
+        if end < start:
+            return -self.businessDaysBetween(end, start)
+        i, j = self._index(start), self._index(end, True)
+        return (j - i) - _popcount((self.holidays >> i) & ((1 << (j - i)) - 1))
+
+    def addBusinessDays(self, day, n):
+        # the nth business day after day (or before if n is negative) - day itself needn't be a business day
+        i = self._index(day)
+        if n > 0:
+            i = self._nthBusinessAfter(i, n)
+        elif n < 0:
+            i = self._nthBusinessBefore(i, -n)
+        return self.firstDay + i
+
+    def _nthBusinessAfter(self, i, n):
+        i += 1
+        while True:
+            width = min(2 * n + 8, self.numDays - i)
+            if width <= 0:
+                raise ValueError('%s business days from %s is beyond the end of %s' % (n, i, self.name))
+            window = ~(self.holidays >> i) & ((1 << width) - 1)
+            count = _popcount(window)
+            if count >= n:
+                for _ in range(n - 1):
+                    window &= window - 1
+                return i + (window & -window).bit_length() - 1
+            n -= count
+            i += width
+
+    def _nthBusinessBefore(self, i, n):
+        while True:
+            width = min(2 * n + 8, i)
+            if width <= 0:
+                raise ValueError('%s business days before %s is before the start of %s' % (n, i, self.name))
+            i -= width
+            window = ~(self.holidays >> i) & ((1 << width) - 1)
+            count = _popcount(window)
+            if count >= n:
+                for _ in range(n - 1):
+                    window ^= 1 << (window.bit_length() - 1)
+                return i + window.bit_length() - 1
+            n -= count
+
+    def _index(self, day, inclusiveEnd=False):
+        i = day - self.firstDay
+        if not (0 <= i < self.numDays or (inclusiveEnd and i == self.numDays)):
+            raise ValueError('day %s is outside %s' % (day, self.name))
+        return i
+
+    # vectorised versions over int day arrays
+    def isBusinessDayArray(self, days):
+        cum, i = self._cum(), self._indices(days)
+        return cum[i + 1] != cum[i]
+
+    def businessDaysBetweenArray(self, starts, ends):
+        cum = self._cum()
+        return cum[self._indices(ends, True)] - cum[self._indices(starts)]
+
+    def addBusinessDaysArray(self, days, n):
+        cum, i = self._cum(), self._indices(days)
+        n = numpy.broadcast_to(n, i.shape)
+        target = numpy.where(n > 0, cum[i + 1] + n, cum[i] + n + 1)
+        j = numpy.where(n == 0, i, numpy.searchsorted(cum, target, 'left') - 1)
+        if (j < 0).any() or (j >= self.numDays).any():
+            raise ValueError('result is outside %s' % self.name)
+        return self.firstDay + j
+
+    def _cum(self):
+        # _cum[k] is the number of business days before bit k
+        if self._cumBusinessDays is None:
+            bits = numpy.unpackbits(
+                numpy.frombuffer(self.holidays.to_bytes((self.numDays + 7) // 8, 'little'), dtype=numpy.uint8),
+                bitorder='little'
+            )[:self.numDays]
+            cum = numpy.zeros(self.numDays + 1, dtype=numpy.int32)
+            numpy.cumsum(1 - bits, out=cum[1:])
+            self._cumBusinessDays = cum
+        return self._cumBusinessDays
+
+    def _indices(self, days, inclusiveEnd=False):
+        i = numpy.asarray(days, dtype=numpy.int64) - self.firstDay
+        if (i < 0).any() or (i > self.numDays - (0 if inclusiveEnd else 1)).any():
+            raise ValueError('days outside %s' % self.name)
+        return i
+
+    def __repr__(self):
+        return 'BusinessCalendar(%s)' % self.name
+
+
+def _everySeventh(n):
+    # an int with bits 0, 7, 14... set below bit n - doubling so it's O(log n) big int ops
+    bits, width = 1, 7
+    while width < n:
+        bits |= bits << width
+        width *= 2
+    return bits & ((1 << max(n, 0)) - 1)
+
+
+# *******************************************************************************
+# Calendars per FpMLCity
+# *******************************************************************************
+
+_calendarByCity = {}
+
+def BusinessCalendarFor(cities):
+    # cities - an FpMLCity, its code, a BusinessCalendar or a sequence of those for a joint calendar
+    if isinstance(cities, BusinessCalendar):
+        return cities
+    if isinstance(cities, (FpMLCity, str)):
+        city = cities if isinstance(cities, FpMLCity) else FpMLCityForName(cities)
+        cal = _calendarByCity.get(city, None)
+        if cal is None:
+            rule = _HOLIDAY_RULES.get(city.name, None)
+            if rule is None:
+                raise KeyError('No holidays registered for %s' % city.name)
+            dates = [d for year in range(_FIRST_YEAR, _LAST_YEAR + 1) for d in rule(year)]
+            cal = _calendarByCity[city] = BusinessCalendar.fromHolidays(city.name, dates)
+        return cal
+    cals = [BusinessCalendarFor(c) for c in cities]
+    if not cals:
+        raise ValueError('No calendars given')
+    joint = cals[0]
+    for cal in cals[1:]:
+        joint = joint | cal
+    return joint
+
+def RegisterHolidays(city, dates, firstYear=_FIRST_YEAR, lastYear=_LAST_YEAR, weekend=(5, 6)):
+    # replaces any calendar for city with one built from the given holiday dates (weekends are added)
+    city = city if isinstance(city, FpMLCity) else FpMLCityForName(city)
+    cal = _calendarByCity[city] = BusinessCalendar.fromHolidays(city.name, dates, firstYear, lastYear, weekend)
+    return cal
+
+
+def _easterSunday(year):
+    # anonymous Gregorian algorithm
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return _date(year, month, day + 1)
+
+def _nthWeekday(year, month, weekday, n):
+    # n >= 1 counts from the start of the month, n == -1 is the last
+    if n > 0:
+        first = _date(year, month, 1)
+        return first + _timedelta((weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = _date(year + month // 12, month % 12 + 1, 1) - _timedelta(1)
+    return last - _timedelta((last.weekday() - weekday) % 7)
+
+def _nextMondayIfWeekend(d):
+    return d + _timedelta((7 - d.weekday()) % 7) if d.weekday() >= 5 else d
+
+def _londonHolidays(year):
+    # England and Wales bank holidays
+    easter = _easterSunday(year)
+    newYear = _nextMondayIfWeekend(_date(year, 1, 1)) if year >= 1974 else None
+    christmas, boxingDay = _date(year, 12, 25), _date(year, 12, 26)
+    if christmas.weekday() == 5:
+        christmas, boxingDay = _date(year, 12, 27), _date(year, 12, 28)
+    elif christmas.weekday() == 6:
+        christmas = _date(year, 12, 27)
+    elif boxingDay.weekday() == 5:
+        boxingDay = _date(year, 12, 28)
+    earlyMay = _nthWeekday(year, 5, 0, 1) if year >= 1978 else None
+    spring = _nthWeekday(year, 5, 0, -1)
+    extras = _LONDON_SPECIAL_DAYS.get(year, ())
+    if year in _LONDON_MOVED_DAYS:
+        earlyMay, spring = _LONDON_MOVED_DAYS[year]
+    return [d for d in (
+        newYear, easter - _timedelta(2), easter + _timedelta(1), earlyMay, spring, _nthWeekday(year, 8, 0, -1),
+        christmas, boxingDay
+    ) if d is not None] + list(extras)
+
+_LONDON_MOVED_DAYS = {
+    # year: (early May, spring)
+    1977: (None, _date(1977, 6, 6)),
+    1995: (_date(1995, 5, 8), _date(1995, 5, 29)),
+    2002: (_date(2002, 5, 6), _date(2002, 6, 4)),
+    2012: (_date(2012, 5, 7), _date(2012, 6, 4)),
+    2020: (_date(2020, 5, 8), _date(2020, 5, 25)),
+    2022: (_date(2022, 5, 2), _date(2022, 6, 2)),
+}
+_LONDON_SPECIAL_DAYS = {
+    1973: (_date(1973, 11, 14),),
+    1977: (_date(1977, 6, 7),),
+    1981: (_date(1981, 7, 29),),
+    1999: (_date(1999, 12, 31),),
+    2002: (_date(2002, 6, 3),),
+    2011: (_date(2011, 4, 29),),
+    2012: (_date(2012, 6, 5),),
+    2022: (_date(2022, 6, 3), _date(2022, 9, 19)),
+    2023: (_date(2023, 5, 8),),
+}
+
+def _newYorkHolidays(year):
+    # Federal Reserve holidays - a holiday on a Sunday is observed on the Monday, on a Saturday not at all
+    fixed = [_date(year, 1, 1), _date(year, 7, 4), _date(year, 11, 11), _date(year, 12, 25)]
+    if year >= 2022:
+        fixed.append(_date(year, 6, 19))
+    days = [d + _timedelta(1) if d.weekday() == 6 else d for d in fixed if d.weekday() != 5]
+    if year >= 1986:
+        days.append(_nthWeekday(year, 1, 0, 3))
+    return days + [
+        _nthWeekday(year, 2, 0, 3), _nthWeekday(year, 5, 0, -1), _nthWeekday(year, 9, 0, 1),
+        _nthWeekday(year, 10, 0, 2), _nthWeekday(year, 11, 3, 4)
+    ]
+
+def _targetHolidays(year):
+    # TARGET closing days - before TARGET started (1999) the 2002 onwards days are used for want of anything better
+    if year == 1999:
+        return [_date(1999, 1, 1), _date(1999, 12, 25), _date(1999, 12, 31)]
+    easter = _easterSunday(year)
+    days = [
+        _date(year, 1, 1), easter - _timedelta(2), easter + _timedelta(1), _date(year, 5, 1), _date(year, 12, 25),
+        _date(year, 12, 26)
+    ]
+    if year == 2001:
+        days.append(_date(year, 12, 31))
+    return days
+
+_HOLIDAY_RULES = dict(
+    GBLO=_londonHolidays,
+    USNY=_newYorkHolidays,
+    EUTA=_targetHolidays,
+)
+
+
+# *******************************************************************************
+# Pipeables
+# *******************************************************************************
+
+def _daysOf(x):
+    return x.days if isinstance(x, AbstractDateArray) else _dayOf(x)
+
+
+@Pipeable(cal=object, d=AbstractDate)
+def IsBusinessDay(cal, d):
+    # d >> IsBusinessDay(FpMLCity.GBLO) or d >> IsBusinessDay((FpMLCity.GBLO, FpMLCity.USNY))
+    return BusinessCalendarFor(cal).isBusinessDay(_dayOf(d))
+
+@Pipeable(cal=object, d=AbstractDateArray)
+def IsBusinessDay(cal, d):
+    return BusinessCalendarFor(cal).isBusinessDayArray(d.days)
+
+
+@Pipeable(n=object, cal=object, d=AbstractDate)
+def AddBusinessDays(n, cal, d):
+    # d >> AddBusinessDays(2, FpMLCity.GBLO)
+    return _abstractDateOf(BusinessCalendarFor(cal).addBusinessDays(_dayOf(d), n))
+
+@Pipeable(n=object, cal=object, d=AbstractDateArray)
+def AddBusinessDays(n, cal, d):
+    # n may be an int or an int array the same length as d
+    return AbstractDateArray(BusinessCalendarFor(cal).addBusinessDaysArray(d.days, n))
+
+
+@Pipeable
+def BusinessDaysBetween(cal, start, end):
+    # the number of business days in [start, end) - either or both of start and end may be arrays
+    cal = BusinessCalendarFor(cal)
+    if isinstance(start, AbstractDateArray) or isinstance(end, AbstractDateArray):
+        return cal.businessDaysBetweenArray(_daysOf(start), _daysOf(end))
+    return cal.businessDaysBetween(_dayOf(start), _dayOf(end))
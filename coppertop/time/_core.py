@@ -72,41 +72,22 @@
 # HMUZ - futures contract month code
 
 
+try:
+    import numpy
+except:
+    numpy = None
 from typing import Union
-from datetime import datetime as _datetime, date as _date, time as _time, timedelta as _timedelta
-from pytz import timezone as _timezone
-import math
-from _strptime import _strptime
+from datetime import datetime as _datetime, date as _date, time as _time
+import math, re, calendar as _calendar
 from collections import namedtuple
 
 from ..pipeable import Pipeable, Missing
+from ..range_interfaces import IInputRange, GetIRIter
 from ._enums import ObserversCtx, FpMLCity, IanaCity, IanaTz, Precision, FpMLCityForName, IanaCityForName, IanaTzForName, ToIanaCity
+from ._transitions import TransitionTableFor
 
 _YMDHMSSPZ = namedtuple('_YMDHMSSPZ', ['y', 'M', 'd', 'h', 'm', 's', 'ss', 'p', 'z'])
 
-_dispatcherByFnName = {}
-
-class _Dispatcher(object):
-    def __init__(self, fnName):
-        self._fnName = fnName
-        self._fnByTypes = {}    #  this can be replaced with something that can handle subtypes etc
-    def __call__(self, *args, **kwargs):
-        types = tuple(arg.__class__ for arg in args)
-        fn = self._fnByTypes.get(types)
-        if fn is None:
-            raise TypeError("no match")
-        return fn(*args, **kwargs)
-    def register(self, types, function):
-        self._fnByTypes[types] = function
-        return self
-
-def overload(*types):
-    def registerMultiMethod(function):
-        fnName = function.__name__
-        return _dispatcherByFnName.setdefault(fnName, _Dispatcher(fnName)).register(types, function)
-    return registerMultiMethod
-
-
 
 class AbstractDate(_date):
     def __repr__(self):
@@ -202,14 +183,87 @@ class ObservedTimeOfDay(object):
             tz = args[2]
 
 class ObservedDateTime(object):
-    def __init__(self):
-        # AbstractDate, ObservedTimeOfDay
-        # AbstractDate, AbstractTimeOfDay, ObserversCtx
-        # AbstractDate, H, M, [S], [subSeconds, precision], ObserversCtx
-        # YMDHMS, ObserversCtx
-        # y, M, d, AbstractTimeOfDay, ObserversCtx
+    # an instant, held as ticks since 1970-01-01 00:00 UTC at a Precision, and the ObserversCtx it is observed in
+    __slots__ = ['utcTicks', 'precision', 'ctx']
+
+    def __init__(self, *args):
+        # AbstractDateTime, ObserversCtx
         # y, M, d, H, M, [S], [subSeconds, precision], ObserversCtx
-        pass
+        # the date and time are local to the ctx
+        if len(args) < 2 or not isinstance(args[-1], ObserversCtx):
+            raise TypeError('the last arg must be an ObserversCtx')
+        *local, ctx = args
+        adt = local[0] if len(local) == 1 and isinstance(local[0], AbstractDateTime) else AbstractDateTime(*local)
+        perSecond = _TICKS_PER_SECOND[adt.precision.name]
+        seconds, subseconds = divmod(_ticksOf(adt, adt.precision), perSecond)
+        self.utcTicks = TransitionTableFor(ctx).toUtc(seconds) * perSecond + subseconds
+        self.precision = adt.precision
+        self.ctx = ctx
+
+    @classmethod
+    def fromUtcTicks(cls, utcTicks, precision, ctx):
+        odt = cls.__new__(cls)
+        odt.utcTicks = utcTicks
+        odt.precision = precision
+        odt.ctx = ctx
+        return odt
+
+    @property
+    def local(self):
+        perSecond = _TICKS_PER_SECOND[self.precision.name]
+        seconds, subseconds = divmod(self.utcTicks, perSecond)
+        return _abstractDateTimeOfTicks(TransitionTableFor(self.ctx).toLocal(seconds) * perSecond + subseconds, self.precision)
+    @property
+    def utc(self):
+        return _abstractDateTimeOfTicks(self.utcTicks, self.precision)
+    @property
+    def offset(self):
+        # seconds east of UTC in force at this instant
+        return TransitionTableFor(self.ctx).offsetAt(self.utcTicks // _TICKS_PER_SECOND[self.precision.name])
+
+    def __eq__(self, other):
+        if not isinstance(other, ObservedDateTime):
+            raise TypeError('RHS (%s) is not ObservedDateTime' % repr(other))
+        if self.precision != other.precision:
+            raise TypeError('LHS Precision(%s) != RHS Precision(%s)' % (self.precision, other.precision))
+        return self.utcTicks == other.utcTicks and self.ctx == other.ctx
+    def __hash__(self):
+        return hash((self.utcTicks, self.ctx))
+    def __repr__(self):
+        adt = self.local
+        return 'ObservedDateTime(%s, %s, %s, %s, %s, %s, %s, %s, %s)' % (
+            adt.year, adt.month, adt.day, adt.hour, adt.minute, adt.second, adt.subsecond, adt.precision, repr(self.ctx)
+        )
+
+
+_EPOCH_ORDINAL = _date(1970, 1, 1).toordinal()
+_TICKS_PER_SECOND = {'s': 1, 'ms': 1000, 'us': 1000000}
+
+def _dayOf(d):
+    return d.toordinal() - _EPOCH_ORDINAL
+
+def _abstractDateOf(days):
+    d = _date.fromordinal(days + _EPOCH_ORDINAL)
+    return AbstractDate(d.year, d.month, d.day)
+
+def _ticksOf(adt, precision):
+    if adt.precision != precision:
+        raise TypeError('LHS Precision(%s) != RHS Precision(%s)' % (precision, adt.precision))
+    perSecond = _TICKS_PER_SECOND[precision.name]
+    days = adt._dt.toordinal() - _EPOCH_ORDINAL
+    seconds = days * 86400 + adt.hour * 3600 + adt.minute * 60 + adt.second
+    return seconds * perSecond + (adt.subsecond or 0)
+
+def _abstractDateTimeOfTicks(ticks, precision):
+    perSecond = _TICKS_PER_SECOND[precision.name]
+    days, subday = divmod(ticks, 86400 * perSecond)
+    seconds, subseconds = divmod(subday, perSecond)
+    d = _date.fromordinal(days + _EPOCH_ORDINAL)
+    h, seconds = divmod(seconds, 3600)
+    m, s = divmod(seconds, 60)
+    if precision == Precision.s:
+        return AbstractDateTime(d.year, d.month, d.day, h, m, s)
+    return AbstractDateTime(d.year, d.month, d.day, h, m, s, subseconds, precision)
 
 
 
@@ -218,42 +272,137 @@ class ObservedDateTime(object):
 # *******************************************************************************
 
 def _parseDTTz(x, format):
-    # rework to be more efficient in bulk by parsing format separately from x or handle x as an array / range
-    if format.find('ns') > -1:
-        raise NotImplementedError('format ns (nano seconds) has not been implemented yet')
-    if format.find('ms') > -1:
-        precision = Precision.ms
-    elif format.find('us') > -1:
-        precision = Precision.us
-    else:
-        precision = Precision.s
-    cFormat = _simpleFormatToCTimeFormat(format)
-    if (i := cFormat.find(' FFFF')) > -1:
-        iRightmostSpace = x.rfind(' ')
-        datePart = x[:iRightmostSpace]
-        dateFormat = cFormat[0:i]
-        tzPart = x[iRightmostSpace + 1:]
-        tz = ParseFpMLCity(tzPart)
-    elif (i := cFormat.find(' IIII')) > -1:
-        iRightmostSpace = x.rfind(' ')
-        datePart = x[:iRightmostSpace]
-        dateFormat = cFormat[0:i]
-        tzPart = x[iRightmostSpace + 1:]
-        tz = ParseIanaCity(tzPart)
-    elif (i := cFormat.find(' ZZZZ')) > -1:
-        iRightmostSpace = x.rfind(' ')
-        datePart = x[:iRightmostSpace]
-        dateFormat = cFormat[0:i]
-        tzPart = x[iRightmostSpace + 1:]
-        tz = ParseIanaTz(tzPart)
-    else:
-        datePart = x
-        dateFormat = cFormat
-        tz = None
-    dt, micro, _ = _strptime(datePart, dateFormat)
-    seconds = dt[5]
-    _checkPrecision(seconds, micro, precision)
-    return _YMDHMSSPZ(dt[0], dt[1], dt[2], dt[3], dt[4], seconds, micro, precision, tz)
+    return _compiledFormat(format).parse(x)
+
+def _compiledFormat(format):
+    compiled = _compiledFormatByFormat.get(format, None)
+    if compiled is None:
+        compiled = _compiledFormatByFormat[format] = _CompiledFormat(format)
+    return compiled
+
+_compiledFormatByFormat = {}
+
+# token -> (regex, slot in _YMDHMSSPZ or a name for tokens needing more than int conversion)
+_TOKENS = {
+    'yyyy': (r'(\d{4})', 0),  'yy': (r'(\d{2})', 'yy'),
+    'MMMM': (r'([A-Za-z]+)', 'MMMM'),  'MMM': (r'([A-Za-z]{3})', 'MMM'),  'MM': (r'(\d{2})', 1),  'M': (r'(\d{1,2})', 1),
+    'dddd': (r'[A-Za-z]+', None),  'ddd': (r'[A-Za-z]{3}', None),  'dd': (r'(\d{2})', 2),  'd': (r'(\d{1,2})', 2),
+    'hh': (r'(\d{2})', 3),  'h': (r'(\d{1,2})', 3),  'HH': (r'(\d{2})', 'H'),  'H': (r'(\d{1,2})', 'H'),
+    'mm': (r'(\d{2})', 4),  'm': (r'(\d{1,2})', 4),
+    'ss': (r'(\d{2})', 5),  's': (r'(\d{1,2})', 5),
+    'ms': (r'(\d{1,6})', 'f'),  'us': (r'(\d{1,6})', 'f'),
+    'tt': (r'([AaPp][Mm])', 't'),  't': (r'([AaPp])', 't'),
+    'FFFF': (r'(\S+)', 'FFFF'),  'IIII': (r'(\S+)', 'IIII'),  'ZZZZ': (r'(\S+)', 'ZZZZ'),
+}
+_TOKEN_RE = re.compile('|'.join(sorted(_TOKENS, key=len, reverse=True)))
+_MONTH_BY_NAME = {name.lower(): i for i, name in enumerate(_calendar.month_name) if name}
+_MONTH_BY_NAME.update({name.lower(): i for i, name in enumerate(_calendar.month_abbr) if name})
+_YY_PIVOT = 70              # two digit years from _YY_PIVOT are 19yy, below it 20yy - shared by every parser
+
+class _CompiledFormat(object):
+    # a coppertop format string translated once into a regex plus per group conversions
+    __slots__ = ['format', 'regex', 'linesRegex', 'converters', 'precision', 'allInt', 'slots']
+
+    def __init__(self, format):
+        if format.find('ns') > -1:
+            raise NotImplementedError('format ns (nano seconds) has not been implemented yet')
+        if format.find('ms') > -1:
+            self.precision = Precision.ms
+        elif format.find('us') > -1:
+            self.precision = Precision.us
+        else:
+            self.precision = Precision.s
+        self.format = format
+        pattern, converters, i = [], [], 0
+        for match in _TOKEN_RE.finditer(format):
+            pattern.append(re.escape(format[i:match.start()]))
+            regex, slot = _TOKENS[match.group()]
+            pattern.append(regex)
+            if slot is not None:
+                converters.append(slot)
+            i = match.end()
+        pattern.append(re.escape(format[i:]))
+        pattern = ''.join(pattern)
+        self.regex = re.compile(pattern)
+        self.linesRegex = re.compile('^%s$' % pattern, re.MULTILINE)
+        self.converters = converters
+        # the common case - every group is an int going straight into a slot
+        self.allInt = all(isinstance(slot, int) for slot in converters)
+        self.slots = converters if self.allInt else None
+
+    def parse(self, x):
+        match = self.regex.fullmatch(x)
+        if match is None:
+            raise ValueError('time data %r does not match format %r' % (x, self.format))
+        return self.fromGroups(match.groups())
+
+    def fromGroups(self, groups):
+        fields = [1900, 1, 1, 0, 0, 0, 0]
+        if self.allInt:
+            for slot, g in zip(self.slots, groups):
+                fields[slot] = int(g)
+            tz = None
+        else:
+            tz, hour12, pm = None, None, None
+            for slot, g in zip(self.converters, groups):
+                if isinstance(slot, int):
+                    fields[slot] = int(g)
+                elif slot == 'f':
+                    fields[6] = int(g + '0' * (6 - len(g)))
+                elif slot == 'yy':
+                    yy = int(g)
+                    fields[0] = yy + (1900 if yy >= _YY_PIVOT else 2000)
+                elif slot == 'MMMM' or slot == 'MMM':
+                    month = _MONTH_BY_NAME.get(g.lower(), None)
+                    if month is None:
+                        raise ValueError('unknown month name %r' % g)
+                    fields[1] = month
+                elif slot == 'H':
+                    hour12 = int(g)
+                elif slot == 't':
+                    pm = g[0] in 'Pp'
+                elif slot == 'FFFF':
+                    tz = ParseFpMLCity(g)
+                elif slot == 'IIII':
+                    tz = ParseIanaCity(g)
+                elif slot == 'ZZZZ':
+                    tz = ParseIanaTz(g)
+            if hour12 is not None:
+                fields[3] = hour12 % 12 + (12 if pm else 0)
+        _checkPrecision(fields[5], fields[6], self.precision)
+        return _YMDHMSSPZ(fields[0], fields[1], fields[2], fields[3], fields[4], fields[5], fields[6], self.precision, tz)
+
+    def parseColumns(self, xs):
+        # answers y, M, d, h, m, s, ss and tz as lists - one regex pass over the whole batch then column wise int
+        # conversion
+        n = len(xs)
+        text = '\n'.join(xs)
+        rows = self.linesRegex.findall(text) if n else []
+        if not self.allInt or len(rows) != n or text.count('\n') != n - 1:
+            # something doesn't match (or contains a newline) or needs more than int conversion
+            rows = [self.parse(x) for x in xs]
+            return [[row[i] for row in rows] for i in range(7)] + [[row.z for row in rows]]
+        if len(self.slots) == 1:
+            columns = [list(map(int, rows))]
+        else:
+            columns = [list(map(int, column)) for column in zip(*rows)]
+        fieldColumns = [[1900] * n, [1] * n, [1] * n, [0] * n, [0] * n, [0] * n, [0] * n, [None] * n]
+        for slot, column in zip(self.slots, columns):
+            fieldColumns[slot] = column
+        return fieldColumns
+
+def _stringsOf(xs):
+    # a list of str from a list, tuple, range, iterable or ndarray of str or bytes
+    if hasattr(xs, 'tolist'):
+        xs = xs.tolist()
+    elif isinstance(xs, IInputRange):
+        xs = list(xs >> GetIRIter)
+    elif not isinstance(xs, list):
+        xs = list(xs)
+    if xs and isinstance(xs[0], bytes):
+        xs = [x.decode() for x in xs]
+    return xs
+
 
 def _roundToPrecision(seconds, micro, precision):
     if precision == Precision.s:
@@ -278,38 +427,6 @@ def _checkPrecision(seconds, micro, precision):
     else:
         raise TypeError('%s not handled' % repr(precision))
 
-def _simpleFormatToCTimeFormat(simpleFormat):
-    # a little care is needed here to avoid clashes between formats
-    answer = simpleFormat
-    answer = answer.replace('HH', '%I')
-    answer = answer.replace('H', '%<single-digit-12hour>')
-    answer = answer.replace('hh', '%H')
-    answer = answer.replace('h', '%<single-digit-24hour>')
-    answer = answer.replace('ms', '%f')
-    answer = answer.replace('us', '%f')
-    answer = answer.replace('tt', '%p')
-    answer = answer.replace('t', '%<single-digit-AM/PM>')
-    answer = answer.replace('yyyy', '%Y')
-    answer = answer.replace('yy', '%y')
-    answer = answer.replace('y', '%<single-digit-year>')
-    answer = answer.replace('%%<single-digit-year>', '%y')        # correct the mis-substitution above
-    answer = answer.replace('MMMM', '%B')
-    answer = answer.replace('MMM', '%b')
-    answer = answer.replace('MM', '%m')
-    answer = answer.replace('M', '%<single-digit-month>')
-    answer = answer.replace('dddd', '%A')
-    answer = answer.replace('ddd', '%a')
-    answer = answer.replace('dd', '%d')
-    answer = answer.replace('d', '%e')
-    answer = answer.replace('%%e', '%d')        # correct the mis-substitution above
-    answer = answer.replace('mm', '%M')
-    answer = answer.replace('m', '%<single-digit-minute>')
-    answer = answer.replace('%%<single-digit-minute>', '%m')
-    answer = answer.replace('ss', '%S')
-    answer = answer.replace('s', '%<single-digit-second>')
-    answer = answer.replace('zzz', '%Z')
-    return answer
-
 # fast formats - _ can be slash, dot, hyphen or any other single character
 YY_MM_DD = 1
 YYYY_MM_DD = 2
@@ -325,7 +442,7 @@ def ParseAbstractDate(format, s, locale=Missing):
 
         if format == YY_MM_DD:
             YY = int(s[0:2])
-            YYYY = YY + 1900 if YY >= 70 else YY + 2000
+            YYYY = YY + 1900 if YY >= _YY_PIVOT else YY + 2000
             return AbstractDate(YYYY, int(s[3:5]), int(s[6:8]))
 
         elif format == YYYY_MM_DD:
@@ -333,7 +450,7 @@ def ParseAbstractDate(format, s, locale=Missing):
 
         elif format == DD_MM_YY:
             YY = int(s[6:8])
-            YYYY = YY + 1900 if YY >= 70 else YY + 2000
+            YYYY = YY + 1900 if YY >= _YY_PIVOT else YY + 2000
             return AbstractDate(YYYY, int(s[3:5]), int(s[0:2]))
 
         elif format == DD_MM_YYYY:
@@ -341,7 +458,7 @@ def ParseAbstractDate(format, s, locale=Missing):
 
         elif format == MM_DD_YY:
             YY = int(s[6:8])
-            YYYY = YY + 1900 if YY >= 70 else YY + 2000
+            YYYY = YY + 1900 if YY >= _YY_PIVOT else YY + 2000
             return AbstractDate(YYYY, int(s[0:2]), int(s[3:5]))
 
         elif format == MM_DD_YYYY:
@@ -352,6 +469,82 @@ def ParseAbstractDate(format, s, locale=Missing):
         assert args[-1] == None
         return AbstractDate(*args[0:3])
 
+# vectorised fast formats - the digits are extracted arithmetically over the whole array
+
+# format -> (width, year, month and day (start, end) positions)
+_FAST_LAYOUTS = {
+    YY_MM_DD: (8, (0, 2), (3, 5), (6, 8)),
+    YYYY_MM_DD: (10, (0, 4), (5, 7), (8, 10)),
+    DD_MM_YY: (8, (6, 8), (3, 5), (0, 2)),
+    DD_MM_YYYY: (10, (6, 10), (3, 5), (0, 2)),
+    MM_DD_YY: (8, (6, 8), (0, 2), (3, 5)),
+    MM_DD_YYYY: (10, (6, 10), (0, 2), (3, 5)),
+}
+
+@Pipeable
+def ParseAbstractDateArray(format, xs, dayNumbers=False, validate=True):
+    """ParseAbstractDateArray(format, xs, dayNumbers=False, validate=True) - format is one of the fast formats, e.g.
+    YYYY_MM_DD, and xs an S (or U) numpy array, a list of str / bytes or fixed-width bytes (e.g. a column sliced out
+    of a file). Answers a datetime64[D] array or, if dayNumbers, an int32 array of days since 1970-01-01. validate
+    checks the digits and that each date exists"""
+    if numpy is None:
+        raise ModuleNotFoundError('ParseAbstractDateArray needs numpy')
+    y, M, d = _fastFormatFields(format, _fixedWidthArray(xs, _FAST_LAYOUTS[format][0]), validate)
+    days = _daysFromCivil(y, M, d)
+    return days if dayNumbers else days.astype('datetime64[D]')
+
+def _fixedWidthArray(xs, width):
+    if isinstance(xs, (bytes, bytearray, memoryview)):
+        return numpy.frombuffer(xs, dtype='S%d' % width)
+    if not isinstance(xs, numpy.ndarray):
+        xs = numpy.array(_stringsOf(xs) if isinstance(xs, IInputRange) else xs)
+    if xs.size == 0:
+        # numpy.array([]) is float64 so answer an empty array of the right width before checking the dtype
+        return numpy.empty(xs.shape, dtype='S%d' % width)
+    if xs.dtype.kind == 'U':
+        xs = numpy.char.encode(xs, 'ascii')
+    if xs.dtype.kind != 'S':
+        raise TypeError('Expected an S or U array but got %s' % xs.dtype)
+    return xs
+
+def _fastFormatFields(format, xs, validate):
+    width, ys, ms, ds = _FAST_LAYOUTS[format]
+    if xs.dtype.itemsize < width:
+        raise ValueError('Expected at least %s characters but got %s' % (width, xs.dtype))
+    chars = numpy.ascontiguousarray(xs).view(numpy.uint8).reshape(len(xs), xs.dtype.itemsize)[:, :width]
+    digits = chars.astype(numpy.int32) - ord('0')
+    def number(start, end):
+        answer = digits[:, start]
+        for i in range(start + 1, end):
+            answer = answer * 10 + digits[:, i]
+        return answer
+    y, M, d = number(*ys), number(*ms), number(*ds)
+    if ys[1] - ys[0] == 2:
+        y = y + numpy.where(y >= _YY_PIVOT, 1900, 2000)
+    if validate:
+        digitCols = [i for start, end in (ys, ms, ds) for i in range(start, end)]
+        ok = ((digits[:, digitCols] >= 0) & (digits[:, digitCols] <= 9)).all(axis=1)
+        ok &= (M >= 1) & (M <= 12)
+        leap = (y % 4 == 0) & ((y % 100 != 0) | (y % 400 == 0))
+        ok &= (d >= 1) & (d <= _DAYS_IN_MONTH[numpy.clip(M, 1, 12)] + ((M == 2) & leap))
+        if not ok.all():
+            i = int(numpy.argmin(ok))
+            raise ValueError('Invalid date %r at index %s' % (xs[i].decode(errors='replace'), i))
+    return y, M, d
+
+if numpy is not None:
+    _DAYS_IN_MONTH = numpy.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=numpy.int32)
+
+def _daysFromCivil(y, M, d):
+    # days since 1970-01-01 for the proleptic Gregorian calendar - http://howardhinnant.github.io/date_algorithms.html
+    y = y - (M <= 2)
+    era = numpy.floor_divide(y, 400)
+    yoe = y - era * 400
+    doy = (153 * (M + numpy.where(M > 2, -3, 9)) + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return (era * 146097 + doe - 719468).astype(numpy.int32)
+
+
 @Pipeable
 def ParseAbstractTimeOfDay(format, s, locale=Missing):
     pass
@@ -360,7 +553,36 @@ def ParseAbstractTimeOfDay(format, s, locale=Missing):
 def ParseAbstractDateTime(format, s, locale=Missing):
     args = _parseDTTz(s, format)
     assert args[-1] == None
-    return AbstractDateTime(*args[0:8])
+    return _abstractDateTimeFrom(args)
+
+@Pipeable
+def ParseAbstractDates(format, xs, locale=Missing):
+    # bulk version of ParseAbstractDate for a list, range or ndarray of strings - answers a list
+    if isinstance(format, int) and numpy is not None:
+        y, M, d = _fastFormatFields(format, _fixedWidthArray(xs, _FAST_LAYOUTS[format][0]), True)
+        return list(map(AbstractDate, y.tolist(), M.tolist(), d.tolist()))
+    xs = _stringsOf(xs)
+    if isinstance(format, int):
+        return [ParseAbstractDate(format, x) for x in xs]
+    y, M, d, h, m, s, ss, tz = _compiledFormat(format).parseColumns(xs)
+    assert not any(tz)
+    return list(map(AbstractDate, y, M, d))
+
+@Pipeable
+def ParseAbstractDateTimes(format, xs, locale=Missing):
+    # bulk version of ParseAbstractDateTime for a list, range or ndarray of strings - answers a list
+    compiled = _compiledFormat(format)
+    y, M, d, h, m, s, ss, tz = compiled.parseColumns(_stringsOf(xs))
+    assert not any(tz)
+    p = compiled.precision
+    if p == Precision.ms:
+        ss = [micros // 1000 for micros in ss]
+    return list(map(AbstractDateTime, y, M, d, h, m, s, ss, [p] * len(y)))
+
+def _abstractDateTimeFrom(args):
+    # args.ss is always in micros whereas AbstractDateTime takes subseconds at its precision
+    subseconds = args.ss // 1000 if args.p == Precision.ms else args.ss
+    return AbstractDateTime(args.y, args.M, args.d, args.h, args.m, args.s, subseconds, args.p)
 
 @Pipeable
 def ParseObservedTimeOfDay(format, s, locale=Missing):
@@ -398,31 +620,29 @@ def ParseOffsetTz(s, locale=Missing):
 # *******************************************************************************
 
 
-@overload(AbstractDate)
-def ToString(format, ad, locale=Missing):
-    return repr(ad)
-
-@overload(str, AbstractTimeOfDay)
-def ToString(format, atod, locale=Missing):
-    return repr(atod)
+@Pipeable(format=str, x=AbstractDate)
+def ToString(format, x, locale=Missing):
+    return repr(x)
 
-@overload(str, AbstractDateTime)
-def ToString(format, adt, locale=Missing):
-    return repr(adt)
+@Pipeable(format=str, x=AbstractTimeOfDay)
+def ToString(format, x, locale=Missing):
+    return repr(x)
 
-@overload(str, ObservedTimeOfDay)
-def ToString(format, otod, locale=Missing):
-    return repr(otod)
+@Pipeable(format=str, x=AbstractDateTime)
+def ToString(format, x, locale=Missing):
+    return repr(x)
 
-@overload(str, ObservedDateTime)
-def ToString(format, otd, locale=Missing):
-    return repr(otd)
+@Pipeable(format=str, x=ObservedTimeOfDay)
+def ToString(format, x, locale=Missing):
+    return repr(x)
 
-@overload(str, ObserversCtx)
-def ToString(format, oc, locale=Missing):
-    return repr(oc)
+@Pipeable(format=str, x=ObservedDateTime)
+def ToString(format, x, locale=Missing):
+    return repr(x)
 
-ToString = Pipeable(ToString)
+@Pipeable(format=str, x=ObserversCtx)
+def ToString(format, x, locale=Missing):
+    return repr(x)
 
 
 
@@ -430,32 +650,32 @@ ToString = Pipeable(ToString)
 # TimeZone Conversions
 # *******************************************************************************
 
-def _example():
-    LON = _timezone('Europe/London')
-    UTC = _timezone('AbstractDateTime')
-    NYC = _timezone('America/New_York')
-
-    a = LON.localize(_datetime(2020,6,1,16,15))
-    b = a.astimezone(NYC)
-    c = b.astimezone(UTC)
+@Pipeable(ctx=ObserversCtx, odt=ObservedDateTime)
+def ToCtx(ctx: Union[FpMLCity, IanaCity, IanaTz], odt):
+    # Converts a ObservedDateTime into a new ObservedDateTime for the given ObserversCtx
+    # odt >> ToCtx(FpMLCity.USNY)
+    return ObservedDateTime.fromUtcTicks(odt.utcTicks, odt.precision, ctx)
 
+@Pipeable(ctx=ObserversCtx, odt=object)
+def ToCtx(ctx, odt):
+    # ObservedDateTimeArray (and anything else that knows how to convert itself)
+    return odt.toCtx(ctx)
 
-@overload(ObserversCtx, ObservedDateTime)
-def ToCtx(ctx, odt: Union[FpMLCity, IanaCity, IanaTz]):
-    # Converts a ObservedDateTime into a new ObservedDateTime for the given ObserversCtx
-    # odt >> ToDateTimeTz(GBLN)
-    assert isinstance(ctx, (FpMLCity, IanaCity, IanaTz))
-    raise NotImplementedError()
+@Pipeable(ctx=ObserversCtx, x=AbstractTimeOfDay)
+def AsObserved(ctx, x):
+    # a ctx's UTC offset depends on the date so a time of day alone can't be placed on the transition table
+    raise TypeError('Cannot observe %r in %r without a date - combine it with an AbstractDate into an '
+        'AbstractDateTime first' % (x, ctx))
 
-@overload(ObserversCtx, AbstractTimeOfDay)
-def AsObserved(ctx, atod):
-    assert isinstance(ctx, (FpMLCity, IanaCity, IanaTz))
-    raise NotImplementedError()
+@Pipeable(ctx=ObserversCtx, x=AbstractDateTime)
+def AsObserved(ctx, x):
+    # x is taken to be the local date and time in ctx
+    return ObservedDateTime(x, ctx)
 
-@overload(ObserversCtx, AbstractDateTime)
-def AsObserved(ctx, adt):
-    assert isinstance(ctx, (FpMLCity, IanaCity, IanaTz))
-    raise NotImplementedError()
+@Pipeable(ctx=ObserversCtx, x=object)
+def AsObserved(ctx, x):
+    # AbstractDateTimeArray (and anything else that knows how to convert itself)
+    return x.asObserved(ctx)
 
 
 
@@ -482,30 +702,3 @@ def AsOfMicro(x):
 def AsOfNano(x):
     assert isinstance(x, (AbstractTimeOfDay, AbstractDateTime, ObservedTimeOfDay, ObservedDateTime))
     raise NotImplementedError
-
-
-
-# *******************************************************************************
-# Operations
-# *******************************************************************************
-
-class DaySecond(object):
-    def __init__(self, *args):
-        self.days = args[0]
-        # days
-        # days, seconds
-        # days, seconds, subseconds, precision
-
-# @Pipeable(ds=DaySecond, utc=ObservedDateTime)
-@Pipeable
-def AddPeriod(ds, utc):
-    # typical usage aDate >> AddPeriod(dt)
-    assert utc.ctx == IanaTz.UTC
-    pyDT = utc._datetime + _timedelta(ds.days, ds.second, ds.milli )
-    return ObservedDateTime(pyDT.year, pyDT.month, pyDT.day)
-
-@Pipeable
-def AddPeriod(ds, ad):
-    # typical usage anAbstractDate >> AddPeriod(dt)
-    pyDT = ad + _timedelta(ds.days)
-    return AbstractDate(pyDT.year, pyDT.month, pyDT.day)
@@ -0,0 +1,128 @@
+# *******************************************************************************
+#
+#    Copyright (c) 2020 David Briant
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+# *******************************************************************************
+
+
+try:
+    import numpy
+except:
+    numpy = None
+from datetime import date as _date
+
+from ..pipeable import Pipeable
+from ..range_interfaces import IForwardRange, IRandomAccessFinite
+from ._core import _dayOf, _abstractDateOf, _EPOCH_ORDINAL
+from ._arrays import AbstractDateArray
+
+
+class DateRange(IRandomAccessFinite):
+    # the dates start, start + step, ... before end - held as a python range of day numbers so length, indexing,
+    # slicing and save() are O(1) and AbstractDates are only created by front, back and [i]
+    hasBatch = True
+
+    def __init__(self, start, end, step=1):
+        self.days = range(_dayOf(start), _dayOf(end), step)
+
+    @classmethod
+    def ofDays(cls, days):
+        # days - a range of day numbers since 1970-01-01
+        r = cls.__new__(cls)
+        r.days = days
+        return r
+
+    @property
+    def empty(self):
+        return not self.days
+    @property
+    def front(self):
+        return _abstractDateOf(self.days[0])
+    def popFront(self):
+        self.days = self.days[1:]
+    @property
+    def back(self):
+        return _abstractDateOf(self.days[-1])
+    def popBack(self):
+        self.days = self.days[:-1]
+    @property
+    def length(self):
+        return len(self.days)
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return DateRange.ofDays(self.days[i])
+        return _abstractDateOf(self.days[i])
+    def moveAt(self, i):
+        return self[i]
+    def frontBatch(self, n):
+        return [_abstractDateOf(d) for d in self.days[:n]]
+    def popFrontN(self, n):
+        n = max(0, min(n, len(self.days)))
+        self.days = self.days[n:]
+        return n
+    def save(self):
+        return DateRange.ofDays(self.days)
+
+    def toDateArray(self):
+        return AbstractDateArray(numpy.arange(self.days.start, self.days.stop, self.days.step, dtype=numpy.int32))
+
+    def __repr__(self):
+        if not self.days:
+            return 'DateRange()'
+        return 'DateRange(%s, %s, %s)' % (self.front, _abstractDateOf(self.days.stop), self.days.step)
+
+
+class _DateRangeChunks(IForwardRange):
+    # consecutive sub DateRanges of r, each ending before the day answered by nextBoundary(firstDayOfChunk)
+    def __init__(self, r, nextBoundary):
+        self.r = r
+        self.nextBoundary = nextBoundary
+    @property
+    def empty(self):
+        return self.r.empty
+    @property
+    def front(self):
+        return self.r[:self._chunkLength()]
+    def popFront(self):
+        self.r = self.r[self._chunkLength():]
+    def _chunkLength(self):
+        days = self.r.days
+        boundary = self.nextBoundary(days[0])
+        # the number of elements of days before boundary - ceil division as step may be > 1
+        return max(1, -((days[0] - boundary) // days.step))
+    def save(self):
+        return _DateRangeChunks(self.r.save(), self.nextBoundary)
+
+
+def _firstDayOfNextMonth(day):
+    d = _date.fromordinal(day + _EPOCH_ORDINAL)
+    return _date(d.year + d.month // 12, d.month % 12 + 1, 1).toordinal() - _EPOCH_ORDINAL
+
+
+@Pipeable
+def ChunkByMonth(r):
+    # r >> ChunkByMonth - answers a forward range of the DateRanges of r in each calendar month
+    if r.days.step < 0:
+        raise ValueError('descending DateRanges cannot be chunked')
+    return _DateRangeChunks(r.save(), _firstDayOfNextMonth)
+
+@Pipeable
+def ChunkByWeek(r, firstWeekday=0):
+    # r >> ChunkByWeek - answers a forward range of the DateRanges of r in each week, weeks starting on firstWeekday
+    # (Monday is 0 as in AbstractDate.weekday())
+    if r.days.step < 0:
+        raise ValueError('descending DateRanges cannot be chunked')
+    # 1970-01-01 was a Thursday
+    return _DateRangeChunks(r.save(), lambda day: day + 7 - (day + 3 - firstWeekday) % 7)
@@ -17,6 +17,8 @@
 # *******************************************************************************
 
 
+import os, csv, functools
+
 from ..pipeable import Pipeable
 
 
@@ -34,77 +36,136 @@ class ObserversCtx(NamedEnum):pass
 
 
 
-_FpMLCityByName = {}
-class FpMLCity(ObserversCtx):
+_DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+
+class _CtxIndex(object):
+    # the names of one kind of ObserversCtx, loaded from a data file on first use. Lookups by name (or attribute name)
+    # are dict hits on an int index and instances are only created when first asked for, then interned so identity
+    # comparison and hashing work as before
+    __slots__ = ['cls', 'load', 'names', 'extras', 'indexByName', 'nameByAttr', 'instances']
+
+    def __init__(self, cls, load):
+        # load answers (names, extras) where extras[i] is any per name data
+        self.cls = cls
+        self.load = load
+        self.names = None
+
+    def forName(self, name):
+        if self.names is None:
+            self._load()
+        i = self.indexByName[name]
+        ctx = self.instances[i]
+        if ctx is None:
+            ctx = self.instances[i] = object.__new__(self.cls)
+            ObserversCtx.__init__(ctx, name)
+        return ctx
+
+    def forAttr(self, attr):
+        if self.names is None:
+            self._load()
+        return self.forName(self.nameByAttr[attr])
+
+    def extraOf(self, name):
+        if self.names is None:
+            self._load()
+        return self.extras[self.indexByName[name]]
+
+    def allNames(self):
+        if self.names is None:
+            self._load()
+        return self.names
+
+    def _load(self):
+        names, extras = self.load()
+        self.indexByName = {name: i for i, name in enumerate(names)}
+        self.nameByAttr = {}
+        for name in names:
+            self.nameByAttr.setdefault(_attrNameOf(name), name)
+        self.instances = [None] * len(names)
+        self.extras = extras
+        self.names = names
+
+
+def _attrNameOf(name):
+    # e.g. Europe/London -> Europe_London, America/Port-au-Prince -> America_Port_au_Prince, Etc/GMT+5 -> Etc_GMTp5
+    return name.replace('/', '_').replace('-', '_').replace('+', 'p')
+
+def _dataLines(filename):
+    with open(os.path.join(_DATA_DIR, filename), encoding='utf-8') as f:
+        return [line.rstrip('\n') for line in f if line.strip() and line[0] != '#']
+
+def _loadFpML():
+    rows = list(csv.reader(_dataLines('fpml_business_centres.csv')))
+    return tuple(row[0] for row in rows), tuple(row[1] for row in rows)
+
+@functools.lru_cache(maxsize=None)
+def _ianaNames():
+    # answers the cities, the tzs and for each tz the tz database zone it uses (None if it is one itself)
+    cities, tzs, zones = [], [], []
+    for line in _dataLines('iana_zones.txt'):
+        name, *zone = line.split()
+        if '/' in name and not name.startswith('Etc/'):
+            cities.append(name)
+        else:
+            tzs.append(name)
+            zones.append(zone[0] if zone else None)
+    return tuple(cities), tuple(tzs), tuple(zones)
+
+def _loadIanaCities():
+    cities = _ianaNames()[0]
+    return cities, (None,) * len(cities)
+
+def _loadIanaTzs():
+    return _ianaNames()[1:]
+
+
+class _IndexedCtxType(type):
+    # answers e.g. FpMLCity.GBLO and IanaCity.Europe_London from the index
+    def __getattr__(cls, attr):
+        if attr[:1] == '_':
+            raise AttributeError(attr)
+        try:
+            return cls._index.forAttr(attr)
+        except KeyError:
+            raise AttributeError("type object '%s' has no attribute '%s'" % (cls.__name__, attr)) from None
+
+
+class _IndexedCtx(ObserversCtx, metaclass=_IndexedCtxType):
+    def __new__(cls, name):
+        # instances are interned - unknown names raise KeyError
+        return cls._index.forName(name)
     def __init__(self, name):
-        super().__init__(name)
-        _FpMLCityByName[name] = self
-# see https://www.fpml.org/spec/coding-scheme/fpml-schemes.html#s5.16
-# TODO load from XML config
-FpMLCity.AUSY = FpMLCity('AUSY')    # Sydney, Australia
-FpMLCity.CATO = FpMLCity('CATO')    # Toronto, Canada
-FpMLCity.CHZU = FpMLCity('CHZU')    # Zurich, Switzerland
-FpMLCity.CNBE = FpMLCity('CNBE')    # Beijing, China
-FpMLCity.DEFR = FpMLCity('DEFR')    # Frankfurt, Germany
-FpMLCity.ESMA = FpMLCity('ESMA')    # Madrid, Spain
-FpMLCity.FRPA = FpMLCity('FRPA')    # Paris, France
-FpMLCity.GBLO = FpMLCity('GBED')    # London, Edinburgh
-FpMLCity.GBLO = FpMLCity('GBLO')    # London, United Kingdom
-FpMLCity.GRAT = FpMLCity('GRAT')    # Athens, Greece
-FpMLCity.HKHK = FpMLCity('HKHK')    # Hong Kong, Hong Kong
-FpMLCity.ITMI = FpMLCity('ITMI')    # Milan, Italy
-FpMLCity.JPTO = FpMLCity('JPTO')    # Tokyo, Japan
-FpMLCity.KRSE = FpMLCity('KRSE')    # Seoul, Republic of Korea
-FpMLCity.MYKL = FpMLCity('MYKL')    # Kuala Lumpur, Malaysia
-FpMLCity.RUMO = FpMLCity('RUMO')    # Moscow, Russian Federation
-FpMLCity.SGSI = FpMLCity('SGSI')    # Singapore, Singapore
-FpMLCity.USCH = FpMLCity('USCH')    # Chicago, United States
-FpMLCity.USDC = FpMLCity('USDC')    # Washington, District of Columbia, United States
-FpMLCity.USNY = FpMLCity('USNY')    # New York, United States
-def FpMLCityForName(name):
-    return _FpMLCityByName[name]
+        pass
 
 
+class FpMLCity(_IndexedCtx):pass
+FpMLCity._index = _CtxIndex(FpMLCity, _loadFpML)
+def FpMLCityForName(name):
+    return FpMLCity._index.forName(name)
 
-_IanaCityByName = {}
-class IanaCity(ObserversCtx):
-    def __init__(self, name):
-        super().__init__(name)
-        _IanaCityByName[name] = self
-# TODO load from Iana database
-IanaCity.Europe_London = IanaCity('Europe/London')
-IanaCity.Europe_Paris = IanaCity('Europe/Paris')
-IanaCity.America_New_York = IanaCity('America/New_York')
-IanaCity.Asia_Hong_Kong = IanaCity('Asia/Hong_Kong')
-def IanaCityForName(name):
-    return _IanaCityByName[name]
 
+class IanaCity(_IndexedCtx):pass
+IanaCity._index = _CtxIndex(IanaCity, _loadIanaCities)
+def IanaCityForName(name):
+    return IanaCity._index.forName(name)
 
 
-_IanaTzByName = {}
-class IanaTz(ObserversCtx):
-    def __init__(self, name):
-        super().__init__(name)
-        _IanaTzByName[name] = self
-# TODO load from Iana database
-IanaTz.BST = IanaTz('BST')
-IanaTz.GMT = IanaTz('GMT')
-IanaTz.GMT = IanaTz('EST')
-IanaTz.GMT = IanaTz('ESD')
+class IanaTz(_IndexedCtx):pass
+IanaTz._index = _CtxIndex(IanaTz, _loadIanaTzs)
 def IanaTzForName(name):
-    return _IanaTzByName[name]
+    return IanaTz._index.forName(name)
 
 
+def _zoneOfIanaTz(ianaTz):
+    # the tz database zone for an IanaTz, e.g. Etc/GMT-1 for BST
+    return IanaTz._index.extraOf(ianaTz.name) or ianaTz.name
 
-_IanaCityByFpMLCity= dict(
-    GBLO = IanaCity.Europe_London,
-    GBED = IanaCity.Europe_London,
-    USDC = IanaCity.America_New_York,
-    USNY = IanaCity.America_New_York
-)
 @Pipeable
 def ToIanaCity(fpmlCity):
-    return _IanaCityByFpMLCity[fpmlCity]
+    # fpmlCity may be an FpMLCity or its code
+    code = fpmlCity.name if isinstance(fpmlCity, FpMLCity) else fpmlCity
+    return IanaCity._index.forName(FpMLCity._index.extraOf(code))
 
 
 
@@ -0,0 +1,206 @@
+# *******************************************************************************
+#
+#    Copyright (c) 2020 David Briant
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+# *******************************************************************************
+
+
+# Periods as integer ticks - a DaySecond is days plus ticks within the day at a Precision so adding one to a date or
+# datetime (or a whole array of them) is an integer add. A period may be added to a value of the same or a finer
+# precision (which is exact) but not a coarser one.
+
+
+try:
+    import numpy
+except:
+    numpy = None
+
+from ..pipeable import Pipeable
+from ._enums import IanaTz, Precision
+from ._core import AbstractDate, AbstractDateTime, ObservedDateTime, _dayOf, _abstractDateOf, _ticksOf, \
+    _abstractDateTimeOfTicks, _TICKS_PER_SECOND
+from ._arrays import AbstractDateArray, AbstractDateTimeArray
+
+
+class DaySecond(object):
+    __slots__ = ['days', 'ticks', 'precision']
+
+    def __init__(self, *args):
+        # days
+        # days, seconds
+        # days, seconds, subseconds, precision
+        if len(args) == 1:
+            days, seconds, subseconds, precision = args[0], 0, 0, Precision.s
+        elif len(args) == 2:
+            days, seconds, subseconds, precision = args[0], args[1], 0, Precision.s
+        elif len(args) == 4:
+            days, seconds, subseconds, precision = args
+        else:
+            raise TypeError('%s args passed, 1, 2 or 4 required - days, [seconds], [subSeconds, precision]' % len(args))
+        if precision.name not in _TICKS_PER_SECOND:
+            raise TypeError('%s not handled' % repr(precision))
+        perSecond = _TICKS_PER_SECOND[precision.name]
+        # normalised so 0 <= ticks < a day
+        self.days, self.ticks = divmod(days * 86400 * perSecond + seconds * perSecond + subseconds, 86400 * perSecond)
+        self.precision = precision
+
+    @classmethod
+    def ofTicks(cls, ticks, precision):
+        # ticks - the whole period in ticks at precision
+        ds = cls.__new__(cls)
+        ds.days, ds.ticks = divmod(ticks, 86400 * _TICKS_PER_SECOND[precision.name])
+        ds.precision = precision
+        return ds
+
+    @property
+    def seconds(self):
+        return self.ticks // _TICKS_PER_SECOND[self.precision.name]
+    @property
+    def subseconds(self):
+        if self.precision == Precision.s:
+            return None
+        return self.ticks % _TICKS_PER_SECOND[self.precision.name]
+
+    def ticksAt(self, precision):
+        # the whole period in ticks at precision
+        return (self.days * 86400 * _TICKS_PER_SECOND[self.precision.name] + self.ticks) * _scale(self.precision, precision)
+
+    def __neg__(self):
+        return DaySecond.ofTicks(-self.ticksAt(self.precision), self.precision)
+    def __eq__(self, other):
+        if not isinstance(other, DaySecond):
+            return NotImplemented
+        if self.precision != other.precision:
+            raise TypeError('LHS Precision(%s) != RHS Precision(%s)' % (self.precision, other.precision))
+        return self.days == other.days and self.ticks == other.ticks
+    def __hash__(self):
+        return hash((self.days, self.ticks))
+    def __repr__(self):
+        if self.precision == Precision.s:
+            return 'DaySecond(%s, %s)' % (self.days, self.seconds)
+        return 'DaySecond(%s, %s, %s, %s)' % (self.days, self.seconds, self.subseconds, self.precision)
+
+
+class DaySecondArray(object):
+    # periods held as int64 ticks at a single Precision
+    __slots__ = ['ticks', 'precision']
+
+    def __init__(self, ticks, precision):
+        if numpy is None:
+            raise ModuleNotFoundError('DaySecondArray needs numpy')
+        self.ticks = numpy.asarray(ticks, dtype=numpy.int64)
+        self.precision = precision
+
+    @property
+    def days(self):
+        return self.ticks // (86400 * _TICKS_PER_SECOND[self.precision.name])
+    @property
+    def seconds(self):
+        return self.ticks % (86400 * _TICKS_PER_SECOND[self.precision.name]) // _TICKS_PER_SECOND[self.precision.name]
+    @property
+    def subseconds(self):
+        if self.precision == Precision.s:
+            return None
+        return self.ticks % _TICKS_PER_SECOND[self.precision.name]
+
+    def ticksAt(self, precision):
+        return self.ticks * _scale(self.precision, precision)
+
+    def __len__(self):
+        return len(self.ticks)
+    def __iter__(self):
+        for i in range(len(self.ticks)):
+            yield self[i]
+    def __getitem__(self, i):
+        if isinstance(i, (int, numpy.integer)):
+            return DaySecond.ofTicks(int(self.ticks[i]), self.precision)
+        return DaySecondArray(self.ticks[i], self.precision)
+    def __repr__(self):
+        return 'DaySecondArray(%s, %s)' % (numpy.array2string(self.ticks, threshold=10), self.precision)
+
+
+def _scale(fromPrecision, toPrecision):
+    # the multiplier taking ticks at fromPrecision to toPrecision - only going finer is exact
+    fromPerSecond, toPerSecond = _TICKS_PER_SECOND[fromPrecision.name], _TICKS_PER_SECOND[toPrecision.name]
+    if toPerSecond < fromPerSecond:
+        raise TypeError('Cannot add a period of Precision(%s) to Precision(%s)' % (fromPrecision, toPrecision))
+    return toPerSecond // fromPerSecond
+
+def _wholeDays(ds):
+    ticks = ds.ticksAt(ds.precision)
+    days, rem = divmod(ticks, 86400 * _TICKS_PER_SECOND[ds.precision.name])
+    if (rem != 0).any() if hasattr(rem, 'any') else rem:
+        raise TypeError('Only whole days can be added to dates')
+    return days
+
+
+# *******************************************************************************
+# Adding periods
+# *******************************************************************************
+
+@Pipeable(ds=DaySecond, x=AbstractDate)
+def AddPeriod(ds, x):
+    # typical usage anAbstractDate >> AddPeriod(DaySecond(1))
+    return _abstractDateOf(_dayOf(x) + int(_wholeDays(ds)))
+
+@Pipeable(ds=DaySecond, x=AbstractDateTime)
+def AddPeriod(ds, x):
+    return _abstractDateTimeOfTicks(_ticksOf(x, x.precision) + ds.ticksAt(x.precision), x.precision)
+
+@Pipeable(ds=DaySecond, x=ObservedDateTime)
+def AddPeriod(ds, x):
+    # elapsed time so only defined in UTC - convert with ToCtx(IanaTz.UTC) first
+    if x.ctx is not IanaTz.UTC:
+        raise TypeError('Periods can only be added to ObservedDateTimes in UTC, not %s' % repr(x.ctx))
+    return ObservedDateTime.fromUtcTicks(x.utcTicks + ds.ticksAt(x.precision), x.precision, x.ctx)
+
+@Pipeable(ds=(DaySecond, DaySecondArray), x=AbstractDateArray)
+def AddPeriod(ds, x):
+    # a single period or one per element
+    return AbstractDateArray(x.days + _wholeDays(ds))
+
+@Pipeable(ds=(DaySecond, DaySecondArray), x=AbstractDateTimeArray)
+def AddPeriod(ds, x):
+    return AbstractDateTimeArray(x.ticks + ds.ticksAt(x.precision), x.precision)
+
+
+# *******************************************************************************
+# Differencing
+# *******************************************************************************
+
+@Pipeable(start=AbstractDate, end=AbstractDate)
+def PeriodBetween(start, end):
+    # end - start, i.e. start >> AddPeriod(PeriodBetween(start, end)) == end
+    return DaySecond(_dayOf(end) - _dayOf(start))
+
+@Pipeable(start=AbstractDateTime, end=AbstractDateTime)
+def PeriodBetween(start, end):
+    return DaySecond.ofTicks(_ticksOf(end, start.precision) - _ticksOf(start, start.precision), start.precision)
+
+@Pipeable(start=ObservedDateTime, end=ObservedDateTime)
+def PeriodBetween(start, end):
+    if start.precision != end.precision:
+        raise TypeError('LHS Precision(%s) != RHS Precision(%s)' % (start.precision, end.precision))
+    return DaySecond.ofTicks(end.utcTicks - start.utcTicks, start.precision)
+
+@Pipeable(start=AbstractDateArray, end=AbstractDateArray)
+def PeriodBetween(start, end):
+    return DaySecondArray((end.days.astype(numpy.int64) - start.days) * 86400, Precision.s)
+
+@Pipeable(start=AbstractDateTimeArray, end=AbstractDateTimeArray)
+def PeriodBetween(start, end):
+    if start.precision != end.precision:
+        raise TypeError('LHS Precision(%s) != RHS Precision(%s)' % (start.precision, end.precision))
+    return DaySecondArray(end.ticks - start.ticks, start.precision)
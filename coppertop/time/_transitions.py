@@ -0,0 +1,126 @@
+# *******************************************************************************
+#
+#    Copyright (c) 2020 David Briant
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+#
+# *******************************************************************************
+
+
+# UTC offset transition tables - one per ObserversCtx, built once from the tz database and cached. Converting an
+# instant is then a binary search for the offset in force plus an integer add, and arrays are converted with a single
+# numpy.searchsorted. pytz's tables run out in 2037 after which the last offset is used.
+
+
+try:
+    import numpy
+except:
+    numpy = None
+from bisect import bisect_right
+from datetime import datetime as _datetime
+import pytz
+
+from ._enums import ObserversCtx, FpMLCity, IanaCity, IanaTz, ToIanaCity, _zoneOfIanaTz
+
+_BEGINNING_OF_TIME = -(2 ** 62)
+_EPOCH = _datetime(1970, 1, 1)
+
+
+class TransitionTable(object):
+    __slots__ = ['zoneName', 'utcTransitions', 'offsets', '_npTransitions', '_npOffsets']
+
+    def __init__(self, zoneName, utcTransitions, offsets):
+        # utcTransitions - sorted seconds since the epoch (UTC) at which offsets[i] (in seconds) comes into force
+        self.zoneName = zoneName
+        self.utcTransitions = utcTransitions
+        self.offsets = offsets
+        self._npTransitions = None
+        self._npOffsets = None
+
+    def offsetAt(self, utcSeconds):
+        return self.offsets[bisect_right(self.utcTransitions, utcSeconds) - 1]
+
+    def toLocal(self, utcSeconds):
+        return utcSeconds + self.offsets[bisect_right(self.utcTransitions, utcSeconds) - 1]
+
+    def toUtc(self, localSeconds):
+        # a local time may be ambiguous (when the clocks go back) in which case the earlier instant is answered, or
+        # may not exist (when the clocks go forward) in which case it is moved forward by the size of the gap
+        i = bisect_right(self.utcTransitions, localSeconds) - 1
+        candidates = self.offsets[max(i - 1, 0):i + 2]
+        valid = [o for o in candidates if self.offsetAt(localSeconds - o) == o]
+        if valid:
+            return localSeconds - max(valid)
+        return localSeconds - self.offsetAt(localSeconds - max(candidates))
+
+    def toLocalArray(self, utcSeconds):
+        return utcSeconds + self._offsetsAt(utcSeconds)
+
+    def toUtcArray(self, localSeconds):
+        transitions, offsets = self._arrays()
+        i = numpy.searchsorted(transitions, localSeconds, 'right') - 1
+        n = len(offsets)
+        best = numpy.full(localSeconds.shape, numpy.iinfo(numpy.int64).min)
+        largest = numpy.full(localSeconds.shape, numpy.iinfo(numpy.int64).min)
+        for delta in (-1, 0, 1):
+            o = offsets[numpy.clip(i + delta, 0, n - 1)]
+            largest = numpy.maximum(largest, o)
+            ok = self._offsetsAt(localSeconds - o) == o
+            best = numpy.where(ok & (o > best), o, best)
+        gap = best == numpy.iinfo(numpy.int64).min
+        if gap.any():
+            best[gap] = self._offsetsAt(localSeconds[gap] - largest[gap])
+        return localSeconds - best
+
+    def _offsetsAt(self, utcSeconds):
+        transitions, offsets = self._arrays()
+        return offsets[numpy.searchsorted(transitions, utcSeconds, 'right') - 1]
+
+    def _arrays(self):
+        if self._npTransitions is None:
+            self._npTransitions = numpy.array(self.utcTransitions, dtype=numpy.int64)
+            self._npOffsets = numpy.array(self.offsets, dtype=numpy.int64)
+        return self._npTransitions, self._npOffsets
+
+    def __repr__(self):
+        return 'TransitionTable(%s, %s transitions)' % (self.zoneName, len(self.utcTransitions))
+
+
+_tableByCtx = {}
+
+def TransitionTableFor(ctx):
+    table = _tableByCtx.get(ctx, None)
+    if table is None:
+        table = _tableByCtx[ctx] = _buildTable(_zoneNameOf(ctx))
+    return table
+
+def _zoneNameOf(ctx):
+    if isinstance(ctx, FpMLCity):
+        return ToIanaCity(ctx).name
+    if isinstance(ctx, IanaCity):
+        return ctx.name
+    if isinstance(ctx, IanaTz):
+        return _zoneOfIanaTz(ctx)
+    raise TypeError('%s is not a FpMLCity, IanaCity or IanaTz' % repr(ctx))
+
+def _buildTable(zoneName):
+    tz = pytz.timezone(zoneName)
+    if hasattr(tz, '_utc_transition_times'):
+        transitions = [_BEGINNING_OF_TIME] + [
+            int((t - _EPOCH).total_seconds()) for t in tz._utc_transition_times[1:]
+        ]
+        offsets = [int(utcoffset.total_seconds()) for utcoffset, dst, name in tz._transition_info]
+    else:
+        transitions = [_BEGINNING_OF_TIME]
+        offsets = [int(tz.utcoffset(_EPOCH).total_seconds())]
+    return TransitionTable(zoneName, transitions, offsets)
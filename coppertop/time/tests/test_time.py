@@ -17,13 +17,20 @@
 # *******************************************************************************
 
 
-from ...testing import AssertEqual
+import numpy as np
+from ...testing import AssertEqual, AssertRaises
 from .._core import AbstractDateTime, AbstractDate, ObservedTimeOfDay, ObservedDateTime, AbstractTimeOfDay, Precision, \
     ParseAbstractDateTime, ParseAbstractDate, ParseObservedTimeOfDay, ParseObservedDateTime, ParseObserversCtx, ParseAbstractTimeOfDay, \
-    ToString, \
-    ObserversCtx, FpMLCity, IanaCity, IanaTz, \
-    YYYY_MM_DD
+    ToString, ParseAbstractDates, ParseAbstractDateTimes, ParseAbstractDateArray, ToCtx, AsObserved, \
+    ObserversCtx, FpMLCity, IanaCity, IanaTz, FpMLCityForName, IanaCityForName, IanaTzForName, ToIanaCity, \
+    YYYY_MM_DD, DD_MM_YY, MM_DD_YYYY
 from .._core import _parseDTTz
+from .._arrays import AbstractDateArray, AbstractDateTimeArray
+from .._periods import DaySecond, DaySecondArray, AddPeriod, PeriodBetween
+from .._dateRanges import DateRange, ChunkByMonth, ChunkByWeek
+from ...ranges import Materialise, RMap
+from .._calendars import BusinessCalendarFor, RegisterHolidays, IsBusinessDay, AddBusinessDays, BusinessDaysBetween
+from ..._std import Year, Month, Day, Hour, Minute, Second, Weekday
 
 
 
@@ -72,6 +79,101 @@ def test_parsing():
 
 
 
+def test_compiledParsing():
+    "2020.01.01 16:15:00.001" >> ParseAbstractDateTime(format='yyyy.MM.dd hh:mm:ss.ms') >> AssertEqual \
+        >> AbstractDateTime(2020, 1, 1, 16, 15, 0, 1, Precision.ms)
+    "3 March 2021 4:05pm" >> ParseAbstractDateTime(format='d MMMM yyyy H:mmtt') >> AssertEqual \
+        >> AbstractDateTime(2021, 3, 3, 16, 5)
+    "Mon 05-Apr-21" >> ParseAbstractDate(format='ddd dd-MMM-yy') >> AssertEqual >> AbstractDate(2021, 4, 5)
+    with AssertRaises(ValueError):
+        "2020/01/01" >> ParseAbstractDate(format='yyyy.MM.dd')
+    with AssertRaises(ValueError):
+        _parseDTTz("2020.01.01 16:15:00.0001", 'yyyy.MM.dd hh:mm:ss.ms')
+
+    # bulk
+    ['2020.01.02', '2021.12.31'] >> ParseAbstractDates(format='yyyy.MM.dd') >> AssertEqual \
+        >> [AbstractDate(2020, 1, 2), AbstractDate(2021, 12, 31)]
+    (b'2020.01.02', b'2021.12.31') >> ParseAbstractDates(format='yyyy.MM.dd') >> AssertEqual \
+        >> [AbstractDate(2020, 1, 2), AbstractDate(2021, 12, 31)]
+    ['02/01/20'] >> ParseAbstractDates(format=DD_MM_YY) >> AssertEqual >> [AbstractDate(2020, 1, 2)]
+    ['2020.01.02 03:04:05.6', '2020.01.02 03:04:05.007'] >> ParseAbstractDateTimes(format='yyyy.MM.dd hh:mm:ss.ms') \
+        >> AssertEqual >> [
+            AbstractDateTime(2020, 1, 2, 3, 4, 5, 600, Precision.ms), AbstractDateTime(2020, 1, 2, 3, 4, 5, 7, Precision.ms)
+        ]
+    [] >> ParseAbstractDates(format='yyyy.MM.dd') >> AssertEqual >> []
+    with AssertRaises(ValueError):
+        ['2020.01.02', 'oops'] >> ParseAbstractDates(format='yyyy.MM.dd')
+
+    # two digit years pivot at 70 whichever parser is used
+    for yy, year in [('69', 2069), ('70', 1970)]:
+        expected = AbstractDate(year, 1, 2)
+        ('02/01/' + yy) >> ParseAbstractDate(format=DD_MM_YY) >> AssertEqual >> expected
+        ('02/01/' + yy) >> ParseAbstractDate(format='dd/MM/yy') >> AssertEqual >> expected
+        ['02/01/' + yy] >> ParseAbstractDates(format='dd/MM/yy') >> AssertEqual >> [expected]
+        ['02/01/' + yy] >> ParseAbstractDates(format=DD_MM_YY) >> AssertEqual >> [expected]
+
+
+
+def test_vectorisedParsing():
+    xs = np.array([b'2020.01.02', b'1970.01.01', b'2000.02.29', b'1969.12.31'])
+    # numpy implements ndarray >> rhs so ndarrays are passed by calling
+    ParseAbstractDateArray(YYYY_MM_DD, xs).tolist() >> AssertEqual \
+        >> np.array(['2020-01-02', '1970-01-01', '2000-02-29', '1969-12-31'], dtype='datetime64[D]').tolist()
+    days = ParseAbstractDateArray(YYYY_MM_DD, xs, dayNumbers=True)
+    (days.dtype.name, days.tolist()) >> AssertEqual >> ('int32', [18263, 0, 11016, -1])
+    # str arrays and fixed width bytes are fine too
+    ['12/31/1999'] >> ParseAbstractDateArray(format=MM_DD_YYYY, dayNumbers=True) >> AssertEqual >> [10956]
+    (b'02/01/2003/02/04' >> ParseAbstractDateArray(format=DD_MM_YY, dayNumbers=True)).tolist() >> AssertEqual \
+        >> [18263, 12451]
+    with AssertRaises(ValueError):
+        [b'2021.02.29'] >> ParseAbstractDateArray(format=YYYY_MM_DD)
+    with AssertRaises(ValueError):
+        [b'2021.1x.01'] >> ParseAbstractDateArray(format=YYYY_MM_DD)
+    [b'2021.02.29'] >> ParseAbstractDateArray(format=YYYY_MM_DD, validate=False, dayNumbers=True) >> AssertEqual >> [18687]
+    ParseAbstractDates(YYYY_MM_DD, np.array([b'2020.01.02'])) >> AssertEqual >> [AbstractDate(2020, 1, 2)]
+    # empty input answers an empty result
+    ParseAbstractDates(YYYY_MM_DD, []) >> AssertEqual >> []
+    days = ParseAbstractDateArray(YYYY_MM_DD, [], dayNumbers=True)
+    (days.dtype.name, days.tolist()) >> AssertEqual >> ('int32', [])
+    ParseAbstractDateArray(YYYY_MM_DD, np.array([])).dtype.name >> AssertEqual >> 'datetime64[D]'
+
+
+
+def test_arrays():
+    dates = AbstractDateArray([AbstractDate(2020, 1, 31), AbstractDate(1999, 12, 31), AbstractDate(2000, 2, 29)])
+    (dates.days.dtype.name, len(dates), dates[1]) >> AssertEqual >> ('int32', 3, AbstractDate(1999, 12, 31))
+    [(dates >> Year).tolist(), (dates >> Month).tolist(), (dates >> Day).tolist(), (dates >> Weekday).tolist()] \
+        >> AssertEqual >> [[2020, 1999, 2000], [1, 12, 2], [31, 31, 29], [4, 4, 1]]
+    (dates < AbstractDate(2000, 1, 1)).tolist() >> AssertEqual >> [False, True, False]
+    (dates == dates).all() >> AssertEqual >> True
+    dates.argsort().tolist() >> AssertEqual >> [1, 2, 0]
+    dates.sort()
+    list(dates) >> AssertEqual >> [AbstractDate(1999, 12, 31), AbstractDate(2000, 2, 29), AbstractDate(2020, 1, 31)]
+    dates.searchsorted(AbstractDate(2000, 2, 29), side='right') >> AssertEqual >> 2
+    # slices are views
+    view = dates[1:]
+    (view.days.base is not None, view[0]) >> AssertEqual >> (True, AbstractDate(2000, 2, 29))
+    AbstractDateArray(np.array(['1970-01-02'], dtype='datetime64[D]')).days.tolist() >> AssertEqual >> [1]
+
+    ms = Precision.ms
+    times = AbstractDateTimeArray([
+        AbstractDateTime(2020, 1, 1, 16, 15, 0, 5, ms), AbstractDateTime(1969, 12, 31, 23, 59, 59, 999, ms)
+    ])
+    (times.ticks.dtype.name, times.ticks.tolist()) >> AssertEqual >> ('int64', [1577895300005, -1])
+    times[1] >> AssertEqual >> AbstractDateTime(1969, 12, 31, 23, 59, 59, 999, ms)
+    [(times >> Hour).tolist(), (times >> Minute).tolist(), (times >> Second).tolist(), times.subsecond.tolist()] \
+        >> AssertEqual >> [[16, 23], [15, 59], [0, 59], [5, 999]]
+    list(times.date) >> AssertEqual >> [AbstractDate(2020, 1, 1), AbstractDate(1969, 12, 31)]
+    (times > AbstractDateTime(2000, 1, 1, 0, 0, 0, 0, ms)).tolist() >> AssertEqual >> [True, False]
+    AbstractDateTimeArray(np.array(['2020-01-01T00:00:01'], dtype='datetime64[s]'))[0] >> AssertEqual \
+        >> AbstractDateTime(2020, 1, 1, 0, 0, 1)
+    with AssertRaises(TypeError):
+        times == AbstractDateTimeArray(times.ticks, Precision.us)
+    with AssertRaises(TypeError):
+        times < AbstractDateTime(2020, 1, 1, 0, 0, 0)
+
+
+
 def test_formatting():
     # u = "2020.01.01 16:15" >> toUTC(kdb)
     AbstractDateTime(2020, 1, 1, 16, 15) >> ToString('yyyy.MM.dd HH:MM AbstractDateTime') >> AssertEqual >> 'AbstractDateTime(2020, 1, 1, 16, 15)'
@@ -79,15 +181,154 @@ def test_formatting():
 
 
 
-def test_tzConversion():
-    pass
+def test_ctxIndex():
+    (FpMLCity.GBLO is FpMLCityForName('GBLO') is FpMLCity('GBLO')) >> AssertEqual >> True
+    (FpMLCity.GBED is FpMLCity.GBLO) >> AssertEqual >> False
+    FpMLCity.GBED >> ToIanaCity >> AssertEqual >> IanaCity.Europe_London
+    'JPTO' >> ToIanaCity >> AssertEqual >> IanaCityForName('Asia/Tokyo')
+    IanaCity.America_Port_au_Prince.name >> AssertEqual >> 'America/Port-au-Prince'
+    [IanaTz.GMT.name, IanaTz.EST.name, IanaTz.UTC.name] >> AssertEqual >> ['GMT', 'EST', 'UTC']
+    IanaTzForName('Etc/GMT+5') >> AssertEqual >> IanaTz.Etc_GMTp5
+    with AssertRaises(AttributeError):
+        FpMLCity.XXXX
+    with AssertRaises(KeyError):
+        FpMLCityForName('Europe/London')
+    with AssertRaises(KeyError):
+        IanaCityForName('GMT')
+
+
+
+def test_dateRange():
+    r = DateRange(AbstractDate(2020, 1, 1), AbstractDate(2021, 1, 1))
+    r.length >> AssertEqual >> 366
+    r[59] >> AssertEqual >> AbstractDate(2020, 2, 29)
+    r[-1] >> AssertEqual >> AbstractDate(2020, 12, 31)
+    r[::100] >> Materialise >> AssertEqual >> [AbstractDate(2020, 1, 1), AbstractDate(2020, 4, 10), AbstractDate(2020, 7, 19), AbstractDate(2020, 10, 27)]
+    s = r.save()
+    r.popFront(); r.popBack()
+    [r.front, r.back, r.length, s.length] >> AssertEqual >> [AbstractDate(2020, 1, 2), AbstractDate(2020, 12, 30), 364, 366]
+    r.toDateArray()[0] >> AssertEqual >> AbstractDate(2020, 1, 2)
+
+    s >> ChunkByMonth >> RMap >> (lambda m: m.length) >> Materialise >> AssertEqual >> [31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    weeks = DateRange(AbstractDate(2020, 1, 1), AbstractDate(2020, 1, 20)) >> ChunkByWeek >> Materialise
+    [(w[0], len(w)) for w in weeks] >> AssertEqual >> [
+        (AbstractDate(2020, 1, 1), 5), (AbstractDate(2020, 1, 6), 7), (AbstractDate(2020, 1, 13), 7)
+    ]
+    # steps other than a day chunk into the same months
+    DateRange(AbstractDate(2020, 1, 30), AbstractDate(2020, 4, 2), 3) >> ChunkByMonth >> RMap >> (lambda m: m.front) \
+        >> Materialise >> AssertEqual >> [AbstractDate(2020, 1, 30), AbstractDate(2020, 2, 2), AbstractDate(2020, 3, 3)]
+
+
+
+def test_businessDays():
+    AbstractDate(2020, 12, 24) >> IsBusinessDay(FpMLCity.GBLO) >> AssertEqual >> True
+    AbstractDate(2020, 12, 28) >> IsBusinessDay(FpMLCity.GBLO) >> AssertEqual >> False      # Boxing Day substitute
+    AbstractDate(2020, 12, 24) >> AddBusinessDays(2, FpMLCity.GBLO) >> AssertEqual >> AbstractDate(2020, 12, 30)
+    AbstractDate(2020, 12, 30) >> AddBusinessDays(-2, FpMLCity.GBLO) >> AssertEqual >> AbstractDate(2020, 12, 24)
+    BusinessDaysBetween(FpMLCity.GBLO, AbstractDate(2020, 1, 1), AbstractDate(2021, 1, 1)) >> AssertEqual >> 254
+    BusinessDaysBetween(FpMLCity.GBLO, AbstractDate(2021, 1, 1), AbstractDate(2020, 1, 1)) >> AssertEqual >> -254
+
+    # joint calendars - 2021-05-31 is a holiday in both London and New York and 2021-06-01 in neither
+    joint = (FpMLCity.GBLO, FpMLCity.USNY)
+    AbstractDate(2021, 5, 28) >> AddBusinessDays(1, joint) >> AssertEqual >> AbstractDate(2021, 6, 1)
+    AbstractDate(2021, 7, 2) >> AddBusinessDays(1, joint) >> AssertEqual >> AbstractDate(2021, 7, 6)
+    AbstractDate(2021, 7, 2) >> AddBusinessDays(1, FpMLCity.GBLO) >> AssertEqual >> AbstractDate(2021, 7, 5)
+
+    # arrays agree with the scalars
+    dates = AbstractDateArray(np.arange(18500, 18900, 7))
+    cal = BusinessCalendarFor(joint)
+    moved = AddBusinessDays(3, joint, dates)
+    isBusinessDay = IsBusinessDay(joint, dates)
+    counts = BusinessDaysBetween(joint, dates, AbstractDate(2022, 1, 1))
+    for i in range(len(dates)):
+        moved[i] >> AssertEqual >> (dates[i] >> AddBusinessDays(3, cal))
+        bool(isBusinessDay[i]) >> AssertEqual >> (dates[i] >> IsBusinessDay(cal))
+        int(counts[i]) >> AssertEqual >> BusinessDaysBetween(cal, dates[i], AbstractDate(2022, 1, 1))
+
+    with AssertRaises(KeyError):
+        AbstractDate(2020, 1, 1) >> IsBusinessDay(FpMLCity.JPTO)
+    RegisterHolidays(FpMLCity.JPTO, [AbstractDate(2020, 1, 2), AbstractDate(2020, 1, 3)])
+    AbstractDate(2019, 12, 31) >> AddBusinessDays(1, FpMLCity.JPTO) >> AssertEqual >> AbstractDate(2020, 1, 1)
+    AbstractDate(2020, 1, 1) >> AddBusinessDays(1, FpMLCity.JPTO) >> AssertEqual >> AbstractDate(2020, 1, 6)
 
 
 
+def test_tzConversion():
+    summer = AbstractDateTime(2020, 6, 1, 16, 15) >> AsObserved(FpMLCity.GBLO)
+    summer.offset >> AssertEqual >> 3600
+    summer.utc >> AssertEqual >> AbstractDateTime(2020, 6, 1, 15, 15)
+    (summer >> ToCtx(FpMLCity.USNY)).local >> AssertEqual >> AbstractDateTime(2020, 6, 1, 11, 15)
+    (summer >> ToCtx(IanaTz.UTC)).local >> AssertEqual >> AbstractDateTime(2020, 6, 1, 15, 15)
+    summer >> ToCtx(FpMLCity.USNY) >> AssertEqual >> ObservedDateTime(2020, 6, 1, 11, 15, FpMLCity.USNY)
+    (AbstractDateTime(2020, 1, 1, 16, 15, 0, 1, Precision.ms) >> AsObserved(FpMLCity.USNY)).utc \
+        >> AssertEqual >> AbstractDateTime(2020, 1, 1, 21, 15, 0, 1, Precision.ms)
+
+    # ambiguous local times answer the earlier instant, non-existent ones are moved forward by the gap
+    (AbstractDateTime(2020, 10, 25, 1, 30) >> AsObserved(FpMLCity.GBLO)).utc >> AssertEqual >> AbstractDateTime(2020, 10, 25, 0, 30)
+    (AbstractDateTime(2020, 3, 29, 1, 30) >> AsObserved(FpMLCity.GBLO)).local >> AssertEqual >> AbstractDateTime(2020, 3, 29, 2, 30)
+
+    # a time of day has no offset until it has a date
+    with AssertRaises(TypeError):
+        AbstractTimeOfDay(16, 15) >> AsObserved(FpMLCity.GBLO)
+
+    # BST, as parsed by ZZZZ, is always an hour ahead of UTC
+    winter = AbstractDateTime(2020, 1, 1, 16, 15) >> AsObserved(IanaTz.BST)
+    (winter.offset, winter.utc) >> AssertEqual >> (3600, AbstractDateTime(2020, 1, 1, 15, 15))
+
+    # arrays agree with the scalars
+    ticks = np.arange(1577836800, 1609459200, 3600 * 7 + 13, dtype=np.int64)
+    locals = AbstractDateTimeArray(ticks, Precision.s)
+    observed = AsObserved(FpMLCity.GBLO, locals)
+    inNY = ToCtx(FpMLCity.USNY, observed)
+    for i in range(0, len(locals), 37):
+        scalar = locals[i] >> AsObserved(FpMLCity.GBLO)
+        observed[i] >> AssertEqual >> scalar
+        inNY.local[i] >> AssertEqual >> (scalar >> ToCtx(FpMLCity.USNY)).local
+    set(observed.offset.tolist()) >> AssertEqual >> {0, 3600}
+
+
+
+def test_periods():
+    AbstractDate(2020, 2, 28) >> AddPeriod(DaySecond(2)) >> AssertEqual >> AbstractDate(2020, 3, 1)
+    AbstractDateTime(2020, 2, 28, 23, 59, 30) >> AddPeriod(DaySecond(0, 45)) >> AssertEqual >> AbstractDateTime(2020, 2, 29, 0, 0, 15)
+    AbstractDateTime(2020, 1, 1, 0, 0, 0, 5, Precision.ms) >> AddPeriod(DaySecond(-1, 1)) \
+        >> AssertEqual >> AbstractDateTime(2019, 12, 31, 0, 0, 1, 5, Precision.ms)
+    DaySecond(0, -60) >> AssertEqual >> DaySecond(-1, 86340)
+    with AssertRaises(TypeError):
+        AbstractDateTime(2020, 1, 1, 0, 0) >> AddPeriod(DaySecond(0, 0, 1, Precision.ms))
+    with AssertRaises(TypeError):
+        AbstractDate(2020, 1, 1) >> AddPeriod(DaySecond(0, 60))
+
+    utc = AbstractDateTime(2020, 6, 1, 12, 0) >> AsObserved(IanaTz.UTC)
+    (utc >> AddPeriod(DaySecond(1, 3600))).local >> AssertEqual >> AbstractDateTime(2020, 6, 2, 13, 0)
+    with AssertRaises(TypeError):
+        utc >> ToCtx(FpMLCity.GBLO) >> AddPeriod(DaySecond(1))
+
+    PeriodBetween(AbstractDate(2020, 1, 1), AbstractDate(2021, 1, 1)) >> AssertEqual >> DaySecond(366)
+    PeriodBetween(AbstractDateTime(2020, 1, 1, 0, 0), AbstractDateTime(2019, 12, 31, 23, 0)) >> AssertEqual >> DaySecond(0, -3600)
+
+    # arrays
+    bars = AbstractDateTimeArray(np.arange(1577836800, 1577836800 + 10 * 60, 60, dtype=np.int64), Precision.s)
+    shifted = AddPeriod(DaySecond(1, 30), bars)
+    shifted[0] >> AssertEqual >> AbstractDateTime(2020, 1, 2, 0, 0, 30)
+    periods = PeriodBetween(bars, shifted)
+    [periods[0], periods.days.tolist()[:2], periods.seconds.tolist()[:2]] >> AssertEqual >> [DaySecond(1, 30), [1, 1], [30, 30]]
+    (AddPeriod(periods, bars) == shifted).all() >> AssertEqual >> True
+    dates = AbstractDateArray(np.arange(18262, 18272))
+    (PeriodBetween(dates, AddPeriod(DaySecond(7), dates)).days == 7).all() >> AssertEqual >> True
+
+
 def main():
     test_parsing()
+    test_compiledParsing()
+    test_vectorisedParsing()
+    test_arrays()
     test_formatting()
+    test_ctxIndex()
+    test_dateRange()
+    test_businessDays()
     test_tzConversion()
+    test_periods()
     print('pass')
 
 